@@ -0,0 +1,276 @@
+"""Iterative fractal curve generator (Koch-style curves and L-systems).
+
+Curves are NumPy arrays of complex points (x + iy); no turtle or recursion.
+
+- Generator curves (Koch, quadratic Koch, Levy C, ...) are described by one
+  polyline from 0 to 1. The order-n template is the order-(n-1) template
+  placed on every generator segment by an affine map (z -> a + (b - a) z),
+  all segments at once. Templates are cached per (generator, order), so
+  higher orders start from the highest order already built and any curve
+  is just its template mapped onto the requested segment.
+- L-systems are expanded on byte arrays (np.repeat over the productions),
+  cached per order as well, and turned into points with a cumulative sum of
+  headings instead of a turtle walk.
+- write_svg() / write_binary() stream points to disk in chunks.
+
+Example:
+    points = koch_snowflake(order=10, side=400)   # ~3M points
+    write_svg('snowflake.svg', points)
+
+    python fractal_curves.py koch --order 10 --output koch.svg
+"""
+import argparse
+import math
+import time
+import numpy as np
+
+# Unit generators: polylines from 0 to 1 (bumps on the left, +y side)
+KOCH = (0, 1 / 3, 0.5 + 1j * math.sqrt(3) / 6, 2 / 3, 1)
+QUADRATIC_KOCH = (0, 0.25, 0.25 + 0.25j, 0.5 + 0.25j, 0.5, 0.5 - 0.25j, 0.75 - 0.25j, 0.75, 1)
+CESARO = (0, 0.45, 0.5 + 0.3j, 0.55, 1)
+LEVY_C = (0, 0.5 + 0.5j, 1)
+GENERATORS = {
+    'koch': KOCH,
+    'quadratic_koch': QUADRATIC_KOCH,
+    'cesaro': CESARO,
+    'levy_c': LEVY_C,
+}
+
+# name -> (axiom, rules, turn angle in degrees, symbols that draw)
+LSYSTEMS = {
+    'dragon': ('FX', {'X': 'X+YF+', 'Y': '-FX-Y'}, 90, 'F'),
+    'hilbert': ('A', {'A': '+BF-AFA-FB+', 'B': '-AF+BFB+FA-'}, 90, 'F'),
+    'sierpinski_arrowhead': ('A', {'A': 'B-A-B', 'B': 'A+B+A'}, 60, 'AB'),
+    'gosper': ('A', {'A': 'A-B--B+A++AA+B-', 'B': '+A-AA--A-B++B+A'}, 60, 'AB'),
+    'koch_lsystem': ('F', {'F': 'F+F--F+F'}, 60, 'F'),
+}
+
+# Points written per chunk by the streaming writers
+CHUNK_POINTS = 1 << 16
+
+_template_cache = {}
+_expansion_cache = {}
+
+
+def curve_template(generator, order):
+    """
+    Order-n template of a generator curve, from 0 to 1.
+
+    Args:
+        generator: sequence of complex points starting at 0 and ending at 1
+        order: iteration count (0 is the straight segment)
+
+    Returns:
+        read-only complex array of (segments ** order + 1) points
+    """
+    generator = tuple(complex(p) for p in generator)
+    if abs(generator[0]) > 1e-12 or abs(generator[-1] - 1) > 1e-12:
+        raise ValueError('generator must run from 0 to 1')
+    if order < 0:
+        raise ValueError('order must be non-negative')
+
+    # Start from the highest cached order
+    level = order
+    while level > 0 and (generator, level) not in _template_cache:
+        level -= 1
+    template = _template_cache.get((generator, level), np.array([0, 1], dtype=np.complex128))
+
+    starts = np.array(generator[:-1])[:, None]
+    spans = np.diff(np.array(generator))[:, None]
+    while level < order:
+        level += 1
+        # Every generator segment gets a copy of the previous template (minus its end point)
+        pieces = starts + spans * template[None, :-1]
+        template = np.append(pieces.ravel(), 1 + 0j)
+        template.flags.writeable = False
+        _template_cache[(generator, level)] = template
+    return template
+
+
+def curve_points(generator, order, start=0j, end=1 + 0j):
+    """Order-n generator curve mapped onto the segment start -> end."""
+    start = complex(start)
+    return start + (complex(end) - start) * curve_template(generator, order)
+
+
+def koch_snowflake(order, side=1.0, start=0j, generator=KOCH):
+    """
+    Closed Koch snowflake (clockwise triangle, bumps outward).
+
+    Returns:
+        complex array; the last point repeats the first
+    """
+    start = complex(start)
+    corners = [start, start + side, start + side * complex(0.5, -math.sqrt(3) / 2), start]
+    template = curve_template(generator, order)
+    edges = [a + (b - a) * template[:-1] for a, b in zip(corners[:-1], corners[1:])]
+    return np.append(np.concatenate(edges), start)
+
+
+def lsystem_expand(axiom, rules, order):
+    """
+    Rewrite an L-system order times.
+
+    Returns:
+        read-only uint8 array of symbols
+    """
+    key = (axiom, tuple(sorted(rules.items())))
+    level = order
+    while level > 0 and (key, level) not in _expansion_cache:
+        level -= 1
+    symbols = _expansion_cache.get((key, level), np.frombuffer(axiom.encode('ascii'), dtype=np.uint8))
+
+    # Production table: symbol -> slice of one concatenated byte string
+    productions = [rules.get(chr(code), chr(code)).encode('ascii') for code in range(128)]
+    lengths = np.array([len(p) for p in productions], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    table = np.frombuffer(b''.join(productions), dtype=np.uint8)
+
+    while level < order:
+        level += 1
+        counts = lengths[symbols]
+        out_starts = np.cumsum(counts) - counts
+        total = int(counts.sum())
+        # Output byte i reads its production at (i - its output start) + production offset
+        index = np.arange(total) + np.repeat(offsets[symbols] - out_starts, counts)
+        symbols = table[index]
+        symbols.flags.writeable = False
+        _expansion_cache[(key, level)] = symbols
+    return symbols
+
+
+def lsystem_points(axiom, rules, angle, order, step=1.0, start=0j, heading=0.0, draw='F'):
+    """
+    Points of a (non-branching) L-system curve.
+
+    Args:
+        axiom, rules: L-system; '+' turns left and '-' right by angle degrees
+        angle: turn angle in degrees
+        order: rewrite count
+        step: length of each drawn segment
+        start: first point (complex)
+        heading: initial direction in degrees
+        draw: symbols that draw one segment forward
+
+    Returns:
+        complex array of points
+    """
+    symbols = lsystem_expand(axiom, rules, order)
+    if np.any((symbols == ord('[')) | (symbols == ord(']'))):
+        raise ValueError('branching L-systems do not form a single polyline')
+
+    turns = (symbols == ord('+')).astype(np.int64) - (symbols == ord('-'))
+    # Integer turn counts (reduced modulo a full turn) keep the headings exact
+    turn_count = np.cumsum(turns)
+    drawn = np.isin(symbols, np.frombuffer(draw.encode('ascii'), dtype=np.uint8))
+    turn_count = turn_count[drawn]
+    period = 360 / angle
+    if float(period).is_integer():
+        turn_count %= int(abs(period))
+    headings = np.radians(heading + angle * turn_count)
+    points = np.empty(len(headings) + 1, dtype=np.complex128)
+    points[0] = start
+    np.cumsum(step * np.exp(1j * headings), out=points[1:])
+    points[1:] += start
+    return points
+
+
+def named_curve(name, order, **kwargs):
+    """Points of a curve from GENERATORS or LSYSTEMS by name."""
+    if name == 'snowflake':
+        return koch_snowflake(order, **kwargs)
+    if name in GENERATORS:
+        return curve_points(GENERATORS[name], order, **kwargs)
+    if name in LSYSTEMS:
+        axiom, rules, angle, draw = LSYSTEMS[name]
+        return lsystem_points(axiom, rules, angle, order, draw=draw, **kwargs)
+    raise ValueError(f'unknown curve: {name}')
+
+
+def clear_cache():
+    """Drop all cached templates and expansions."""
+    _template_cache.clear()
+    _expansion_cache.clear()
+
+
+def write_svg(path, points, stroke='black', stroke_width=1.0, margin=10.0, size=1000.0,
+              chunk_points=CHUNK_POINTS):
+    """
+    Stream a curve to an SVG polyline (y axis flipped to point up).
+
+    The curve is scaled so its larger side spans `size` pixels, and
+    coordinates get enough decimals to keep the shortest segment visible.
+    Points are formatted chunk by chunk, so millions of points never build
+    one giant string.
+    """
+    points = np.asarray(points, dtype=np.complex128)
+    x_min, x_max = points.real.min(), points.real.max()
+    y_min, y_max = points.imag.min(), points.imag.max()
+    extent = max(x_max - x_min, y_max - y_min)
+    scale = size / extent if extent > 0 else 1.0
+
+    # Shortest non-zero segment in pixels, chunk by chunk
+    shortest = math.inf
+    for i in range(0, len(points) - 1, chunk_points):
+        lengths = np.abs(np.diff(points[i:i + chunk_points + 1])) * scale
+        lengths = lengths[lengths > 0]
+        if lengths.size:
+            shortest = min(shortest, lengths.min())
+    # Two significant digits of the shortest segment, at least 0.01 px
+    digits = max(2, math.ceil(-math.log10(shortest)) + 1) if math.isfinite(shortest) else 2
+    point_format = f'%.{digits}f,%.{digits}f'
+
+    width = (x_max - x_min) * scale + 2 * margin
+    height = (y_max - y_min) * scale + 2 * margin
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.2f}" height="{height:.2f}" '
+                f'viewBox="0 0 {width:.2f} {height:.2f}">\n')
+        f.write(f'<polyline fill="none" stroke="{stroke}" stroke-width="{stroke_width}" points="')
+        for i in range(0, len(points), chunk_points):
+            chunk = points[i:i + chunk_points]
+            xy = np.column_stack(((chunk.real - x_min) * scale + margin,
+                                  (y_max - chunk.imag) * scale + margin))
+            np.savetxt(f, xy, fmt=point_format, newline=' ')
+        f.write('"/>\n</svg>\n')
+
+
+def write_binary(path, points, dtype=np.float32, chunk_points=CHUNK_POINTS):
+    """
+    Stream a curve as interleaved x, y values (.npy keeps a header, anything
+    else is raw little-endian).
+    """
+    points = np.asarray(points, dtype=np.complex128)
+    dtype = np.dtype(dtype).newbyteorder('<')
+    with open(path, 'wb') as f:
+        if str(path).endswith('.npy'):
+            np.lib.format.write_array_header_1_0(
+                f, {'descr': dtype.str, 'fortran_order': False, 'shape': (len(points), 2)})
+        for i in range(0, len(points), chunk_points):
+            chunk = points[i:i + chunk_points]
+            np.column_stack((chunk.real, chunk.imag)).astype(dtype).tofile(f)
+
+
+def main():
+    names = ['snowflake'] + sorted(GENERATORS) + sorted(LSYSTEMS)
+    parser = argparse.ArgumentParser(description='Generate fractal curves and export them.')
+    parser.add_argument('curve', choices=names)
+    parser.add_argument('--order', type=int, default=5)
+    parser.add_argument('--output', help='.svg, .npy or raw float32 (.bin) file')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    points = named_curve(args.curve, args.order)
+    built = time.perf_counter() - start
+    print(f'{args.curve} order {args.order}: {len(points)} points in {built * 1000:.1f} ms')
+
+    if args.output:
+        start = time.perf_counter()
+        if args.output.endswith('.svg'):
+            write_svg(args.output, points)
+        else:
+            write_binary(args.output, points)
+        print(f'wrote {args.output} in {time.perf_counter() - start:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
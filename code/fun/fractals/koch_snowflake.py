@@ -1,27 +1,20 @@
+import cmath
+import math
 import turtle
+from fractal_curves import KOCH, curve_points
 
 def koch_curve(t, order, length):
     """
     Draw a Koch curve with a given 'order' and 'length' using the turtle 't'.
+
+    The points come from fractal_curves (built iteratively and cached per
+    order), so the turtle only walks the finished polyline.
     """
-    if order == 0:
-        t.forward(length)
-    else:
-        length /= 3.0
-        # 1. Draw a Koch curve of order-1
-        koch_curve(t, order - 1, length)
-        # 2. Turn left 60°
-        t.left(60)
-        # 3. Another Koch curve of order-1
-        koch_curve(t, order - 1, length)
-        # 4. Turn right 120°
-        t.right(120)
-        # 5. Another Koch curve of order-1
-        koch_curve(t, order - 1, length)
-        # 6. Turn left 60° again
-        t.left(60)
-        # 7. Last Koch curve of order-1
-        koch_curve(t, order - 1, length)
+    x, y = t.position()
+    direction = cmath.exp(1j * math.radians(t.heading()))
+    points = complex(x, y) + direction * curve_points(KOCH, order, 0, length)
+    for point in points[1:]:
+        t.goto(point.real, point.imag)
 
 def koch_snowflake(t, order, length):
     """
@@ -39,6 +32,8 @@ def main():
     
     t = turtle.Turtle()
     t.speed("fastest")
+    # Draw without animating every segment; the screen is refreshed once at the end
+    screen.tracer(0)
     t.penup()
     # Position the turtle so the snowflake is centered
     t.goto(-200, 100)
@@ -49,6 +44,7 @@ def main():
     side_length = 400
 
     koch_snowflake(t, order, side_length)
+    screen.update()
 
     # Keep the window open until closed by the user
     turtle.done()
@@ -1,3 +1,8 @@
+import numpy as np
+
+RULE = 90
+
+
 def generate_sierpinski_1d(rows=16):
     """
     Generate and print a 1D Sierpinski triangle (Rule 90) for a given number of rows.
@@ -6,26 +11,23 @@ def generate_sierpinski_1d(rows=16):
     # A typical choice is 2*rows+1 so the middle cell can expand left and right
     width = 2 * rows + 1
 
-    # Create the initial row with a single "1" in the center
-    row = [0] * width
+    # Rule 90 as a lookup table indexed by left << 2 | centre << 1 | right
+    # (the same layout as experiments/eca_engine.py): next = left XOR right
+    table = ((RULE >> np.arange(8)) & 1).astype(np.uint8)
+
+    # Start with a single "1" in the center
+    row = np.zeros(width, dtype=np.uint8)
     row[width // 2] = 1
+    # One zero cell on each side: cells beyond the edges count as 0
+    padded = np.zeros(width + 2, dtype=np.uint8)
 
-    for r in range(rows):
+    for _ in range(rows):
         # Convert the row bits to a string of '#' (for 1) and ' ' (for 0)
-        line_str = ''.join('#' if cell else ' ' for cell in row)
-        print(line_str)
-
-        # Prepare the next row by applying Rule 90
-        next_row = [0] * width
-        for i in range(width):
-            # The left neighbor is row[i-1], the right neighbor is row[i+1],
-            # but we need to handle boundaries.
-            left = row[i-1] if i-1 >= 0 else 0
-            right = row[i+1] if i+1 < width else 0
-            # Rule 90: next = left XOR right
-            next_row[i] = left ^ right
-
-        row = next_row
+        print(''.join('#' if cell else ' ' for cell in row))
+
+        # Apply Rule 90 to the whole row at once
+        padded[1:-1] = row
+        row = table[(padded[:-2] << 2) | (padded[1:-1] << 1) | padded[2:]]
 
 if __name__ == "__main__":
     # Generate 16 rows (you can change to any number you like)
@@ -0,0 +1,291 @@
+"""Headless batch background removal with persistent ONNX sessions.
+
+- create_session(): one rembg session whose onnxruntime options are set
+  explicitly (intra-op threads, sequential execution, full graph
+  optimization) instead of through environment variables.
+- batch_remove(): a three-stage pipeline over a directory of images.
+  The calling thread reads and decodes, `workers` threads run inference
+  (each with its own session, created once), and one thread composites and
+  writes the PNGs. The stages are joined by bounded queues, so decoding and
+  encoding overlap inference and memory stays flat.
+- Inputs are hashed (SHA-256 of the file bytes and the model name). An
+  output whose recorded hash still matches its input is skipped, so
+  re-running over a folder only processes new or changed images.
+
+    python background_batch.py photos/ --output cutouts/ --workers 2
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from PIL import Image, ImageOps
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+OUTPUT_SUFFIX = '-no-bgrd.png'
+MANIFEST_NAME = '.background_removal.json'
+QUEUE_SIZE = 8
+DEFAULT_MODEL = 'u2net'
+
+_STOP = object()
+
+
+def default_providers():
+    """CUDA (when onnxruntime-gpu has it) then CPU; TensorRT is never used."""
+    import onnxruntime as ort  # optional dependency
+
+    available = ort.get_available_providers()
+    return [name for name in ('CUDAExecutionProvider', 'CPUExecutionProvider') if name in available]
+
+
+def create_session(model=DEFAULT_MODEL, threads=None, providers=None):
+    """
+    A rembg session with explicitly tuned onnxruntime options.
+
+    Args:
+        model: rembg model name (u2net, u2netp, isnet-general-use, ...)
+        threads: intra-op threads for this session (default: all CPUs)
+        providers: onnxruntime execution providers (default: default_providers())
+    """
+    import onnxruntime as ort  # optional dependency
+    from rembg.sessions import sessions_class
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads or os.cpu_count() or 1
+    # The u2net graphs are a single chain; parallel branches only add overhead
+    options.inter_op_num_threads = 1
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    classes = {cls.name(): cls for cls in sessions_class}
+    if model not in classes:
+        raise ValueError(f'unknown model: {model} (choose from {sorted(classes)})')
+    return classes[model](model, options, providers=providers or default_providers())
+
+
+def split_threads(workers=None, cpus=None):
+    """(workers, threads per session) so that sessions do not oversubscribe the CPUs."""
+    cpus = cpus or os.cpu_count() or 1
+    # Throughput favours a few sessions with several threads each over many single-threaded ones
+    workers = workers or max(1, min(4, cpus // 4))
+    return workers, max(1, cpus // workers)
+
+
+def cutout(image, masks):
+    """Apply the predicted mask(s) as rembg.remove does (naive cutout, stacked vertically)."""
+    empty = Image.new('RGBA', image.size, 0)
+    cutouts = [Image.composite(image.convert('RGBA'), empty, mask.resize(image.size, Image.LANCZOS))
+               for mask in masks]
+    if len(cutouts) == 1:
+        return cutouts[0]
+    result = Image.new('RGBA', (image.width, image.height * len(cutouts)))
+    for index, part in enumerate(cutouts):
+        result.paste(part, (0, index * image.height))
+    return result
+
+
+def find_images(directory, recursive=False):
+    """Image files under directory (previous outputs excluded), sorted."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(dirs) if recursive else []
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS) and not name.endswith(OUTPUT_SUFFIX):
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def content_hash(data, model):
+    return hashlib.sha256(model.encode() + b'\0' + data).hexdigest()
+
+
+def output_path_for(path, input_dir, output_dir=None):
+    """<name>-no-bgrd.png next to the input, or at the same relative path under output_dir."""
+    stem = os.path.splitext(path)[0] + OUTPUT_SUFFIX
+    if output_dir is None:
+        return stem
+    return os.path.join(output_dir, os.path.relpath(stem, input_dir))
+
+
+class Manifest:
+    """Input hash of every written output, stored as JSON in the output directory."""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _key(self, output_path):
+        return os.path.relpath(output_path, os.path.dirname(self.path))
+
+    def is_current(self, output_path, digest):
+        with self._lock:
+            return self.entries.get(self._key(output_path)) == digest and os.path.exists(output_path)
+
+    def record(self, output_path, digest):
+        with self._lock:
+            self.entries[self._key(output_path)] = digest
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp = self.path + '.tmp'
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(temp, self.path)
+
+
+class BatchStats:
+    """Thread-safe counters with an images/sec report."""
+
+    def __init__(self, report_every=10):
+        self.report_every = report_every
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+            if field == 'done' and self.report_every and self.done % self.report_every == 0:
+                print(f'{self.done} images ({self.rate:.2f}/s), {self.skipped} skipped, {self.failed} failed')
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+
+def _inference_worker(jobs, encoded, model, threads, providers, stats, ready):
+    try:
+        session = create_session(model, threads, providers)
+    except Exception as e:
+        ready.put(e)
+        return
+    ready.put(None)
+    while True:
+        job = jobs.get()
+        if job is _STOP:
+            return
+        path, output_path, digest, image = job
+        try:
+            masks = session.predict(image)
+        except Exception as e:
+            print(f'{path}: inference failed: {e}')
+            stats.add('failed')
+            continue
+        encoded.put((path, output_path, digest, image, masks))
+
+
+def _encode_worker(encoded, manifest, stats):
+    while True:
+        job = encoded.get()
+        if job is _STOP:
+            return
+        path, output_path, digest, image, masks = job
+        try:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            cutout(image, masks).save(output_path, 'PNG')
+        except Exception as e:
+            print(f'{path}: writing {output_path} failed: {e}')
+            stats.add('failed')
+            continue
+        manifest.record(output_path, digest)
+        stats.add('done')
+
+
+def batch_remove(input_dir, output_dir=None, model=DEFAULT_MODEL, workers=None, threads=None,
+                 providers=None, queue_size=QUEUE_SIZE, recursive=False, force=False, report_every=10):
+    """
+    Remove the background of every image in a directory.
+
+    Args:
+        output_dir: where the PNG cutouts go (default: next to each input)
+        workers: inference sessions running in parallel (default: split_threads())
+        threads: intra-op threads per session (default: CPUs / workers)
+        queue_size: decoded images waiting for inference (and results waiting to be written)
+        force: process images even when their output is up to date
+
+    Returns:
+        BatchStats (done, skipped, failed, rate)
+    """
+    workers, default_threads = split_threads(workers)
+    threads = threads or default_threads
+    manifest = Manifest(output_dir or input_dir)
+    stats = BatchStats(report_every)
+    jobs = queue.Queue(maxsize=queue_size)
+    encoded = queue.Queue(maxsize=queue_size)
+    ready = queue.Queue()
+
+    inference = [threading.Thread(target=_inference_worker, daemon=True,
+                                  args=(jobs, encoded, model, threads, providers, stats, ready))
+                 for _ in range(workers)]
+    encoder = threading.Thread(target=_encode_worker, args=(encoded, manifest, stats), daemon=True)
+    for thread in inference:
+        thread.start()
+    encoder.start()
+    # Every session is loaded before the clock starts, so the rate is steady-state throughput
+    errors = [ready.get() for _ in inference]
+    error = next((e for e in errors if e is not None), None)
+    stats.start = time.perf_counter()
+
+    try:
+        if error is None:
+            for path in find_images(input_dir, recursive):
+                target = output_path_for(path, input_dir, output_dir)
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                    digest = content_hash(data, model)
+                    if not force and manifest.is_current(target, digest):
+                        stats.add('skipped')
+                        continue
+                    image = Image.open(path)
+                    image = ImageOps.exif_transpose(image)  # as rembg.remove does
+                    image.load()
+                except Exception as e:
+                    print(f'{path}: cannot read: {e}')
+                    stats.add('failed')
+                    continue
+                jobs.put((path, target, digest, image))
+    finally:
+        for thread in inference:
+            if thread.is_alive():
+                jobs.put(_STOP)
+        for thread in inference:
+            thread.join()
+        encoded.put(_STOP)
+        encoder.join()
+        manifest.save()
+    if error is not None:
+        raise error
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove the background of every image in a directory.')
+    parser.add_argument('input_dir')
+    parser.add_argument('--output', help='output directory (default: next to the inputs)')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--workers', type=int, help='parallel inference sessions')
+    parser.add_argument('--threads', type=int, help='CPU threads per session')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--recursive', action='store_true')
+    parser.add_argument('--force', action='store_true', help='reprocess up-to-date outputs')
+    args = parser.parse_args()
+
+    stats = batch_remove(args.input_dir, args.output, args.model, args.workers, args.threads,
+                         queue_size=args.queue_size, recursive=args.recursive, force=args.force)
+    print(f'{stats.done} images in {time.perf_counter() - stats.start:.2f}s ({stats.rate:.2f} images/s), '
+          f'{stats.skipped} skipped, {stats.failed} failed')
+
+
+if __name__ == '__main__':
+    main()
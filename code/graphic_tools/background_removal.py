@@ -1,9 +1,19 @@
 import os
-import onnxruntime as ort
+import sys
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from rembg import remove
 from PIL import Image, ImageTk
+from background_batch import create_session, default_providers
+
+# With arguments, run headless over a directory: background_removal.py photos/ --output cutouts/
+if len(sys.argv) > 1:
+    from background_batch import main
+    main()
+    sys.exit()
+
+# Created on first use and reused for every image
+session = None
 
 # Create the main app window
 root = tk.Tk()
@@ -36,17 +46,11 @@ def display_image(image_path: str) -> None:
 
 def remove_background() -> None:
     """Select an image and remove its background using rembg."""
-    # Check available execution providers
-    available_providers = ort.get_available_providers()
-    if 'CUDAExecutionProvider' in available_providers:
-        os.environ["ORT_DISABLE_TENSORRT"] = "1"
-        os.environ["ORT_DISABLE_CPU"] = "0"
-        os.environ["ORT_DISABLE_CUDA"] = "0"
+    global session
+    providers = default_providers()
+    if 'CUDAExecutionProvider' in providers:
         status_bar.config(text="Using CUDA + CPU")
     else:
-        os.environ["ORT_DISABLE_TENSORRT"] = "1"
-        os.environ["ORT_DISABLE_CPU"] = "0"
-        os.environ["ORT_DISABLE_CUDA"] = "1"
         status_bar.config(text="Using CPU Only")
 
     # Ask user to select an image
@@ -69,10 +73,12 @@ def remove_background() -> None:
     # Compute the output path
     output_path = os.path.splitext(file_path)[0] + "-no-bgrd.png"
 
-    # Perform background removal
+    # Perform background removal (the model is loaded once, on the first image)
+    if session is None:
+        session = create_session(providers=providers)
     with open(file_path, "rb") as inp_file:
         input_data = inp_file.read()
-        output_data = remove(input_data)
+        output_data = remove(input_data, session=session)
 
     # Write the result
     with open(output_path, "wb") as out_file:
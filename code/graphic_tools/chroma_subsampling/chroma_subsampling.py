@@ -1,52 +1,25 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import filedialog, ttk
-from PIL import Image, ImageTk
+from PIL import Image
 import numpy as np
+from chroma_engine import FILTERS, SCHEMES, psnr, subsample
 
-def ycbcr_subsample(img, subsample_type):
+# The shared zoomable image view lives in graphic_tools/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from image_viewer import ImageView  # noqa: E402
+
+def ycbcr_subsample(img, subsample_type, filter_type="box"):
+    """
+    Subsample the chroma of a PIL image and convert it back to RGB.
+
+    The chroma planes are really decimated and upsampled again by
+    chroma_engine (box, bilinear or lanczos filter).
+    """
     if subsample_type == "4:4:4":
         return img
-
-    img_ycbcr = img.convert('YCbCr')
-    y, cb, cr = img_ycbcr.split()
-    y_np = np.array(y)
-    cb_np = np.array(cb)
-    cr_np = np.array(cr)
-    h, w = cb_np.shape
-
-    def pad_to_even(arr, axis):
-        if arr.shape[axis] % 2 != 0:
-            pad_width = ((0, 1), (0, 0)) if axis == 0 else ((0, 0), (0, 1))
-            arr = np.pad(arr, pad_width, mode='edge')
-        return arr
-
-    if subsample_type in ["4:2:2", "4:2:1", "4:1:1"]:
-        cb_np = pad_to_even(cb_np, 1)
-        cr_np = pad_to_even(cr_np, 1)
-    elif subsample_type == "4:2:0":
-        cb_np = pad_to_even(cb_np, 0)
-        cb_np = pad_to_even(cb_np, 1)
-        cr_np = pad_to_even(cr_np, 0)
-        cr_np = pad_to_even(cr_np, 1)
-
-    if subsample_type == "4:2:2":
-        cb_np[:, 1::2] = cb_np[:, ::2]
-        cr_np[:, 1::2] = cr_np[:, ::2]
-    elif subsample_type == "4:2:1":
-        cb_np[:, 1::4] = cb_np[:, ::4]
-        cr_np[:, 1::4] = cr_np[:, ::4]
-    elif subsample_type == "4:2:0":
-        cb_np[1::2, :] = cb_np[::2, :]
-        cb_np[:, 1::2] = cb_np[:, ::2]
-        cr_np[1::2, :] = cr_np[::2, :]
-        cr_np[:, 1::2] = cr_np[:, ::2]
-    elif subsample_type == "4:1:1":
-        cb_np[:, 1::4] = cb_np[:, ::4]
-        cr_np[:, 1::4] = cr_np[:, ::4]
-
-    cb_new = Image.fromarray(cb_np[:h, :w], 'L')
-    cr_new = Image.fromarray(cr_np[:h, :w], 'L')
-    return Image.merge("YCbCr", (y, cb_new, cr_new)).convert('RGB')
+    return Image.fromarray(subsample(np.asarray(img.convert("RGB")), subsample_type, filter_type))
 
 class SubsamplingApp:
     def __init__(self, root):
@@ -56,8 +29,6 @@ class SubsamplingApp:
 
         self.img_original = None
         self.img_processed = None
-        self.zoom_original = 1.0
-        self.zoom_processed = 1.0
 
         self.setup_ui()
 
@@ -67,7 +38,11 @@ class SubsamplingApp:
 
         self.subsample_var = tk.StringVar(value="4:4:4")
         ttk.Combobox(
-            top_frame, textvariable=self.subsample_var, values=["4:4:4", "4:2:2", "4:2:1", "4:2:0", "4:1:1"]
+            top_frame, textvariable=self.subsample_var, values=list(SCHEMES)
+        ).pack(side=tk.LEFT, padx=5)
+        self.filter_var = tk.StringVar(value="box")
+        ttk.Combobox(
+            top_frame, textvariable=self.filter_var, values=list(FILTERS), width=10
         ).pack(side=tk.LEFT, padx=5)
 
         tk.Button(top_frame, text="Load Image", command=self.load_image).pack(side=tk.LEFT, padx=5)
@@ -75,6 +50,8 @@ class SubsamplingApp:
         self.apply_button.pack(side=tk.LEFT, padx=5)
         self.save_button = tk.Button(top_frame, text="Save Processed Image", command=self.save_processed_image, state=tk.DISABLED)
         self.save_button.pack(side=tk.LEFT, padx=5)
+        self.psnr_label = tk.Label(top_frame, text="")
+        self.psnr_label.pack(side=tk.LEFT, padx=5)
 
         self.canvas_frame = tk.Frame(self.root)
         self.canvas_frame.pack(fill=tk.BOTH, expand=True)
@@ -84,18 +61,15 @@ class SubsamplingApp:
         self.canvas_processed = tk.Canvas(self.canvas_frame, bg="black")
         self.canvas_processed.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        self.canvas_original.bind("<MouseWheel>", lambda e: self.zoom(e, 'original'))
-        self.canvas_processed.bind("<MouseWheel>", lambda e: self.zoom(e, 'processed'))
-
-        self.root.bind("<Configure>", self.on_resize)
+        # Views handle zoom (mouse wheel), pan (drag) and debounced resizes themselves
+        self.view_original = ImageView(self.canvas_original, fit=False)
+        self.view_processed = ImageView(self.canvas_processed, fit=False)
 
     def load_image(self):
         path = filedialog.askopenfilename()
         if not path:
             return
         self.img_original = Image.open(path).convert("RGB")
-        self.zoom_original = 1.0
-        self.zoom_processed = 1.0
         self.img_processed = None
         self.apply_button.config(state=tk.NORMAL)
         self.save_button.config(state=tk.DISABLED)
@@ -105,10 +79,12 @@ class SubsamplingApp:
         if not self.img_original:
             return
         subsample_type = self.subsample_var.get()
-        self.img_processed = ycbcr_subsample(self.img_original, subsample_type)
-        self.zoom_processed = 1.0
+        self.img_processed = ycbcr_subsample(self.img_original, subsample_type, self.filter_var.get())
+        value = psnr(np.asarray(self.img_original), np.asarray(self.img_processed))
+        self.psnr_label.config(text=f"PSNR: {value:.2f} dB")
         self.save_button.config(state=tk.NORMAL)
-        self.display_images()
+        # Same size as the original, so the processed view keeps its zoom and pan
+        self.view_processed.set_image(self.img_processed, keep_view=True)
 
     def save_processed_image(self):
         if self.img_processed:
@@ -120,36 +96,8 @@ class SubsamplingApp:
                 self.img_processed.save(file_path)
 
     def display_images(self):
-        self._draw_image_on_canvas(self.canvas_original, self.img_original, self.zoom_original)
-        if self.img_processed:
-            self._draw_image_on_canvas(self.canvas_processed, self.img_processed, self.zoom_processed)
-
-    def _draw_image_on_canvas(self, canvas, img, zoom):
-        canvas.delete("all")
-        if img is None:
-            return
-        w = canvas.winfo_width()
-        h = canvas.winfo_height()
-
-        zoomed_size = (int(img.width * zoom), int(img.height * zoom))
-        img_resized = img.resize(zoomed_size, Image.LANCZOS)
-
-        photo = ImageTk.PhotoImage(img_resized)
-        canvas.image = photo  # Prevent garbage collection
-        x = (w - photo.width()) // 2
-        y = (h - photo.height()) // 2
-        canvas.create_image(x, y, image=photo, anchor=tk.NW)
-
-    def zoom(self, event, which):
-        delta = 0.1 if event.delta > 0 else -0.1
-        if which == 'original':
-            self.zoom_original = max(0.1, self.zoom_original + delta)
-        elif which == 'processed':
-            self.zoom_processed = max(0.1, self.zoom_processed + delta)
-        self.display_images()
-
-    def on_resize(self, event):
-        self.display_images()
+        self.view_original.set_image(self.img_original)
+        self.view_processed.set_image(self.img_processed)
 
 if __name__ == "__main__":
     root = tk.Tk()
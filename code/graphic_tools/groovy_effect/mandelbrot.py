@@ -1,28 +1,27 @@
-import numpy as np
 import matplotlib.pyplot as plt
+from fractal_engine import Viewport, render
 
 # Image size (pixels)
 width, height = 800, 800
 zoom = 1.5
 
-# Coordinate ranges
-x = np.linspace(-2.5, 1.5, width)
-y = np.linspace(-2.0, 2.0, height)
-X, Y = np.meshgrid(x, y)
-C = X + 1j * Y
+max_iter = 100
 
-Z = np.zeros_like(C)
-mandelbrot_set = np.zeros(C.shape, dtype=int)
 
-max_iter = 100
+def main():
+    # Coordinate ranges
+    viewport = Viewport(-2.5, 1.5, -2.0, 2.0, width, height)
+
+    # Smooth iteration counts; tiles render in parallel across processes
+    mandelbrot_set = render(viewport, max_iter=max_iter)
+
+    plt.figure(figsize=(10, 10))
+    plt.imshow(mandelbrot_set, cmap='inferno', extent=viewport.extent)
+    plt.axis('off')
+    plt.title('Mandelbrot Set')
+    plt.show()
 
-for i in range(max_iter):
-    mask = np.abs(Z) <= 2
-    Z[mask] = Z[mask] ** 2 + C[mask]
-    mandelbrot_set[mask] = i
 
-plt.figure(figsize=(10, 10))
-plt.imshow(mandelbrot_set, cmap='inferno', extent=(-2.5, 1.5, -2, 2))
-plt.axis('off')
-plt.title('Mandelbrot Set')
-plt.show()
+# The guard keeps process-pool workers from re-running the plot
+if __name__ == '__main__':
+    main()
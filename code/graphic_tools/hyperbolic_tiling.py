@@ -0,0 +1,277 @@
+"""Vectorized Poincaré-disk tilings.
+
+- projected_grid_tiling(): the Euclidean square/triangle grid of
+  hyperbolic_plane.py pushed into the disk with one tanh projection over a
+  complex array of all vertices.
+- reflection_tiling(): a true {p, q} hyperbolic tiling. The (pi/p, pi/q,
+  pi/2) fundamental triangle is reflected across its sides generation by
+  generation, all frontier triangles at once. Duplicates are dropped through
+  a spatial hash of quantized centroids, and triangles smaller than
+  min_size stop spreading.
+- rasterize_tiling(): the same {p, q} tiling per pixel. Every pixel is
+  folded back into the fundamental triangle and coloured by reflection
+  parity. There is no geometry at all, so it scales with the image size only.
+- polygons() / plot_tiling(): vertices to one matplotlib PolyCollection,
+  with edges optionally sampled along the true geodesic arcs.
+
+Example:
+    triangles, parity = reflection_tiling(7, 3)
+    plot_tiling(ax, triangles, parity)
+"""
+import math
+import numpy as np
+
+# Spatial-hash cell size; centroids within a quarter cell count as the same triangle
+HASH_CELL = 1e-8
+# Four grids shifted by half a cell per axis, so near neighbours always share a cell in one
+_HASH_SHIFTS = ((0.0, 0.0), (0.5, 0.0), (0.0, 0.5), (0.5, 0.5))
+
+
+def project_to_poincare(z, scale=4.0):
+    """Projects complex numbers (any array shape) from the Euclidean plane to the Poincaré disk."""
+    z = np.asarray(z, dtype=np.complex128)
+    magnitude = np.abs(z)
+    # tanh maps [0, inf) to [0, 1), scaling the Euclidean plane
+    factor = np.divide(np.tanh(magnitude / scale), magnitude, out=np.zeros_like(magnitude), where=magnitude > 0)
+    return z * factor
+
+
+def projected_grid_tiling(grid_size=10, scale=4.0):
+    """
+    Triangles of the projected Euclidean grid (as hyperbolic_plane.py).
+
+    Returns:
+        (N, 3) complex vertices in the disk, (N,) bool (True = black)
+    """
+    i, j = np.meshgrid(np.arange(-grid_size, grid_size), np.arange(-grid_size, grid_size), indexing='ij')
+    i, j = i.ravel(), j.ravel()
+    corner = i + 1j * j
+    center = corner + (0.5 + 0.5j)
+    corners = corner[:, None] + np.array([0, 1, 1 + 1j, 1j])[None, :]
+
+    # The 4 triangles of each square connect its centre to two adjacent corners
+    triangles = np.stack((
+        np.repeat(center, 4),
+        corners.ravel(),
+        np.roll(corners, -1, axis=1).ravel(),
+    ), axis=1)
+    square_even = np.repeat((i + j) % 2 == 0, 4)
+    triangle_even = np.tile(np.arange(4) % 2 == 0, len(i))
+    black = square_even == triangle_even
+    return project_to_poincare(triangles, scale), black
+
+
+def check_hyperbolic(p, q):
+    """Raise ValueError unless {p, q} tiles the hyperbolic plane."""
+    if p < 3 or q < 3 or (p - 2) * (q - 2) <= 4:
+        raise ValueError(f'{{{p}, {q}}} is not hyperbolic: need (p - 2)(q - 2) > 4')
+
+
+def fundamental_triangle(p, q):
+    """
+    Vertices of the (pi/p, pi/q, pi/2) triangle in the disk.
+
+    A is the centre of a p-gon (origin), B the midpoint of one of its edges
+    (on the positive real axis) and C the adjacent p-gon corner.
+    """
+    check_hyperbolic(p, q)
+    # Hyperbolic distances from the p-gon centre to an edge midpoint and a corner
+    edge = math.acosh(math.cos(math.pi / q) / math.sin(math.pi / p))
+    corner = math.acosh(1 / (math.tan(math.pi / p) * math.tan(math.pi / q)))
+    # A hyperbolic distance d sits at Euclidean radius tanh(d / 2) in the disk
+    return np.array([0j, math.tanh(edge / 2), math.tanh(corner / 2) * complex(math.cos(math.pi / p),
+                                                                             math.sin(math.pi / p))])
+
+
+def _geodesic_circle(u, v):
+    """
+    Centre and squared radius of the circle orthogonal to the unit circle
+    through u and v: the centre c solves Re(u conj c) = (|u|^2 + 1) / 2 and the
+    same for v. Returns NaN where u, v and 0 are collinear (a diameter).
+    """
+    cross = u.real * v.imag - u.imag * v.real
+    a = (np.abs(u) ** 2 + 1) / 2
+    b = (np.abs(v) ** 2 + 1) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        center = np.where(np.abs(cross) < 1e-12, np.nan,
+                          ((a * v.imag - b * u.imag) + 1j * (b * u.real - a * v.real)) / cross)
+    return center, np.abs(center) ** 2 - 1
+
+
+def _reflect(z, u, v):
+    """Reflect z across the geodesics through u and v (all arrays broadcast)."""
+    center, radius2 = _geodesic_circle(u, v)
+    line = np.isnan(center)
+    center = np.where(line, 0, center)
+    offset = z - center
+    inverted = center + radius2 / np.conj(np.where(offset == 0, 1e-300, offset))
+
+    # Diameters: reflect across the line through 0 along the longer of u, v
+    direction = np.where(np.abs(u) > np.abs(v), u, v)
+    direction = direction / np.where(np.abs(direction) == 0, 1.0, np.abs(direction))
+    mirrored = direction * direction * np.conj(z)
+    return np.where(line, mirrored, inverted)
+
+
+def centroids(triangles):
+    """
+    Interior points of (N, 3) disk triangles.
+
+    Hyperbolic triangles are straight in the Klein model, so the vertex mean
+    is taken there (a Euclidean mean in the disk can fall outside thin ones).
+    """
+    klein = 2 * triangles / (1 + np.abs(triangles) ** 2)
+    mean = klein.mean(axis=1)
+    return mean / (1 + np.sqrt(1 - np.abs(mean) ** 2))
+
+
+def _hash_keys(triangles):
+    """Spatial-hash keys of triangle centroids, one row per shifted grid."""
+    centroid = centroids(triangles)
+    scaled = np.column_stack((centroid.real, centroid.imag)) / HASH_CELL
+    keys = []
+    for dx, dy in _HASH_SHIFTS:
+        cells = np.floor(scaled + (dx, dy)).astype(np.int64)
+        keys.append(cells[:, 0] * (1 << 32) + cells[:, 1])
+    return np.array(keys)
+
+
+def reflection_tiling(p, q, min_size=2e-3, max_generations=200):
+    """
+    {p, q} tiling from reflections of the fundamental triangle.
+
+    Args:
+        p, q: Schläfli symbol ((p - 2)(q - 2) > 4)
+        min_size: triangles whose longest Euclidean edge is below this are
+            kept but not reflected further (controls depth near the rim)
+        max_generations: hard limit on reflection rounds
+
+    Returns:
+        (N, 3) complex vertices, (N,) bool reflection parity
+    """
+    frontier = fundamental_triangle(p, q)[None, :]
+    frontier_parity = np.zeros(1, dtype=bool)
+    # Reflections of generation g can only land on generations g - 1, g or g + 1,
+    # so only the two latest generations are kept for duplicate checks
+    previous_keys = np.zeros((len(_HASH_SHIFTS), 0), dtype=np.int64)
+    current_keys = _hash_keys(frontier)
+    triangles, parity = [frontier], [frontier_parity]
+    sides = [(0, 1), (1, 2), (2, 0)]
+
+    for _ in range(max_generations):
+        edges = np.abs(frontier - np.roll(frontier, -1, axis=1)).max(axis=1)
+        spread = edges >= min_size
+        frontier, frontier_parity = frontier[spread], frontier_parity[spread]
+        if len(frontier) == 0:
+            break
+
+        # Reflect every frontier triangle across each of its three sides
+        children = np.concatenate([
+            _reflect(frontier, frontier[:, i:i + 1], frontier[:, j:j + 1]) for i, j in sides
+        ])
+        child_parity = np.tile(~frontier_parity, len(sides))
+
+        # A child is a duplicate if it shares a cell with a recent triangle or
+        # an earlier child in any of the shifted grids
+        keys = _hash_keys(children)
+        known = np.concatenate((previous_keys, current_keys), axis=1)
+        duplicate = np.zeros(len(children), dtype=bool)
+        for grid in range(len(_HASH_SHIFTS)):
+            duplicate |= np.isin(keys[grid], known[grid])
+            first = np.unique(keys[grid], return_index=True)[1]
+            repeated = np.ones(len(children), dtype=bool)
+            repeated[first] = False
+            duplicate |= repeated
+        new = ~duplicate
+        frontier, frontier_parity = children[new], child_parity[new]
+        previous_keys, current_keys = current_keys, keys[:, new]
+        triangles.append(frontier)
+        parity.append(frontier_parity)
+    return np.concatenate(triangles), np.concatenate(parity)
+
+
+def fold_parity(z, p, q, max_folds=200):
+    """
+    Reflection parity of points of the disk in the {p, q} tiling.
+
+    Each point is folded back into the fundamental triangle (rotations into
+    one 2 pi / p wedge, the wedge bisector, and inversion in side BC) and the
+    reflections are counted.
+
+    Returns:
+        bool array like z (True = odd number of reflections)
+    """
+    _, b, c = fundamental_triangle(p, q)
+    center, radius2 = _geodesic_circle(b, c)
+    wedge = 2 * math.pi / p
+
+    w = np.asarray(z, dtype=np.complex128).ravel().copy()
+    odd = np.zeros(w.shape, dtype=bool)
+    active = np.arange(w.size)
+    for _ in range(max_folds):
+        if active.size == 0:
+            break
+        v = w[active]
+        # Rotate into the wedge [0, 2 pi / p): an even number of reflections
+        v = v * np.exp(-1j * wedge * np.floor(np.angle(v) / wedge))
+        # Reflect the upper half of the wedge across its bisector
+        flip = np.angle(v) > wedge / 2
+        v = np.where(flip, np.exp(1j * wedge) * np.conj(v), v)
+        # Points beyond side BC are inverted back towards the centre
+        offset = v - center
+        beyond = np.abs(offset) ** 2 < radius2
+        v = np.where(beyond, center + radius2 / np.conj(np.where(beyond, offset, 1)), v)
+        odd[active] ^= flip ^ beyond
+        w[active] = v
+        active = active[beyond]
+    return odd.reshape(np.shape(z))
+
+
+def rasterize_tiling(p, q, size=800, max_folds=200):
+    """
+    {p, q} tiling rendered per pixel by folding into the fundamental triangle.
+
+    Returns:
+        (size, size) float image: 0 / 1 by reflection parity, NaN outside the disk
+    """
+    axis = np.linspace(-1, 1, size)
+    z = axis[None, :] + 1j * axis[::-1, None]
+    inside = np.abs(z) < 1
+    image = np.full(z.shape, np.nan)
+    image[inside] = fold_parity(z[inside], p, q, max_folds)
+    return image
+
+
+def geodesic_points(u, v, samples):
+    """Points along the geodesic arcs from u to v (arrays), shape (..., samples)."""
+    u = np.asarray(u)[..., None]
+    v = np.asarray(v)[..., None]
+    # Move u to the origin, where the geodesic is a straight segment
+    target = (v - u) / (1 - np.conj(u) * v)
+    w = np.linspace(0, 1, samples) * target
+    return (w + u) / (1 + np.conj(u) * w)
+
+
+def polygons(triangles, arc_samples=1):
+    """
+    (N, vertices, 2) polygon coordinates for a PolyCollection.
+
+    With arc_samples > 1 every edge follows its geodesic arc.
+    """
+    if arc_samples <= 1:
+        points = triangles
+    else:
+        edges = geodesic_points(triangles, np.roll(triangles, -1, axis=1), arc_samples + 1)
+        points = edges[..., :-1].reshape(len(triangles), -1)
+    return np.stack((points.real, points.imag), axis=-1)
+
+
+def plot_tiling(ax, triangles, black, arc_samples=1, edgecolor='black', lw=0.2):
+    """Add all triangles to ax as one PolyCollection; returns the collection."""
+    from matplotlib.collections import PolyCollection
+
+    facecolors = np.where(np.asarray(black)[:, None], (0.0, 0.0, 0.0, 1.0), (1.0, 1.0, 1.0, 1.0))
+    collection = PolyCollection(polygons(triangles, arc_samples), facecolors=facecolors,
+                                edgecolors=edgecolor, linewidths=lw)
+    ax.add_collection(collection)
+    return collection
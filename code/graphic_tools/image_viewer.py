@@ -0,0 +1,238 @@
+"""Zoomable, pannable Tk image view shared by the graphic_tools apps.
+
+- ImagePyramid: mip-map levels (each half the size of the previous) built
+  once per image. A view at zoom z starts from the smallest level that is
+  still at least z times the original size.
+- Only the part of that level visible in the canvas is cropped and scaled,
+  so the cost follows the canvas size, not the image size.
+- ImageView: wraps a tk.Canvas. Resize events are debounced, one canvas
+  item is reused, and PhotoImages are cached per (zoom, viewport), so
+  zooming back or returning to a view does not rescale anything.
+
+Mouse wheel zooms around the cursor, dragging pans, double-click fits.
+
+Example:
+    view = ImageView(canvas)
+    view.set_image(Image.open(path))
+"""
+import math
+import tkinter as tk
+from collections import OrderedDict
+from PIL import Image, ImageTk
+
+MIN_LEVEL_SIZE = 64
+PHOTO_CACHE_SIZE = 16
+DEBOUNCE_MS = 60
+
+
+class ImagePyramid:
+    """Mip-map pyramid of a PIL image and viewport rendering (no Tk needed)."""
+
+    def __init__(self, image):
+        if image.mode not in ('L', 'RGB', 'RGBA'):
+            image = image.convert('RGBA')  # palette / bilevel images cannot be filtered
+        self.levels = [image]
+        while min(self.levels[-1].size) >= 2 * MIN_LEVEL_SIZE:
+            # reduce() is a box filter over 2x2 blocks
+            self.levels.append(self.levels[-1].reduce(2))
+
+    @property
+    def size(self):
+        return self.levels[0].size
+
+    def level_for(self, zoom):
+        """Index of the smallest level whose resolution still covers zoom."""
+        if zoom >= 1:
+            return 0
+        return min(len(self.levels) - 1, int(math.floor(math.log2(1 / zoom) + 1e-9)))
+
+    def render(self, zoom, center, viewport, resample=Image.LANCZOS):
+        """
+        Visible part of the image at a zoom.
+
+        Args:
+            zoom: display pixels per image pixel
+            center: image coordinates shown at the viewport centre
+            viewport: (width, height) of the canvas
+
+        Returns:
+            (PIL image or None, (x, y) canvas position of its top-left corner)
+        """
+        width, height = self.size
+        view_w, view_h = viewport
+        # Visible rectangle in display (zoomed image) coordinates
+        left = max(0.0, center[0] * zoom - view_w / 2)
+        top = max(0.0, center[1] * zoom - view_h / 2)
+        right = min(width * zoom, center[0] * zoom + view_w / 2)
+        bottom = min(height * zoom, center[1] * zoom + view_h / 2)
+        out_w, out_h = int(round(right - left)), int(round(bottom - top))
+        if out_w <= 0 or out_h <= 0:
+            return None, (0, 0)
+
+        index = self.level_for(zoom)
+        level = self.levels[index]
+        # Map the display rectangle onto the chosen level. reduce() rounds each
+        # dimension up on its own, so each axis gets its own scale.
+        scale_x = (level.width / width) / zoom
+        scale_y = (level.height / height) / zoom
+        box = (left * scale_x, top * scale_y,
+               min(level.width, right * scale_x), min(level.height, bottom * scale_y))
+        if zoom >= 2:
+            resample = Image.NEAREST  # show the pixels when zoomed in
+        # resize(box=...) crops and scales in one step
+        image = level.resize((out_w, out_h), resample, box=box)
+        position = (int(round(left - (center[0] * zoom - view_w / 2))),
+                    int(round(top - (center[1] * zoom - view_h / 2))))
+        return image, position
+
+
+class ImageView:
+    """
+    Tk canvas showing one image with cached, debounced zoom / pan.
+
+    Args:
+        canvas: tk.Canvas to draw on
+        fit: start each image fitted to the canvas (else at 100%)
+        upscale_fit: allow the fitted zoom to exceed 100%
+        zoom_step: wheel zoom factor
+    """
+
+    def __init__(self, canvas, fit=True, upscale_fit=False, zoom_step=1.25, min_zoom=0.02, max_zoom=32.0):
+        self.canvas = canvas
+        self.fit = fit
+        self.upscale_fit = upscale_fit
+        self.zoom_step = zoom_step
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+
+        self.pyramid = None
+        self.zoom = 1.0
+        self.center = (0.0, 0.0)
+        self._fitted = fit
+        self._photos = OrderedDict()
+        self._item = None
+        self._pending = None
+        self._drag = None
+
+        canvas.bind('<Configure>', lambda event: self.schedule_redraw())
+        canvas.bind('<MouseWheel>', self._on_wheel)
+        canvas.bind('<Button-4>', lambda event: self._zoom_at(event, self.zoom_step))
+        canvas.bind('<Button-5>', lambda event: self._zoom_at(event, 1 / self.zoom_step))
+        canvas.bind('<ButtonPress-1>', self._on_press)
+        canvas.bind('<B1-Motion>', self._on_drag)
+        canvas.bind('<Double-Button-1>', lambda event: self.fit_to_canvas())
+
+    def set_image(self, image, keep_view=False):
+        """Show a new PIL image (builds its pyramid); keep_view keeps zoom and pan."""
+        self._photos.clear()
+        if image is None:
+            self.pyramid = None
+            self.redraw()
+            return
+        same_size = self.pyramid is not None and self.pyramid.size == image.size
+        self.pyramid = ImagePyramid(image)
+        if not (keep_view and same_size):
+            if self.fit:
+                self._fitted = True
+            else:
+                self._fitted = False
+                self.zoom = 1.0
+            self.center = (image.width / 2, image.height / 2)
+        self.redraw()
+
+    def _viewport(self):
+        return max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height())
+
+    def _fit_zoom(self):
+        view_w, view_h = self._viewport()
+        width, height = self.pyramid.size
+        zoom = min(view_w / width, view_h / height)
+        return zoom if self.upscale_fit else min(1.0, zoom)
+
+    def fit_to_canvas(self):
+        if self.pyramid is None:
+            return
+        self._fitted = True
+        self.center = (self.pyramid.size[0] / 2, self.pyramid.size[1] / 2)
+        self.redraw()
+
+    def set_zoom(self, zoom, anchor=None):
+        """Zoom keeping the image point under anchor (canvas x, y) in place."""
+        if self.pyramid is None:
+            return
+        zoom = min(self.max_zoom, max(self.min_zoom, zoom))
+        if anchor is not None:
+            view_w, view_h = self._viewport()
+            # Image point under the anchor before and after the zoom
+            dx, dy = anchor[0] - view_w / 2, anchor[1] - view_h / 2
+            px = self.center[0] + dx / self.zoom
+            py = self.center[1] + dy / self.zoom
+            self.center = (px - dx / zoom, py - dy / zoom)
+        self.zoom = zoom
+        self._fitted = False
+        self._clamp_center()
+        self.redraw()
+
+    def schedule_redraw(self):
+        """Redraw once the canvas stops changing (debounced)."""
+        if self._pending is not None:
+            self.canvas.after_cancel(self._pending)
+        self._pending = self.canvas.after(DEBOUNCE_MS, self.redraw)
+
+    def redraw(self):
+        self._pending = None
+        if self.pyramid is None:
+            if self._item is not None:
+                self.canvas.delete(self._item)
+                self._item = None
+            return
+        if self._fitted:
+            self.zoom = self._fit_zoom()
+        viewport = self._viewport()
+        key = (round(self.zoom, 6), round(self.center[0], 2), round(self.center[1], 2), viewport)
+
+        cached = self._photos.get(key)
+        if cached is None:
+            image, position = self.pyramid.render(self.zoom, self.center, viewport)
+            if image is None:
+                # Nothing visible: do not leave the previous view on the canvas
+                if self._item is not None:
+                    self.canvas.delete(self._item)
+                    self._item = None
+                return
+            cached = (ImageTk.PhotoImage(image), position)
+            self._photos[key] = cached
+            if len(self._photos) > PHOTO_CACHE_SIZE:
+                self._photos.popitem(last=False)
+        else:
+            self._photos.move_to_end(key)
+
+        photo, (x, y) = cached
+        if self._item is None:
+            self._item = self.canvas.create_image(x, y, image=photo, anchor=tk.NW)
+        else:
+            self.canvas.itemconfigure(self._item, image=photo)
+            self.canvas.coords(self._item, x, y)
+
+    def _zoom_at(self, event, factor):
+        self.set_zoom(self.zoom * factor, (event.x, event.y))
+
+    def _on_wheel(self, event):
+        self._zoom_at(event, self.zoom_step if event.delta > 0 else 1 / self.zoom_step)
+
+    def _on_press(self, event):
+        self._drag = (event.x, event.y, self.center)
+
+    def _on_drag(self, event):
+        if self._drag is None or self.pyramid is None:
+            return
+        x0, y0, (cx, cy) = self._drag
+        self.center = (cx - (event.x - x0) / self.zoom, cy - (event.y - y0) / self.zoom)
+        self._fitted = False
+        self._clamp_center()
+        self.redraw()
+
+    def _clamp_center(self):
+        """Keep the view centre on the image so it cannot be panned out of sight."""
+        width, height = self.pyramid.size
+        self.center = (min(max(self.center[0], 0.0), width), min(max(self.center[1], 0.0), height))
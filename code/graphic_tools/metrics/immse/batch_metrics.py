@@ -0,0 +1,436 @@
+"""Headless batch image quality metrics (MSE, PSNR, SSIM, MS-SSIM).
+
+Compares reference/test frame pairs from two directories (matched by file
+name, or by sorted order when no names match) or two video files (matched by
+frame index) without any dialogs:
+
+- Frame pairs stream through a process pool with a bounded number of pairs
+  in flight. Directory pairs are sent as paths and decoded in the worker.
+- Each worker keeps float32 buffers per frame shape (MetricBuffers) and
+  reuses them for every pair instead of converting to float64 per call.
+- MSE and PSNR share one squared-error image, which also gives the
+  per-tile MSE/PSNR heatmap.
+- SSIM uses the same 7x7 uniform window as skimage's structural_similarity
+  (what immse.py reports). MS-SSIM uses the 5-scale Gaussian-window
+  definition of Wang et al. on luma.
+- Results go to CSV, or to Parquet when pandas/pyarrow are installed.
+
+    python batch_metrics.py refs/ encoded/ --output results.csv --metrics mse,psnr,ssim,msssim
+    python batch_metrics.py source.mp4 encoded.mp4 --output results.parquet --tile 64 --heatmaps heat/
+    python batch_metrics.py --benchmark
+"""
+import argparse
+import csv
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+
+PIXEL_MAX = 255.0
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+METRICS = ('mse', 'psnr', 'ssim', 'msssim')
+DEFAULT_METRICS = ('mse', 'psnr', 'ssim')
+
+# SSIM constants (data range 255, as skimage infers for uint8)
+SSIM_WINDOW = 7
+C1 = (0.01 * PIXEL_MAX) ** 2
+C2 = (0.03 * PIXEL_MAX) ** 2
+# MS-SSIM (Wang, Simoncelli & Bovik 2003)
+MS_SSIM_WEIGHTS = (0.0448, 0.2856, 0.3001, 0.2363, 0.1333)
+MS_SSIM_WINDOW = 11
+MS_SSIM_SIGMA = 1.5
+
+
+def load_image(path):
+    """RGB uint8 image (as immse.load_image)."""
+    image = cv2.imread(path)
+    if image is None:
+        raise ValueError(f'cannot read image: {path}')
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def psnr_from_mse(mse):
+    if mse == 0:
+        return float('inf')
+    return 20 * math.log10(PIXEL_MAX / math.sqrt(mse))
+
+
+class MetricBuffers:
+    """Per-shape float32 scratch buffers, reused across frame pairs."""
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, shape, count):
+        buffers = self._buffers.get(shape)
+        if buffers is None or len(buffers) < count:
+            buffers = [np.empty(shape, dtype=np.float32) for _ in range(count)]
+            self._buffers[shape] = buffers
+        return buffers
+
+    def load(self, reference, test):
+        """Copy a uint8 pair into the two float32 input buffers."""
+        ref, tst = self.get(reference.shape, 9)[:2]
+        np.copyto(ref, reference, casting='unsafe')
+        np.copyto(tst, test, casting='unsafe')
+        return ref, tst
+
+
+def squared_error(ref, tst, out):
+    """(ref - tst)^2 into out; the one intermediate behind MSE, PSNR and heatmaps."""
+    np.subtract(ref, tst, out=out)
+    np.multiply(out, out, out=out)
+    return out
+
+
+def tile_heatmap(sq_error, tile):
+    """
+    Per-tile MSE and PSNR of a squared-error image.
+
+    Returns:
+        (mse, psnr) arrays of shape (ceil(H / tile), ceil(W / tile))
+    """
+    err = sq_error.mean(axis=2) if sq_error.ndim == 3 else sq_error
+    h, w = err.shape
+    rows, cols = -(-h // tile), -(-w // tile)
+    sums = np.add.reduceat(np.add.reduceat(err, np.arange(0, h, tile), axis=0, dtype=np.float64),
+                           np.arange(0, w, tile), axis=1)
+    heights = np.minimum(tile, h - np.arange(rows) * tile)
+    widths = np.minimum(tile, w - np.arange(cols) * tile)
+    mse = sums / (heights[:, None] * widths[None, :])
+    with np.errstate(divide='ignore'):
+        psnr = 20 * np.log10(PIXEL_MAX / np.sqrt(mse))
+    return mse, psnr
+
+
+def ssim_map(x, y, scratch, window=SSIM_WINDOW, gaussian=False, sigma=MS_SSIM_SIGMA):
+    """
+    SSIM and contrast-structure maps of two float32 images.
+
+    With the default uniform window this matches skimage's
+    structural_similarity (sample covariance, data range 255).
+
+    Args:
+        scratch: five float32 arrays shaped like x (overwritten)
+
+    Returns:
+        (ssim_map, cs_map) views into scratch
+    """
+    mu_x, mu_y, xx, yy, xy = scratch
+    if gaussian:
+        def blur(src, dst):
+            return cv2.GaussianBlur(src, (window, window), sigma, dst=dst, borderType=cv2.BORDER_REFLECT)
+        cov_norm = 1.0
+    else:
+        def blur(src, dst):
+            return cv2.boxFilter(src, -1, (window, window), dst=dst, borderType=cv2.BORDER_REFLECT)
+        n = window * window
+        cov_norm = n / (n - 1.0)
+
+    np.multiply(x, x, out=xx)
+    np.multiply(y, y, out=yy)
+    np.multiply(x, y, out=xy)
+    blur(x, mu_x)
+    blur(y, mu_y)
+    blur(xx, xx)
+    blur(yy, yy)
+    blur(xy, xy)
+
+    # Variances and covariance in place: E[xx] - mu_x^2, ...
+    xx -= mu_x * mu_x
+    yy -= mu_y * mu_y
+    xy -= mu_x * mu_y
+    xx *= cov_norm
+    yy *= cov_norm
+    xy *= cov_norm
+
+    # cs = (2 cov + C2) / (var_x + var_y + C2), kept in xy
+    xy *= 2
+    xy += C2
+    xx += yy
+    xx += C2
+    np.divide(xy, xx, out=xy)
+    # luminance = (2 mu_x mu_y + C1) / (mu_x^2 + mu_y^2 + C1), kept in yy
+    np.multiply(mu_x, mu_y, out=yy)
+    yy *= 2
+    yy += C1
+    np.multiply(mu_x, mu_x, out=mu_x)
+    mu_x += mu_y * mu_y
+    mu_x += C1
+    np.divide(yy, mu_x, out=yy)
+    yy *= xy
+    return yy, xy
+
+
+def ssim(ref, tst, scratch):
+    """Mean SSIM over channels, borders cropped like skimage."""
+    ssim_values, _ = ssim_map(ref, tst, scratch)
+    pad = (SSIM_WINDOW - 1) // 2
+    return float(ssim_values[pad:-pad, pad:-pad].mean(dtype=np.float64))
+
+
+def _luma(image):
+    if image.ndim == 2:
+        return image
+    return image @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def ms_ssim(ref, tst, weights=MS_SSIM_WEIGHTS):
+    """
+    Multi-scale SSIM on luma (Gaussian 11x11 window, sigma 1.5).
+
+    Scales that would make the image smaller than the window are dropped
+    and the remaining weights renormalized.
+    """
+    x, y = _luma(ref), _luma(tst)
+    scales = len(weights)
+    while scales > 1 and min(x.shape) / 2 ** (scales - 1) < MS_SSIM_WINDOW:
+        scales -= 1
+    weights = np.asarray(weights[:scales]) / sum(weights[:scales])
+
+    values = []
+    for scale in range(scales):
+        scratch = [np.empty_like(x) for _ in range(5)]
+        ssim_values, cs_values = ssim_map(x, y, scratch, MS_SSIM_WINDOW, gaussian=True)
+        if scale == scales - 1:
+            values.append(float(ssim_values.mean(dtype=np.float64)))
+        else:
+            values.append(float(cs_values.mean(dtype=np.float64)))
+            # 2x2 average then subsample
+            x = cv2.resize(x, (x.shape[1] // 2, x.shape[0] // 2), interpolation=cv2.INTER_AREA)
+            y = cv2.resize(y, (y.shape[1] // 2, y.shape[0] // 2), interpolation=cv2.INTER_AREA)
+    return float(np.prod(np.maximum(values, 0.0) ** weights))
+
+
+def compare_frames(reference, test, metrics=DEFAULT_METRICS, tile=None, buffers=None):
+    """
+    Metrics of one uint8 frame pair.
+
+    The test frame is resized to the reference size when shapes differ
+    (as immse.py does).
+
+    Returns:
+        dict of metric values; 'heatmap' holds the per-tile PSNR when tile is set
+    """
+    if reference.shape != test.shape:
+        test = cv2.resize(test, (reference.shape[1], reference.shape[0]))
+    buffers = buffers or MetricBuffers()
+    ref, tst = buffers.load(reference, test)
+    scratch = buffers.get(reference.shape, 9)[2:]
+    result = {}
+
+    if 'mse' in metrics or 'psnr' in metrics or tile:
+        sq_error = squared_error(ref, tst, scratch[0])
+        mse = float(sq_error.mean(dtype=np.float64))
+        if 'mse' in metrics:
+            result['mse'] = mse
+        if 'psnr' in metrics:
+            result['psnr'] = psnr_from_mse(mse)
+        if tile:
+            _, result['heatmap'] = tile_heatmap(sq_error, tile)
+    if 'ssim' in metrics:
+        result['ssim'] = ssim(ref, tst, scratch[1:6])
+    if 'msssim' in metrics:
+        result['msssim'] = ms_ssim(ref, tst)
+    return result
+
+
+def _is_video(path):
+    return os.path.isfile(path) and not path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _image_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def read_video(path):
+    """Yield RGB uint8 frames of a video file."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f'cannot open video: {path}')
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    finally:
+        capture.release()
+
+
+def frame_pairs(reference, test):
+    """
+    Yield (name, reference, test) pairs; entries are paths for directories
+    and decoded frames for videos.
+    """
+    if _is_video(reference) or _is_video(test):
+        ref_frames = read_video(reference) if _is_video(reference) else (
+            load_image(os.path.join(reference, n)) for n in _image_files(reference))
+        test_frames = read_video(test) if _is_video(test) else (
+            load_image(os.path.join(test, n)) for n in _image_files(test))
+        for index, (ref, tst) in enumerate(zip(ref_frames, test_frames)):
+            yield f'{index:06d}', ref, tst
+        return
+
+    if os.path.isfile(reference):
+        yield os.path.basename(test), reference, test
+        return
+
+    ref_names = _image_files(reference)
+    test_names = _image_files(test)
+    test_by_stem = {os.path.splitext(n)[0]: n for n in test_names}
+    matched = [(n, test_by_stem[os.path.splitext(n)[0]]) for n in ref_names
+               if os.path.splitext(n)[0] in test_by_stem]
+    if not matched:
+        # No common names: pair the frames in sorted order
+        matched = list(zip(ref_names, test_names))
+    for ref_name, test_name in matched:
+        yield test_name, os.path.join(reference, ref_name), os.path.join(test, test_name)
+
+
+_worker_buffers = MetricBuffers()
+
+
+def _compare_task(task):
+    """Worker: load (if needed) and compare one pair with this process's buffers."""
+    index, name, reference, test, metrics, tile = task
+    if isinstance(reference, str):
+        reference = load_image(reference)
+    if isinstance(test, str):
+        test = load_image(test)
+    result = compare_frames(reference, test, metrics, tile, _worker_buffers)
+    return index, name, result
+
+
+def compare_batch(pairs, metrics=DEFAULT_METRICS, tile=None, workers=None, in_flight=None):
+    """
+    Yield (name, metrics dict) for frame pairs, in input order.
+
+    Args:
+        pairs: iterable of (name, reference, test) (paths or uint8 arrays)
+        metrics: subset of METRICS
+        tile: heatmap tile size in pixels (None for no heatmaps)
+        workers: process count (default: CPU count; 1 runs in-process)
+        in_flight: pairs submitted ahead of the results (bounds memory)
+    """
+    metrics = tuple(metrics)
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f'unknown metrics: {sorted(unknown)}')
+    tasks = ((i, name, ref, tst, metrics, tile) for i, (name, ref, tst) in enumerate(pairs))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for task in tasks:
+            _, name, result = _compare_task(task)
+            yield name, result
+        return
+
+    in_flight = in_flight or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_compare_task, task))
+            if len(pending) >= in_flight:
+                _, name, result = pending.popleft().result()
+                yield name, result
+        while pending:
+            _, name, result = pending.popleft().result()
+            yield name, result
+
+
+def write_results(path, rows, metrics):
+    """Write result rows to CSV, or Parquet for a .parquet path (needs pandas + pyarrow)."""
+    columns = ['name'] + [m for m in METRICS if m in metrics]
+    if path.endswith('.parquet'):
+        import pandas as pd  # optional dependency
+        pd.DataFrame(rows, columns=columns).to_parquet(path, index=False)
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_heatmap(path, heatmap, size, max_db=60.0):
+    """Colour-mapped per-tile PSNR image (red = low PSNR), scaled to size (w, h)."""
+    normalized = np.clip(np.nan_to_num(heatmap, posinf=max_db) / max_db, 0, 1)
+    image = cv2.applyColorMap((255 * (1 - normalized)).astype(np.uint8), cv2.COLORMAP_JET)
+    cv2.imwrite(path, cv2.resize(image, size, interpolation=cv2.INTER_NEAREST))
+
+
+def benchmark(width=1920, height=1080, frames=16, workers=None, metrics=DEFAULT_METRICS):
+    """Frames per second of the legacy immse.py functions and of this engine."""
+    from immse import immse, psnr, ssim as legacy_ssim
+
+    rng = np.random.default_rng(0)
+    reference = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    noise = rng.integers(-8, 9, reference.shape)
+    test = np.clip(reference.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        immse(reference, test)
+        psnr(reference, test)
+        legacy_ssim(reference, test)
+    legacy = frames / (time.perf_counter() - start)
+
+    pairs = ((f'{i:06d}', reference, test) for i in range(frames))
+    start = time.perf_counter()
+    for _ in compare_batch(pairs, metrics, workers=1):
+        pass
+    single = frames / (time.perf_counter() - start)
+
+    pairs = ((f'{i:06d}', reference, test) for i in range(frames))
+    start = time.perf_counter()
+    for _ in compare_batch(pairs, metrics, workers=workers):
+        pass
+    pooled = frames / (time.perf_counter() - start)
+
+    print(f'{width}x{height}, {frames} frames, metrics {",".join(metrics)}')
+    print(f'  immse.py functions:      {legacy:7.2f} frames/s')
+    print(f'  engine, 1 process:       {single:7.2f} frames/s')
+    print(f'  engine, {workers or os.cpu_count()} process(es):    {pooled:7.2f} frames/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch image quality metrics.')
+    parser.add_argument('reference', nargs='?', help='reference directory, image or video')
+    parser.add_argument('test', nargs='?', help='test directory, image or video')
+    parser.add_argument('--output', default='metrics.csv', help='.csv or .parquet')
+    parser.add_argument('--metrics', default=','.join(DEFAULT_METRICS))
+    parser.add_argument('--tile', type=int, help='per-tile PSNR heatmap tile size')
+    parser.add_argument('--heatmaps', help='directory for heatmap PNGs (needs --tile)')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args()
+    metrics = tuple(m.strip() for m in args.metrics.split(','))
+
+    if args.benchmark:
+        benchmark(workers=args.workers, metrics=metrics)
+        return
+    if not args.reference or not args.test:
+        parser.error('reference and test are required')
+    if args.heatmaps:
+        os.makedirs(args.heatmaps, exist_ok=True)
+
+    rows = []
+    start = time.perf_counter()
+    for name, result in compare_batch(frame_pairs(args.reference, args.test), metrics, args.tile, args.workers):
+        heatmap = result.pop('heatmap', None)
+        if heatmap is not None and args.heatmaps:
+            stem = os.path.splitext(name)[0]
+            save_heatmap(os.path.join(args.heatmaps, f'{stem}_psnr.png'), heatmap,
+                         (heatmap.shape[1] * args.tile, heatmap.shape[0] * args.tile))
+        rows.append({'name': name, **result})
+    elapsed = time.perf_counter() - start
+
+    write_results(args.output, rows, metrics)
+    print(f'{len(rows)} pairs in {elapsed:.2f}s ({len(rows) / max(elapsed, 1e-9):.1f} pairs/s) -> {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""Per-frame quality comparison of two videos (e.g. source vs remote-display capture).
+
+Each video is decoded by its own reader thread straight into a FrameRing:
+a bounded ring of preallocated NumPy frames, so memory stays the same
+however long the videos are. The main thread pairs frames by index or by
+timestamp (with an optional capture offset and tolerance, dropping
+unmatched frames). For each pair it computes PSNR, SSIM and the immse.py QP
+estimate, streams the row to CSV and keeps running summaries.
+
+    python video_compare.py source.mp4 capture.mp4 --align timestamp --offset-ms 120 --output frames.csv
+"""
+import argparse
+import csv
+import math
+import threading
+import time
+import cv2
+import numpy as np
+from batch_metrics import MetricBuffers, compare_frames
+from immse import estimate_qp
+
+RING_FRAMES = 8
+# PSNR of identical frames is infinite; summaries use this cap instead
+PSNR_CAP = 100.0
+
+
+class FrameRing:
+    """
+    Single-producer / single-consumer ring of preallocated frames.
+
+    The producer writes into slot() and then commit()s it; the consumer
+    peek()s the oldest frame and release()s it when done. Both block while
+    the ring is full / empty.
+    """
+
+    def __init__(self, shape, capacity=RING_FRAMES, dtype=np.uint8):
+        self.frames = np.empty((capacity,) + tuple(shape), dtype=dtype)
+        self.timestamps = np.zeros(capacity)
+        self.capacity = capacity
+        self._head = 0  # next slot to read
+        self._count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def slot(self):
+        """Frame buffer to decode into next (blocks while the ring is full)."""
+        with self._cond:
+            while self._count == self.capacity and not self._closed:
+                self._cond.wait()
+            return self.frames[(self._head + self._count) % self.capacity]
+
+    def commit(self, timestamp):
+        with self._cond:
+            self.timestamps[(self._head + self._count) % self.capacity] = timestamp
+            self._count += 1
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """No more frames (end of stream or consumer stopped)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def peek(self):
+        """(frame, timestamp) of the oldest frame, or None at the end of the stream."""
+        with self._cond:
+            while self._count == 0 and not self._closed:
+                self._cond.wait()
+            if self._count == 0:
+                return None
+            return self.frames[self._head], self.timestamps[self._head]
+
+    def release(self):
+        """Give the oldest frame's slot back to the producer."""
+        with self._cond:
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self._cond.notify_all()
+
+
+class VideoReader(threading.Thread):
+    """Decodes a video into a FrameRing on a background thread."""
+
+    def __init__(self, path, capacity=RING_FRAMES):
+        super().__init__(daemon=True)
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise ValueError(f'cannot open video: {path}')
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 0.0
+        ok, first = self.capture.read()
+        if not ok:
+            raise ValueError(f'no frames in video: {path}')
+        self._first = (first, self.capture.get(cv2.CAP_PROP_POS_MSEC))
+        self.ring = FrameRing(first.shape, capacity)
+        self.frames_read = 0
+        self.error = None
+
+    def _timestamp(self, reported):
+        # Some containers report 0 for every frame; fall back to index / fps
+        if reported > 0 or self.frames_read == 0 or not self.fps:
+            return reported
+        return 1000.0 * self.frames_read / self.fps
+
+    def run(self):
+        try:
+            frame, reported = self._first
+            slot = self.ring.slot()
+            slot[...] = frame
+            self.ring.commit(self._timestamp(reported))
+            self.frames_read = 1
+            self._first = None
+            while not self.ring.closed:
+                if not self.capture.grab():
+                    break
+                slot = self.ring.slot()
+                if self.ring.closed:
+                    break
+                # Decode straight into the preallocated slot (BGR order is fine for PSNR/SSIM)
+                ok, decoded = self.capture.retrieve(slot)
+                if not ok:
+                    break
+                if decoded is not slot and decoded.shape == slot.shape:
+                    slot[...] = decoded
+                self.ring.commit(self._timestamp(self.capture.get(cv2.CAP_PROP_POS_MSEC)))
+                self.frames_read += 1
+        except Exception as e:  # surfaced by compare_videos
+            self.error = e
+        finally:
+            self.capture.release()
+            self.ring.close()
+
+
+class RunningStats:
+    """Streaming mean / std / min / max (Welford)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / self.count) if self.count else 0.0
+
+    def __str__(self):
+        return f'mean {self.mean:.3f} std {self.std:.3f} min {self.min:.3f} max {self.max:.3f}'
+
+
+def aligned_pairs(reference, test, align='index', offset_ms=0.0, tolerance_ms=None, stats=None):
+    """
+    Yield (index, ref_frame, test_frame, ref_ms, test_ms) from two FrameRings.
+
+    Frames are views into the rings and are released when the next pair is
+    requested, so use them before advancing.
+
+    Args:
+        align: 'index' pairs frames in order; 'timestamp' pairs frames whose
+            times (test shifted by -offset_ms) are within tolerance_ms and
+            drops the unmatched ones
+        tolerance_ms: default half a frame interval (20 ms if unknown)
+        stats: optional dict, receives 'dropped_reference' / 'dropped_test' counts
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('dropped_reference', 0)
+    stats.setdefault('dropped_test', 0)
+    tolerance_ms = 20.0 if tolerance_ms is None else tolerance_ms
+    index = 0
+    while True:
+        ref_item = reference.peek()
+        test_item = test.peek()
+        if ref_item is None or test_item is None:
+            return
+        (ref_frame, ref_ms), (test_frame, test_ms) = ref_item, test_item
+
+        if align == 'timestamp':
+            delta = (test_ms - offset_ms) - ref_ms
+            if delta < -tolerance_ms:
+                test.release()
+                stats['dropped_test'] += 1
+                continue
+            if delta > tolerance_ms:
+                reference.release()
+                stats['dropped_reference'] += 1
+                continue
+
+        yield index, ref_frame, test_frame, ref_ms, test_ms
+        index += 1
+        reference.release()
+        test.release()
+
+
+def compare_videos(reference_path, test_path, align='index', offset_ms=0.0, tolerance_ms=None,
+                   capacity=RING_FRAMES, output=None, report_every=100, max_frames=None):
+    """
+    Compare two videos frame by frame.
+
+    Returns:
+        dict with RunningStats for 'psnr', 'ssim', 'qp' and 'mse', plus the
+        pair count and dropped-frame counts
+    """
+    readers = [VideoReader(reference_path, capacity), VideoReader(test_path, capacity)]
+    if tolerance_ms is None:
+        fps = max(reader.fps for reader in readers)
+        tolerance_ms = 500.0 / fps if fps else 20.0
+    for reader in readers:
+        reader.start()
+
+    buffers = MetricBuffers()
+    summary = {name: RunningStats() for name in ('mse', 'psnr', 'ssim', 'qp')}
+    counts = {}
+    csv_file = open(output, 'w', newline='', encoding='utf-8') if output else None
+    writer = csv.writer(csv_file) if csv_file else None
+    if writer:
+        writer.writerow(['frame', 'reference_ms', 'test_ms', 'mse', 'psnr', 'ssim', 'qp'])
+
+    start = time.perf_counter()
+    pairs = 0
+    try:
+        for index, ref, tst, ref_ms, test_ms in aligned_pairs(
+                readers[0].ring, readers[1].ring, align, offset_ms, tolerance_ms, counts):
+            result = compare_frames(ref, tst, ('mse', 'psnr', 'ssim'), buffers=buffers)
+            result['qp'] = float(estimate_qp(result['mse']))
+            for name, stats in summary.items():
+                stats.add(min(result[name], PSNR_CAP) if name == 'psnr' else result[name])
+            if writer:
+                writer.writerow([index, f'{ref_ms:.1f}', f'{test_ms:.1f}', f'{result["mse"]:.4f}',
+                                 f'{result["psnr"]:.3f}', f'{result["ssim"]:.5f}', f'{result["qp"]:.2f}'])
+            pairs += 1
+            if report_every and pairs % report_every == 0:
+                rate = pairs / (time.perf_counter() - start)
+                print(f'{pairs} frames ({rate:.1f}/s)  PSNR {summary["psnr"].mean:.2f} dB  '
+                      f'SSIM {summary["ssim"].mean:.4f}  QP {summary["qp"].mean:.1f}')
+            if max_frames and pairs >= max_frames:
+                break
+    finally:
+        for reader in readers:
+            reader.ring.close()
+        for reader in readers:
+            reader.join()
+        if csv_file:
+            csv_file.close()
+
+    for reader in readers:
+        if reader.error:
+            raise reader.error
+    return {**summary, 'pairs': pairs, **counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-frame PSNR / SSIM / QP comparison of two videos.')
+    parser.add_argument('reference')
+    parser.add_argument('test')
+    parser.add_argument('--align', choices=('index', 'timestamp'), default='index')
+    parser.add_argument('--offset-ms', type=float, default=0.0, help='capture delay of the test video')
+    parser.add_argument('--tolerance-ms', type=float, help='timestamp match window (default: half a frame)')
+    parser.add_argument('--buffer', type=int, default=RING_FRAMES, help='decoded frames per ring')
+    parser.add_argument('--output', help='per-frame CSV')
+    parser.add_argument('--max-frames', type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = compare_videos(args.reference, args.test, args.align, args.offset_ms, args.tolerance_ms,
+                            args.buffer, args.output, max_frames=args.max_frames)
+    elapsed = time.perf_counter() - start
+    print(f'{result["pairs"]} frame pairs in {elapsed:.2f}s '
+          f'(dropped: {result["dropped_reference"]} reference, {result["dropped_test"]} test)')
+    for name in ('psnr', 'ssim', 'qp', 'mse'):
+        print(f'  {name.upper():5} {result[name]}')
+
+
+if __name__ == '__main__':
+    main()
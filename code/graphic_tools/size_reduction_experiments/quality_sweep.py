@@ -0,0 +1,167 @@
+"""In-memory lossy encoding and quality sweeps (rate-distortion curves).
+
+- encode() writes JPEG / WebP / AVIF into a BytesIO, never to disk.
+- sweep() encodes a range of quality levels for every available format in
+  parallel threads (Pillow's encoders release the GIL). Each result is
+  decoded again and measured: size, bits per pixel, PSNR and SSIM (SSIM
+  needs scikit-image).
+- plot_rd() draws size against PSNR and SSIM, one line per format.
+
+AVIF is used when Pillow was built with it (Pillow >= 11) or the
+pillow-avif-plugin package is installed.
+
+    python quality_sweep.py photo.png --plot
+"""
+import argparse
+import io
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, features
+
+QUALITIES = tuple(range(10, 96, 5))
+FORMATS = ('JPEG', 'WEBP', 'AVIF')
+
+
+def available_formats():
+    """Lossy formats this Pillow can encode, in FORMATS order."""
+    try:
+        import pillow_avif  # noqa: F401  (optional plugin registers AVIF)
+    except ImportError:
+        pass
+    Image.init()  # registers every built-in encoder in Image.SAVE
+    available = []
+    for name in FORMATS:
+        if name == 'WEBP' and not features.check('webp'):
+            continue
+        if name in Image.SAVE:
+            available.append(name)
+    return available
+
+
+def encode(image, quality, format='JPEG'):
+    """Encode an image in memory; returns the file bytes."""
+    buffer = io.BytesIO()
+    image = image.convert('RGB')
+    if format == 'JPEG':
+        image.save(buffer, 'JPEG', quality=quality, optimize=True)
+    else:
+        image.save(buffer, format, quality=quality)
+    return buffer.getvalue()
+
+
+def decode(data):
+    """Decode encoded bytes to an RGB PIL image (fully loaded)."""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image.convert('RGB')
+
+
+def psnr(reference, test):
+    mse = np.mean((reference.astype(np.float32) - test.astype(np.float32)) ** 2, dtype=np.float64)
+    if mse == 0:
+        return float('inf')
+    return 10 * math.log10(255.0 ** 2 / mse)
+
+
+def ssim(reference, test):
+    """SSIM as immse.py computes it, or None without scikit-image."""
+    try:
+        from skimage.metrics import structural_similarity
+    except ImportError:
+        return None
+    return float(structural_similarity(reference, test, channel_axis=-1))
+
+
+def measure(reference, data, with_ssim=True):
+    """Size and quality of one encoding against the reference array."""
+    test = np.asarray(decode(data))
+    return {
+        'bytes': len(data),
+        'bpp': 8.0 * len(data) / (reference.shape[0] * reference.shape[1]),
+        'psnr': psnr(reference, test),
+        'ssim': ssim(reference, test) if with_ssim else None,
+    }
+
+
+def sweep(image, formats=None, qualities=QUALITIES, workers=None, with_ssim=True):
+    """
+    Encode every (format, quality) in parallel and measure it.
+
+    Returns:
+        list of dicts (format, quality, bytes, bpp, psnr, ssim), sorted by
+        format order then quality
+    """
+    image = image.convert('RGB')
+    reference = np.asarray(image)
+    formats = formats or available_formats()
+    jobs = [(name, quality) for name in formats for quality in qualities]
+
+    def run(job):
+        name, quality = job
+        return {'format': name, 'quality': quality, **measure(reference, encode(image, quality, name), with_ssim)}
+
+    with ThreadPoolExecutor(max_workers=workers or min(len(jobs), (os.cpu_count() or 1) * 2)) as pool:
+        return list(pool.map(run, jobs))
+
+
+def plot_rd(results, fig=None):
+    """
+    Size (KB) against PSNR and SSIM, one line per format.
+
+    Every point is pickable: artist.results[index] is its result dict.
+    Returns the figure.
+    """
+    if fig is None:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(10, 4.5))
+    has_ssim = any(r['ssim'] is not None for r in results)
+    axes = fig.subplots(1, 2 if has_ssim else 1, squeeze=False)[0]
+    metrics = [('psnr', 'PSNR (dB)'), ('ssim', 'SSIM')][:len(axes)]
+
+    for ax, (metric, label) in zip(axes, metrics):
+        for name in dict.fromkeys(r['format'] for r in results):
+            rows = [r for r in results if r['format'] == name and r[metric] is not None]
+            sizes = [r['bytes'] / 1024 for r in rows]
+            values = [min(r[metric], 100.0) for r in rows]
+            (line,) = ax.plot(sizes, values, 'o-', markersize=4, label=name, picker=5)
+            line.results = rows
+            # Label a few quality levels along each curve
+            for r, x, y in zip(rows, sizes, values):
+                if r['quality'] % 20 == 10 or r['quality'] == rows[-1]['quality']:
+                    ax.annotate(f"q{r['quality']}", (x, y), textcoords='offset points', xytext=(4, -10), fontsize=7)
+        ax.set_xlabel('Size (KB)')
+        ax.set_ylabel(label)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quality sweep / rate-distortion curve of an image.')
+    parser.add_argument('image')
+    parser.add_argument('--formats', help=f'comma separated, from {",".join(FORMATS)}')
+    parser.add_argument('--no-ssim', action='store_true')
+    parser.add_argument('--plot', action='store_true')
+    args = parser.parse_args()
+
+    image = Image.open(args.image)
+    formats = args.formats.upper().split(',') if args.formats else None
+    start = time.perf_counter()
+    results = sweep(image, formats, with_ssim=not args.no_ssim)
+    print(f'{len(results)} encodings in {time.perf_counter() - start:.2f}s')
+    for r in results:
+        ssim_text = f"  SSIM {r['ssim']:.4f}" if r['ssim'] is not None else ''
+        print(f"{r['format']:5} q{r['quality']:<3} {r['bytes'] / 1024:8.1f} KB  {r['bpp']:.3f} bpp  "
+              f"PSNR {r['psnr']:6.2f} dB{ssim_text}")
+    if args.plot:
+        import matplotlib.pyplot as plt
+        plot_rd(results)
+        plt.show()
+
+
+if __name__ == '__main__':
+    main()
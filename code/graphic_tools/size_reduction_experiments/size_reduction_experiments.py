@@ -1,7 +1,60 @@
 import tkinter as tk
 from tkinter import filedialog, ttk
-from PIL import Image, ImageTk
+from PIL import Image
 import os
+import queue
+import sys
+import threading
+
+# The shared zoomable image view lives in graphic_tools/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from image_viewer import ImageView  # noqa: E402
+from quality_sweep import available_formats, decode, encode, plot_rd, sweep  # noqa: E402
+
+POLL_MS = 30
+EXTENSIONS = {'JPEG': '.jpg', 'WEBP': '.webp', 'AVIF': '.avif'}
+
+
+class EncoderThread(threading.Thread):
+    """
+    Encodes the latest requested (format, quality) in the background.
+
+    Only the newest request is kept: slider positions passed while an
+    encoding runs are skipped, and results older than the newest request
+    are dropped before they reach the UI.
+    """
+
+    def __init__(self, results):
+        super().__init__(daemon=True)
+        self.results = results
+        self._request = None
+        self._generation = 0
+        self._cond = threading.Condition()
+
+    def submit(self, image, quality, format):
+        with self._cond:
+            self._generation += 1
+            self._request = (self._generation, image, quality, format)
+            self._cond.notify()
+
+    def is_current(self, generation):
+        return generation == self._generation
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._request is None:
+                    self._cond.wait()
+                generation, image, quality, format = self._request
+                self._request = None
+            try:
+                data = encode(image, quality, format)
+                if self.is_current(generation):
+                    self.results.put((generation, quality, format, data, decode(data), None))
+            except Exception as e:
+                # Keep the thread alive; the UI reports the failure
+                self.results.put((generation, quality, format, None, None, e))
+
 
 class ImageCompressionApp:
     def __init__(self, root):
@@ -9,10 +62,19 @@ class ImageCompressionApp:
         self.root.title("Image Compression UI")
 
         self.original_img = None
+        self.rgb_img = None
         self.compressed_img = None
+        self.compressed_data = None
+        self.compressed_format = None
         self.image_path = None
 
+        self.results = queue.Queue()
+        self.sweep_results = queue.Queue()
+        self.encoder = EncoderThread(self.results)
+        self.encoder.start()
+
         self.setup_ui()
+        self.root.after(POLL_MS, self.poll_results)
 
     def setup_ui(self):
         control_frame = ttk.Frame(self.root)
@@ -21,10 +83,22 @@ class ImageCompressionApp:
         ttk.Button(control_frame, text="Load Image", command=self.load_image).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Save Compressed Image", command=self.save_image).pack(side=tk.LEFT, padx=5)
 
+        self.format_var = tk.StringVar(value='JPEG')
+        format_box = ttk.Combobox(control_frame, textvariable=self.format_var, values=available_formats(),
+                                  state='readonly', width=6)
+        format_box.pack(side=tk.LEFT, padx=5)
+        format_box.bind('<<ComboboxSelected>>', self.update_compression)
+
         self.quality_slider = ttk.Scale(control_frame, from_=10, to=95, orient=tk.HORIZONTAL, command=self.update_compression)
         self.quality_slider.set(75)
         self.quality_slider.pack(side=tk.LEFT, padx=5)
 
+        self.sweep_button = ttk.Button(control_frame, text="Quality Sweep", command=self.run_sweep)
+        self.sweep_button.pack(side=tk.LEFT, padx=5)
+
+        self.info_label = ttk.Label(control_frame, text="")
+        self.info_label.pack(side=tk.LEFT, padx=5)
+
         self.canvas_frame = ttk.Frame(self.root)
         self.canvas_frame.pack(fill=tk.BOTH, expand=True)
 
@@ -34,44 +108,104 @@ class ImageCompressionApp:
         self.compressed_canvas = tk.Canvas(self.canvas_frame, bg='gray')
         self.compressed_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        self.original_canvas.bind('<Configure>', lambda event: self.resize_canvas(event, self.original_canvas, self.original_img))
-        self.compressed_canvas.bind('<Configure>', lambda event: self.resize_canvas(event, self.compressed_canvas, self.compressed_img))
+        # Fitted (never upscaled) like a thumbnail; wheel zooms, drag pans, double-click refits
+        self.original_view = ImageView(self.original_canvas, fit=True)
+        self.compressed_view = ImageView(self.compressed_canvas, fit=True)
 
     def load_image(self):
         path = filedialog.askopenfilename()
         if path:
             self.image_path = path
             self.original_img = Image.open(path)
-            self.resize_canvas(None, self.original_canvas, self.original_img)
+            self.original_img.load()
+            # Converted once; the encoder thread only reads it
+            self.rgb_img = self.original_img.convert('RGB')
+            self.original_view.set_image(self.original_img)
             self.update_compression()
 
-    def resize_canvas(self, event, canvas, img):
-        canvas.delete("all")
-        if img:
-            canvas_width, canvas_height = canvas.winfo_width(), canvas.winfo_height()
-            img_copy = img.copy()
-            img_copy.thumbnail((canvas_width, canvas_height))
-            photo = ImageTk.PhotoImage(img_copy)
-            canvas.image = photo  # prevent garbage collection
-            canvas.create_image(canvas_width // 2, canvas_height // 2, image=photo)
-
     def update_compression(self, event=None):
         if self.original_img:
-            quality = int(self.quality_slider.get())
-            temp_path = "temp_compressed.jpg"
-            img_to_save = self.original_img.convert('RGB')
-            img_to_save.save(temp_path, 'JPEG', quality=quality, optimize=True)
-            self.compressed_img = Image.open(temp_path)
-            self.resize_canvas(None, self.compressed_canvas, self.compressed_img)
-            os.remove(temp_path)
+            self.encoder.submit(self.rgb_img, int(self.quality_slider.get()), self.format_var.get())
+
+    def poll_results(self):
+        # Show only the newest finished encoding; older ones were superseded
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None and self.encoder.is_current(latest[0]):
+            _, quality, format, data, image, error = latest
+            if error is not None:
+                self.info_label.config(text=f"{format} q{quality} failed: {error}")
+            else:
+                self.compressed_data = data
+                self.compressed_format = format
+                self.compressed_img = image
+                # Keep the zoom and pan while the quality slider moves
+                self.compressed_view.set_image(image, keep_view=True)
+                self.info_label.config(text=f"{format} q{quality}: {len(data) / 1024:.1f} KB")
+        try:
+            self.sweep_done(*self.sweep_results.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(POLL_MS, self.poll_results)
 
     def save_image(self):
-        if self.compressed_img:
-            path = filedialog.asksaveasfilename(defaultextension=".jpg", filetypes=[("JPEG files", "*.jpg"), ("All files", "*.*")])
+        if self.compressed_data:
+            extension = EXTENSIONS[self.compressed_format]
+            path = filedialog.asksaveasfilename(defaultextension=extension,
+                                                filetypes=[(f"{self.compressed_format} files", f"*{extension}"),
+                                                           ("All files", "*.*")])
             if path:
-                quality = int(self.quality_slider.get())
-                img_to_save = self.original_img.convert('RGB')
-                img_to_save.save(path, 'JPEG', quality=quality, optimize=True)
+                # The bytes on screen are the bytes saved; no re-encode
+                with open(path, 'wb') as f:
+                    f.write(self.compressed_data)
+
+    def run_sweep(self):
+        if not self.original_img:
+            return
+        self.sweep_button.config(state=tk.DISABLED)
+        self.info_label.config(text="Sweeping qualities...")
+        image = self.rgb_img
+
+        def work():
+            # Tk is not thread safe: hand the results to poll_results
+            try:
+                self.sweep_results.put((sweep(image), None))
+            except Exception as e:
+                self.sweep_results.put((None, e))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def sweep_done(self, results, error):
+        self.sweep_button.config(state=tk.NORMAL)
+        if error is not None:
+            self.info_label.config(text=f"Sweep failed: {error}")
+            return
+        self.info_label.config(text="Click a point to use its format and quality")
+        self.show_sweep(results)
+
+    def show_sweep(self, results):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # optional dependency
+        from matplotlib.figure import Figure
+
+        window = tk.Toplevel(self.root)
+        window.title("Rate-distortion: size vs quality")
+        fig = plot_rd(results, Figure(figsize=(10, 4.5)))
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        def on_pick(event):
+            row = event.artist.results[event.ind[0]]
+            self.format_var.set(row['format'])
+            self.quality_slider.set(row['quality'])
+            self.update_compression()
+
+        canvas.mpl_connect('pick_event', on_pick)
+        canvas.draw()
+
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,297 @@
+"""Shared fractal geometry builder for the ursina scenes.
+
+Builds each fractal iteratively into flat NumPy vertex / triangle arrays
+instead of one Entity per primitive:
+
+- menger_mesh(): Menger sponge (sierpinski_carpet.py) as voxels with the
+  faces between touching cubes culled.
+- tetrahedra_mesh(): Sierpinski tetrahedron (sierpinski_triangle_3d.py).
+- koch_mesh(): 2.5D Koch snowflake of boxes (koch.py).
+
+weld_vertices() merges vertices that share position (and normal / color);
+it only pays off where faces share those attributes, which is why the
+per-face colored tetrahedra and Koch boxes are left unwelded.
+to_ursina_meshes() turns the arrays into one Mesh, or a few chunked
+meshes when a scene is larger than 16-bit indices allow.
+
+Headless build timings, and optionally frame rate through ursina's
+offscreen window:
+
+    python fractal_geometry.py --depth 4
+    python fractal_geometry.py --depth 4 --fps
+"""
+import argparse
+import colorsys
+import math
+import time
+import numpy as np
+from mandelbox_voxels import split_mesh, voxel_mesh
+
+MAX_VERTICES = 65535
+
+
+def weld_vertices(vertices, triangles, *attributes, decimals=5):
+    """
+    Merge duplicate vertices.
+
+    Vertices are merged only when their position and every attribute
+    (normals, colors, ...) match, so flat shading and per-face colors survive.
+
+    Returns:
+        (vertices, triangles, *attributes) with unique vertices
+    """
+    key = np.round(np.hstack([vertices] + [np.asarray(a, dtype=np.float64) for a in attributes]), decimals)
+    _, first, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+    welded = [vertices[first], inverse.reshape(-1)[triangles].astype(np.int32)]
+    welded.extend(attribute[first] for attribute in attributes)
+    return tuple(welded)
+
+
+def menger_occupancy(depth):
+    """Boolean (3^depth)^3 grid of the cubes kept in a Menger sponge."""
+    n = 3 ** depth
+    index = np.arange(n)
+    keep = np.ones((n, n, n), dtype=bool)
+    for level in range(depth):
+        middle = (index // 3 ** level) % 3 == 1
+        ones = (middle[:, None, None].astype(np.int8) + middle[None, :, None] + middle[None, None, :])
+        # A cube is removed when two or more of its coordinates sit in the middle third
+        keep &= ones < 2
+    return keep
+
+
+def menger_mesh(center=(0.0, 0.0, 0.0), size=30.0, depth=2):
+    """Menger sponge with touching faces culled; returns (vertices, triangles, normals)."""
+    n = 3 ** depth
+    origin = np.asarray(center, dtype=np.float32) - size / 2
+    vertices, triangles, normals = voxel_mesh(menger_occupancy(depth), origin, size / n)
+    return weld_vertices(vertices, triangles, normals)
+
+
+def sierpinski_tetrahedra(v0, v1, v2, v3, depth):
+    """(4^depth, 4, 3) corner array of the leaf tetrahedra."""
+    tetra = np.array([v0, v1, v2, v3], dtype=np.float64)[None]
+    for _ in range(depth):
+        a, b, c, d = (tetra[:, i] for i in range(4))
+        m01, m02, m03 = (a + b) / 2, (a + c) / 2, (a + d) / 2
+        m12, m13, m23 = (b + c) / 2, (b + d) / 2, (c + d) / 2
+        tetra = np.stack((
+            np.stack((a, m01, m02, m03), axis=1),
+            np.stack((m01, b, m12, m13), axis=1),
+            np.stack((m02, m12, c, m23), axis=1),
+            np.stack((m03, m13, m23, d), axis=1),
+        ), axis=1).reshape(-1, 4, 3)
+    return tetra
+
+
+def tetrahedra_mesh(tetra, colors=None):
+    """
+    Flat-shaded mesh of tetrahedra.
+
+    Args:
+        tetra: (N, 4, 3) corners
+        colors: optional (N, 4) RGBA per tetrahedron
+
+    Returns:
+        vertices, triangles, normals, colors (colors is None if not given)
+    """
+    faces = np.array([(0, 1, 2), (0, 1, 3), (1, 2, 3), (2, 0, 3)])
+    corners = tetra[:, faces]  # (N, 4 faces, 3 corners, 3)
+    normal = np.cross(corners[:, :, 1] - corners[:, :, 0], corners[:, :, 2] - corners[:, :, 0])
+    # Point every normal away from the tetrahedron's centre (and wind to match)
+    outward = np.einsum('nfk,nfk->nf', normal, corners.mean(axis=2) - tetra.mean(axis=1)[:, None]) < 0
+    corners[outward] = corners[outward][:, ::-1]
+    normal[outward] *= -1
+    normal /= np.linalg.norm(normal, axis=2, keepdims=True)
+
+    vertices = corners.reshape(-1, 3).astype(np.float32)
+    triangles = np.arange(len(vertices), dtype=np.int32).reshape(-1, 3)
+    normals = np.repeat(normal.reshape(-1, 3), 3, axis=0).astype(np.float32)
+    if colors is not None:
+        # Every face has its own color, so no two vertices could be merged
+        return vertices, triangles, normals, np.repeat(np.asarray(colors, dtype=np.float32), 12, axis=0)
+    return weld_vertices(vertices, triangles, normals) + (None,)
+
+
+def koch_path(p1, p2, depth):
+    """
+    Koch curve points from p1 to p2, built iteratively.
+
+    Same construction as koch.koch_snowflake: each segment becomes four,
+    with the peak pushed out by length * sqrt(3) / 6 of the middle third.
+    """
+    points = np.array([p1, p2], dtype=np.float64)
+    for _ in range(depth):
+        start, end = points[:-1], points[1:]
+        delta = end - start
+        a = start + delta / 3
+        b = start + 2 * delta / 3
+        peak = (a + b) / 2 + np.stack((delta[:, 1], -delta[:, 0]), axis=1) * (math.sqrt(3) / 18)
+        middle = np.stack((a, peak, b), axis=1).reshape(-1, 2)
+        points = np.insert(middle, np.arange(0, len(middle), 3), start, axis=0)
+        points = np.vstack((points, end[-1:]))
+    return points
+
+
+def koch_snowflake_path(size, depth):
+    """Closed snowflake outline (as koch.generate_snowflake_2_5d)."""
+    h = size * math.sqrt(3) / 2
+    p1 = (-size / 2, -h / 3)
+    p2 = (size / 2, -h / 3)
+    p3 = (0, 2 * h / 3)
+    edges = [koch_path(p1, p2, depth), koch_path(p2, p3, depth), koch_path(p3, p1, depth)]
+    return np.vstack((edges[0][:-1], edges[1][:-1], edges[2]))
+
+
+def segment_boxes_mesh(path, height, thickness):
+    """
+    One box per path segment, oriented along it in the xy plane.
+
+    Returns:
+        vertices, triangles, normals
+    """
+    start, end = path[:-1], path[1:]
+    mid = (start + end) / 2
+    delta = end - start
+    length = np.linalg.norm(delta, axis=1)
+    along = delta / length[:, None]
+    across = np.stack((-along[:, 1], along[:, 0]), axis=1)
+
+    # Unit cube faces (normal, 4 corners in +-1 units) in segment space
+    faces = [
+        ((0, 0, -1), [(-1, -1, -1), (-1, 1, -1), (1, 1, -1), (1, -1, -1)]),
+        ((0, 0, 1), [(-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)]),
+        ((-1, 0, 0), [(-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1)]),
+        ((1, 0, 0), [(1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1)]),
+        ((0, -1, 0), [(-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1)]),
+        ((0, 1, 0), [(-1, 1, -1), (-1, 1, 1), (1, 1, 1), (1, 1, -1)]),
+    ]
+    local = np.array([corner for _, corners in faces for corner in corners], dtype=np.float64)
+    local_normals = np.repeat(np.array([normal for normal, _ in faces], dtype=np.float64), 4, axis=0)
+
+    half = np.stack((length / 2, np.full_like(length, height / 2), np.full_like(length, thickness / 2)), axis=1)
+    scaled = local[None] * half[:, None]  # (S, 24, 3)
+    xy = (mid[:, None] + scaled[..., :1] * along[:, None] + scaled[..., 1:2] * across[:, None])
+    vertices = np.concatenate((xy, scaled[..., 2:]), axis=2).reshape(-1, 3).astype(np.float32)
+
+    normal_xy = (local_normals[None, :, :1] * along[:, None] + local_normals[None, :, 1:2] * across[:, None])
+    normals = np.concatenate(
+        (normal_xy, np.broadcast_to(local_normals[None, :, 2:], normal_xy.shape[:2] + (1,))), axis=2
+    ).reshape(-1, 3).astype(np.float32)
+
+    base = np.arange(len(start) * 6)[:, None] * 4
+    triangles = np.concatenate((base + [0, 1, 2], base + [0, 2, 3])).astype(np.int32)
+    return vertices, triangles, normals
+
+
+def koch_mesh(size=8.0, depth=3, thickness=0.5, segment_height=0.2):
+    """
+    2.5D Koch snowflake of boxes with the koch.py hue variation.
+
+    Returns:
+        vertices, triangles, normals, colors
+    """
+    path = koch_snowflake_path(size, depth)
+    vertices, triangles, normals = segment_boxes_mesh(path, segment_height, thickness)
+    hues = ((210 + np.arange(len(path) - 1) % 20) % 360) / 360.0
+    rgba = np.array([colorsys.hsv_to_rgb(h, 0.6, 1.0) + (1.0,) for h in hues], dtype=np.float32)
+    # Each box has its own color and flat normals, so there is nothing to weld
+    return vertices, triangles, normals, np.repeat(rgba, 24, axis=0)
+
+
+def to_ursina_meshes(vertices, triangles, normals=None, colors=None, max_vertices=MAX_VERTICES):
+    """One ursina Mesh, or a few chunked meshes when there are too many vertices."""
+    from ursina import Mesh  # optional dependency
+
+    attributes = [a for a in (normals, colors) if a is not None]
+    if len(vertices) <= max_vertices:
+        chunks = [(vertices, triangles, *attributes)]
+    else:
+        chunks = split_mesh(vertices, triangles, *attributes, max_vertices=max_vertices)
+
+    meshes = []
+    for chunk in chunks:
+        chunk = list(chunk)
+        chunk_normals = chunk.pop(2).tolist() if normals is not None else None
+        chunk_colors = chunk.pop(2).tolist() if colors is not None else None
+        meshes.append(Mesh(
+            vertices=chunk[0].tolist(),
+            triangles=chunk[1].ravel().tolist(),
+            normals=chunk_normals,
+            colors=chunk_colors,
+        ))
+    return meshes
+
+
+def random_hsv_colors(count, rng=None):
+    """Random fully saturated RGBA colors (as sierpinski_triangle_3d.py)."""
+    rng = rng or np.random.default_rng()
+    return np.array([colorsys.hsv_to_rgb(h, 1.0, 1.0) + (1.0,) for h in rng.random(count)],
+                    dtype=np.float32)
+
+
+def build_scenes(depth):
+    """Build every fractal; returns {name: (arrays, primitive_count, seconds)}."""
+    results = {}
+
+    start = time.perf_counter()
+    menger = menger_mesh(depth=depth)
+    results['menger'] = (menger, int(menger_occupancy(depth).sum()), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    size = 5
+    tetra = sierpinski_tetrahedra((0, size, 0), (-size, -size, size), (size, -size, size), (0, -size, -size), depth)
+    results['tetrahedra'] = (tetrahedra_mesh(tetra, random_hsv_colors(len(tetra))), len(tetra),
+                             time.perf_counter() - start)
+
+    start = time.perf_counter()
+    koch = koch_mesh(depth=depth)
+    results['koch'] = (koch, 3 * 4 ** depth, time.perf_counter() - start)
+    return results
+
+
+def measure_fps(meshes_by_name, frames=200):
+    """Frame rate of each scene rendered in ursina's offscreen window."""
+    from ursina import Entity, Ursina, camera, destroy
+
+    app = Ursina(window_type='offscreen', development_mode=False, show_ursina_splash=False)
+    camera.position = (0, 0, -60)
+    rates = {}
+    for name, meshes in meshes_by_name.items():
+        entities = [Entity(model=mesh, double_sided=True) for mesh in meshes]
+        for _ in range(10):  # warm-up, uploads the geometry
+            app.step()
+        start = time.perf_counter()
+        for _ in range(frames):
+            app.step()
+        rates[name] = frames / (time.perf_counter() - start)
+        for entity in entities:
+            destroy(entity)
+        app.step()
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build fractal meshes headlessly and report timings.')
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--fps', action='store_true', help='Also measure frame rate in an offscreen ursina window')
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    results = build_scenes(args.depth)
+    for name, (arrays, primitives, seconds) in results.items():
+        vertices, triangles = arrays[0], arrays[1]
+        print(f'{name:11} depth {args.depth}: {primitives:7d} primitives -> {len(vertices):8d} vertices, '
+              f'{len(triangles):8d} triangles in {seconds * 1000:8.1f} ms')
+
+    if args.fps:
+        meshes = {
+            name: to_ursina_meshes(arrays[0], arrays[1], arrays[2], arrays[3] if len(arrays) > 3 else None)
+            for name, (arrays, _, _) in results.items()
+        }
+        for name, rate in measure_fps(meshes, args.frames).items():
+            print(f'{name:11} {len(meshes[name])} mesh(es): {rate:7.1f} fps (offscreen)')
+
+
+if __name__ == '__main__':
+    main()
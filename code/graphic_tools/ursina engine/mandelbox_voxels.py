@@ -0,0 +1,202 @@
+"""Vectorized Mandelbox voxelizer and mesher.
+
+Runs the box-fold / ball-fold distance estimator of mandelbox_v2.py over
+whole slabs of the grid at once (chunked along x to bound memory), then
+turns the voxels into one merged surface:
+
+- voxel_mesh(): cube faces only where a filled voxel touches an empty one,
+  so internal faces are culled.
+- marching_cubes_mesh(): smooth iso-surface of the distance field
+  (needs scikit-image).
+
+No ursina import is needed, so it also works offline:
+
+    python mandelbox_voxels.py --resolution 256 --output mandelbox.obj
+"""
+import argparse
+import time
+import numpy as np
+
+SCALE = 2.0
+RADIUS = 0.5
+ITERATIONS = 10
+THRESHOLD = 0.03
+# Grid points evaluated per chunk (about 200 MB of temporaries at most)
+CHUNK_POINTS = 1 << 21
+
+# (axis, direction) -> the 4 corners of that cube face, counter-clockwise seen from outside
+_FACES = {
+    (0, -1): [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0)],
+    (0, 1): [(1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1)],
+    (1, -1): [(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)],
+    (1, 1): [(0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0)],
+    (2, -1): [(0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0)],
+    (2, 1): [(0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)],
+}
+
+
+def distance_estimate(points, scale=SCALE, iterations=ITERATIONS, r=RADIUS):
+    """
+    Mandelbox distance estimate for an (N, 3) array of points.
+
+    Same folds as mandelbox_v2.mandelbox_distance_estimator, applied to all
+    points at once.
+    """
+    c = np.asarray(points, dtype=np.float64)
+    z = c.copy()
+    dr = np.ones(len(c))
+    r2 = r * r
+    for _ in range(iterations):
+        # Box fold
+        z = np.where(z > 1.0, 2.0 - z, np.where(z < -1.0, -2.0 - z, z))
+
+        # Ball fold
+        mag2 = np.einsum('ij,ij->i', z, z)
+        factor = np.where(mag2 < r2, 1.0 / r2,
+                          np.where(mag2 < 1.0, 1.0 / np.maximum(mag2, 1e-300), 1.0))
+        z *= factor[:, None]
+        dr *= factor
+
+        # Scale and offset
+        z = z * scale + c
+        dr = dr * abs(scale) + 1.0
+    return np.sqrt(np.einsum('ij,ij->i', z, z)) / np.abs(dr)
+
+
+def grid_axis(res, size):
+    """World coordinates of the grid samples along one axis (as mandelbox_v2)."""
+    step = size / res
+    return np.arange(res) * step - size / 2
+
+
+def distance_field(res, size=30, chunk_points=CHUNK_POINTS, **estimator_args):
+    """Distance estimates on a res^3 grid, evaluated in x-slab chunks."""
+    axis = grid_axis(res, size)
+    normalized = axis / (size / 2)
+    field = np.empty((res, res, res), dtype=np.float32)
+    slab = max(1, chunk_points // (res * res))
+    ys, zs = np.meshgrid(normalized, normalized, indexing='ij')
+    for x0 in range(0, res, slab):
+        xs = normalized[x0:x0 + slab]
+        points = np.empty((len(xs), res, res, 3))
+        points[..., 0] = xs[:, None, None]
+        points[..., 1] = ys
+        points[..., 2] = zs
+        field[x0:x0 + len(xs)] = distance_estimate(points.reshape(-1, 3), **estimator_args).reshape(len(xs), res, res)
+    return field
+
+
+def voxelize(res, size=30, threshold=THRESHOLD, chunk_points=CHUNK_POINTS, **estimator_args):
+    """Boolean occupancy grid: True where the distance estimate is below threshold."""
+    return distance_field(res, size, chunk_points, **estimator_args) < threshold
+
+
+def voxel_mesh(occupancy, origin=(0.0, 0.0, 0.0), step=1.0):
+    """
+    Merged cube mesh of filled voxels with internal faces culled.
+
+    Returns:
+        vertices (V, 3) float32, triangles (T, 3) int32, normals (V, 3) float32
+    """
+    occupancy = np.asarray(occupancy, dtype=bool)
+    padded = np.pad(occupancy, 1)
+    origin = np.asarray(origin, dtype=np.float32)
+    vertices, triangles, normals = [], [], []
+    count = 0
+    for (axis, direction), corners in _FACES.items():
+        neighbor = np.roll(padded, -direction, axis=axis)[1:-1, 1:-1, 1:-1]
+        cells = np.argwhere(occupancy & ~neighbor)
+        if cells.size == 0:
+            continue
+        quad = cells[:, None, :] + np.array(corners)[None, :, :]
+        vertices.append((quad.reshape(-1, 3) * step + origin).astype(np.float32))
+        normal = np.zeros(3, dtype=np.float32)
+        normal[axis] = direction
+        normals.append(np.broadcast_to(normal, (len(cells) * 4, 3)))
+        base = count + np.arange(len(cells))[:, None] * 4
+        triangles.append(np.concatenate((base + [0, 1, 2], base + [0, 2, 3])).astype(np.int32))
+        count += len(cells) * 4
+    if not vertices:
+        empty = np.zeros((0, 3), dtype=np.float32)
+        return empty, np.zeros((0, 3), dtype=np.int32), empty
+    return np.concatenate(vertices), np.concatenate(triangles), np.concatenate(normals).astype(np.float32)
+
+
+def marching_cubes_mesh(field, threshold=THRESHOLD, origin=(0.0, 0.0, 0.0), step=1.0):
+    """
+    Smooth iso-surface of a distance field (requires scikit-image).
+
+    Returns:
+        vertices (V, 3) float32, triangles (T, 3) int32, normals (V, 3) float32
+    """
+    from skimage.measure import marching_cubes  # optional dependency
+    vertices, triangles, normals, _ = marching_cubes(field, level=threshold, spacing=(step, step, step))
+    # Distance grows outward, so flip the gradient normals to point outside
+    return ((vertices + np.asarray(origin)).astype(np.float32), triangles.astype(np.int32),
+            (-normals).astype(np.float32))
+
+
+def split_mesh(vertices, triangles, *attributes, max_vertices=65535):
+    """
+    Split a mesh into chunks small enough for 16-bit indices.
+
+    Per-vertex attribute arrays (normals, colors, ...) are split alongside.
+
+    Returns:
+        list of (vertices, triangles, *attributes)
+    """
+    chunks = []
+    start = 0
+    per_chunk = max(1, max_vertices // 3)
+    while start < len(triangles):
+        tris = triangles[start:start + per_chunk]
+        used, remapped = np.unique(tris, return_inverse=True)
+        chunk = [vertices[used], remapped.reshape(-1, 3).astype(np.int32)]
+        chunk.extend(attribute[used] for attribute in attributes)
+        chunks.append(tuple(chunk))
+        start += per_chunk
+    return chunks
+
+
+def save_obj(path, vertices, triangles, normals=None):
+    """Write a Wavefront OBJ file."""
+    with open(path, 'w', encoding='utf-8') as f:
+        np.savetxt(f, vertices, fmt='v %.5f %.5f %.5f')
+        if normals is not None:
+            np.savetxt(f, normals, fmt='vn %.4f %.4f %.4f')
+            faces = np.repeat(triangles + 1, 2, axis=1)
+            np.savetxt(f, faces, fmt='f %d//%d %d//%d %d//%d')
+        else:
+            np.savetxt(f, triangles + 1, fmt='f %d %d %d')
+
+
+def build(res, size=30, threshold=THRESHOLD, method='voxels', chunk_points=CHUNK_POINTS):
+    """Voxelize and mesh a Mandelbox centred on the origin."""
+    step = size / res
+    origin = (-size / 2,) * 3
+    field = distance_field(res, size, chunk_points)
+    if method == 'marching_cubes':
+        return marching_cubes_mesh(field, threshold, origin, step)
+    # Voxel (i, j, k) is centred on its sample, so shift by half a step
+    return voxel_mesh(field < threshold, np.asarray(origin) - step / 2, step)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a Mandelbox mesh offline.')
+    parser.add_argument('--resolution', type=int, default=128)
+    parser.add_argument('--size', type=float, default=30)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--method', choices=('voxels', 'marching_cubes'), default='voxels')
+    parser.add_argument('--output', default='mandelbox.obj')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    vertices, triangles, normals = build(args.resolution, args.size, args.threshold, args.method)
+    built = time.perf_counter() - start
+    save_obj(args.output, vertices, triangles, normals)
+    print(f'{args.resolution}^3 {args.method}: {len(vertices)} vertices, {len(triangles)} triangles '
+          f'in {built:.2f}s -> {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,22 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
-def rule_to_binary(rule_number):
-    """Convert a rule number (0–255) to 8-bit binary rule list."""
-    return [(rule_number >> i) & 1 for i in range(7, -1, -1)]
+# Shared engine lives in experiments/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from eca_engine import evolve  # noqa: E402
 
-def get_next_gen(current_gen, rule_bin):
-    """Compute next generation using the rule binary representation."""
-    next_gen = np.zeros_like(current_gen)
-    for i in range(1, len(current_gen) - 1):
-        neighborhood = (current_gen[i - 1] << 2) | (current_gen[i] << 1) | current_gen[i + 1]
-        next_gen[i] = rule_bin[7 - neighborhood]  # reverse indexing
-    return next_gen
-
-def generate_automaton(rule_number, width=101, steps=60):
+def generate_automaton(rule_number, width=101, steps=60, backend='bitpacked'):
     """Simulate the cellular automaton for the given rule number."""
-    rule_bin = rule_to_binary(rule_number)
+    if not 0 <= rule_number <= 255:
+        raise ValueError('ECA rules must be between 0 and 255')
     grid = np.zeros((steps, width), dtype=int)
-    grid[0, width // 2] = 1  # Start with a single '1' in the center
-
-    for t in range(1, steps):
-        grid[t] = get_next_gen(grid[t - 1], rule_bin)
+    first = np.zeros(width, dtype=np.uint8)
+    first[width // 2] = 1  # Start with a single '1' in the center
 
+    # The edge cells stay 0, so evolve the interior with fixed (0) boundaries
+    grid[:, 1:-1] = evolve(first[1:-1], rule_number, steps, boundary='fixed', backend=backend)
     return grid
 
 def plot_automaton(grid, rule_number):
@@ -0,0 +1,444 @@
+"""Headless batch runs of the cellular automata experiments.
+
+Runs Life, an elementary CA (Rule 30 by default) or 3D Life for thousands of
+generations without matplotlib in the loop. The simulation thread produces
+frames into a bounded queue; a writer thread encodes them into a video or a
+PNG sequence, so a slow encoder throttles the simulation instead of letting
+frames pile up in memory. Grids can be checkpointed as Life RLE (2D) or
+packed bits (.npz, any dimension) and runs can resume from a checkpoint.
+
+Examples:
+    python ca_headless.py life --size 1024 --generations 5000 --output life.mp4
+    python ca_headless.py eca --rule 30 --size 1000 --generations 20000 --output frames/
+    python ca_headless.py life3d --size 48 --generations 500 --output life3d.mp4 --scale 8
+    python ca_headless.py life --generations 100000 --every 1000 --checkpoint-every 10000 \
+        --checkpoint-dir checkpoints --output life.mp4
+    python ca_headless.py life --resume checkpoints/life_000010000.rle --generations 1000 --output more.mp4
+"""
+import argparse
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import numpy as np
+from eca_engine import rule_table, step_lut
+from life_engine import make_engine
+from life3d_engine import DenseLife3D
+
+# Frames buffered between the simulation and the writer
+QUEUE_SIZE = 64
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+_STOP = object()
+
+
+# ---------------------------------------------------------------------------
+# Simulations: each yields (generation, grid) every `every` generations
+# ---------------------------------------------------------------------------
+
+def run_life(grid, generations, every=1, backend='bitpacked', start=0):
+    """Game of Life frames from life_engine."""
+    engine = make_engine(grid, backend)
+    engine.generation = start
+    yield start, engine.to_array()
+    done = 0
+    while done < generations:
+        count = min(every, generations - done)
+        engine.step(count)
+        done += count
+        yield engine.generation, engine.to_array()
+
+
+def run_eca(row, generations, every=1, rule=30, height=None, start=0):
+    """
+    Elementary CA frames as a scrolling space-time window.
+
+    Each frame shows the last `height` rows (default: the row width).
+    """
+    table = rule_table(rule)
+    row = row.astype(np.uint8)
+    height = height or row.shape[0]
+    window = np.zeros((height, row.shape[0]), dtype=np.uint8)
+    window[-1] = row
+    yield start, window.copy()
+    for generation in range(start + 1, start + generations + 1):
+        # Edge cells stay 0, as in rule30.get_next_gen
+        row[1:-1] = step_lut(row[1:-1], table, 'fixed')
+        window = np.roll(window, -1, axis=0)
+        window[-1] = row
+        if (generation - start) % every == 0 or generation == start + generations:
+            yield generation, window.copy()
+
+
+def life3d_step(grid, survive=(4, 8), birth=(3, 8)):
+    """One toroidal 3D Life step (same default rule as conway_3d.py)."""
+    rule = (range(survive[0], survive[1] + 1), range(birth[0], birth[1] + 1))
+    return DenseLife3D(grid, rule).step().cells
+
+
+def run_life3d(grid, generations, every=1, start=0):
+    """3D Life frames (the 3D grid itself; the writer projects it)."""
+    grid = grid.astype(np.uint8)
+    yield start, grid
+    for generation in range(start + 1, start + generations + 1):
+        grid = life3d_step(grid)
+        if (generation - start) % every == 0 or generation == start + generations:
+            yield generation, grid
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+def encode_rle(grid, rule='B3/S23'):
+    """Encode a 2D 0/1 grid in the standard Life RLE format."""
+    rows, cols = grid.shape
+    lines = [f'x = {cols}, y = {rows}, rule = {rule}']
+    body = []
+    row_ends = 0  # '$' tokens owed before the next non-empty row
+    for r in range(rows):
+        live = np.flatnonzero(grid[r])
+        if live.size == 0:
+            row_ends += 1
+            continue
+        if row_ends:
+            body.append(f'{row_ends if row_ends > 1 else ""}$')
+        row_ends = 1
+        # Runs of dead/live cells up to the last live cell
+        values = grid[r, :live[-1] + 1]
+        change = np.flatnonzero(np.diff(values)) + 1
+        starts = np.concatenate(([0], change))
+        ends = np.concatenate((change, [values.size]))
+        for s, e in zip(starts, ends):
+            n = e - s
+            body.append(f'{n if n > 1 else ""}{"o" if values[s] else "b"}')
+    body.append('!')
+
+    # RLE lines should stay under 70 characters
+    text = ''
+    for token in body:
+        if len(text) + len(token) > 70:
+            lines.append(text)
+            text = ''
+        text += token
+    lines.append(text)
+    return '\n'.join(lines) + '\n'
+
+
+def decode_rle(text):
+    """Decode Life RLE into a 2D uint8 grid."""
+    header = None
+    data = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if header is None and line.startswith('x'):
+            header = line
+            continue
+        data.append(line)
+    if header is None:
+        raise ValueError('RLE header (x = ..., y = ...) not found')
+    size = dict(re.findall(r'(\w+)\s*=\s*([^,\s]+)', header))
+    grid = np.zeros((int(size['y']), int(size['x'])), dtype=np.uint8)
+
+    row = col = 0
+    for count, tag in re.findall(r'(\d*)([bo$!])', ''.join(data)):
+        n = int(count) if count else 1
+        if tag == 'b':
+            col += n
+        elif tag == 'o':
+            grid[row, col:col + n] = 1
+            col += n
+        elif tag == '$':
+            row += n
+            col = 0
+        else:
+            break
+    return grid
+
+
+def save_checkpoint(path, grid, generation, kind, **meta):
+    """
+    Save a grid checkpoint
+
+    .rle writes Life RLE (2D only, generation and meta in a comment);
+    anything else writes an .npz with the grid packed to bits.
+    """
+    meta = {key: value for key, value in meta.items() if value is not None}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith('.rle'):
+        with open(path, 'w', encoding='utf-8') as f:
+            fields = ''.join(f' {key}={value}' for key, value in meta.items())
+            f.write(f'#C kind={kind} generation={generation}{fields}\n')
+            f.write(encode_rle(grid))
+    else:
+        np.savez_compressed(path, bits=np.packbits(grid.astype(bool)), shape=grid.shape,
+                            generation=generation, kind=kind, **meta)
+
+
+def load_checkpoint(path):
+    """Load a checkpoint; returns (grid, generation, kind, meta)."""
+    if path.endswith('.rle'):
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        match = re.search(r'#C kind=(\w+)\s+generation=(\d+)(.*)', text)
+        if not match:
+            return decode_rle(text), 0, 'life', {}
+        meta = {key: int(value) for key, value in re.findall(r'(\w+)=(\d+)', match.group(3))}
+        return decode_rle(text), int(match.group(2)), match.group(1), meta
+    data = np.load(path)
+    shape = tuple(int(n) for n in data['shape'])
+    grid = np.unpackbits(data['bits'], count=int(np.prod(shape))).reshape(shape)
+    meta = {key: data[key].item() for key in data.files
+            if key not in ('bits', 'shape', 'generation', 'kind')}
+    return grid, int(data['generation']), str(data['kind']), meta
+
+
+# ---------------------------------------------------------------------------
+# Frame writers
+# ---------------------------------------------------------------------------
+
+def to_image(grid, scale=1):
+    """Convert a grid into a grayscale frame (live cells black, like cmap='binary')."""
+    if grid.ndim == 3:
+        # Project 3D grids along z: darker where more cells are stacked
+        density = grid.sum(axis=2).astype(np.float32) / max(grid.shape[2], 1)
+        image = (255 * (1.0 - np.sqrt(density))).astype(np.uint8)
+    else:
+        image = ((1 - grid) * 255).astype(np.uint8)
+    if scale > 1:
+        image = np.repeat(np.repeat(image, scale, axis=0), scale, axis=1)
+    return image
+
+
+class ImageSequenceWriter:
+    """Write frames as numbered PNG files."""
+
+    def __init__(self, directory):
+        from PIL import Image
+        self._image = Image
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, generation, frame):
+        path = os.path.join(self.directory, f'frame_{generation:09d}.png')
+        self._image.fromarray(frame).save(path, optimize=False, compress_level=1)
+
+    def close(self):
+        pass
+
+
+class VideoWriter:
+    """Write frames into a video file with OpenCV (falls back to imageio)."""
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps
+        self._writer = None
+        self._backend = None
+
+    def _open(self, frame):
+        height, width = frame.shape[:2]
+        try:
+            import cv2
+            fourcc = cv2.VideoWriter_fourcc(*('mp4v' if self.path.endswith(('.mp4', '.mov')) else 'MJPG'))
+            self._writer = cv2.VideoWriter(self.path, fourcc, self.fps, (width, height), isColor=False)
+            if not self._writer.isOpened():
+                raise RuntimeError(f'OpenCV could not open {self.path}')
+            self._backend = 'cv2'
+        except ImportError:
+            import imageio  # needs imageio[ffmpeg] for video formats
+            self._writer = imageio.get_writer(self.path, fps=self.fps)
+            self._backend = 'imageio'
+
+    def write(self, generation, frame):
+        if self._writer is None:
+            self._open(frame)
+        if self._backend == 'cv2':
+            self._writer.write(frame)
+        else:
+            self._writer.append_data(frame)
+
+    def close(self):
+        if self._writer is None:
+            return
+        if self._backend == 'cv2':
+            self._writer.release()
+        else:
+            self._writer.close()
+
+
+def make_writer(output, fps):
+    """Pick a writer from the output path (video extension, otherwise a PNG directory)."""
+    if output.lower().endswith(VIDEO_EXTENSIONS):
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return VideoWriter(output, fps)
+    return ImageSequenceWriter(output)
+
+
+# ---------------------------------------------------------------------------
+# Producer / consumer pipeline
+# ---------------------------------------------------------------------------
+
+def run_pipeline(frames, writer=None, scale=1, queue_size=QUEUE_SIZE, kind='life',
+                 checkpoint_every=None, checkpoint_dir=None, checkpoint_format='npz',
+                 progress_every=0, meta=None):
+    """
+    Drive a frame generator through a bounded queue into a writer thread.
+
+    Returns:
+        dict with frame count, final generation and timings
+    """
+    frame_queue = queue.Queue(maxsize=queue_size)
+    errors = []
+
+    def consume():
+        try:
+            while True:
+                item = frame_queue.get()
+                if item is _STOP:
+                    return
+                writer.write(*item)
+        except Exception as e:  # surface encoder errors in the producer
+            errors.append(e)
+            # Keep draining so the producer never blocks on a full queue
+            while frame_queue.get() is not _STOP:
+                pass
+
+    consumer = None
+    if writer is not None:
+        consumer = threading.Thread(target=consume, name='frame-writer', daemon=True)
+        consumer.start()
+
+    started = time.perf_counter()
+    frame_count = 0
+    generation = None
+    last_checkpoint = None
+    try:
+        for generation, grid in frames:
+            if errors:
+                raise errors[0]
+            if writer is not None:
+                frame_queue.put((generation, to_image(grid, scale)))
+            frame_count += 1
+
+            # Checkpoint at the first frame on or past each multiple of checkpoint_every
+            if checkpoint_every and checkpoint_dir:
+                index = generation // checkpoint_every
+                if last_checkpoint is None:
+                    last_checkpoint = index
+                elif index > last_checkpoint:
+                    last_checkpoint = index
+                    extension = 'rle' if checkpoint_format == 'rle' and grid.ndim == 2 else 'npz'
+                    path = os.path.join(checkpoint_dir, f'{kind}_{generation:09d}.{extension}')
+                    save_checkpoint(path, grid, generation, kind, **(meta or {}))
+
+            if progress_every and frame_count % progress_every == 0:
+                elapsed = time.perf_counter() - started
+                print(f'generation {generation}: {frame_count} frames, '
+                      f'{frame_count / elapsed:.1f} frames/s, queue {frame_queue.qsize()}',
+                      file=sys.stderr, flush=True)
+    finally:
+        if consumer is not None:
+            frame_queue.put(_STOP)
+            consumer.join()
+            writer.close()
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - started
+    return {
+        'frames': frame_count,
+        'generation': generation,
+        'seconds': elapsed,
+        'framesPerSecond': frame_count / elapsed if elapsed > 0 else None,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Run cellular automata headless and export frames.')
+    parser.add_argument('kind', choices=('life', 'eca', 'life3d'))
+    parser.add_argument('--size', type=int, default=None,
+                        help='Grid size (life: NxN, eca: width, life3d: NxNxN)')
+    parser.add_argument('--generations', type=int, default=1000)
+    parser.add_argument('--every', type=int, default=1, help='Emit a frame every N generations')
+    parser.add_argument('--density', type=float, default=None, help='Initial live probability')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--rule', type=int, default=None,
+                        help='Elementary CA rule (eca only; default 30, or the rule saved in --resume)')
+    parser.add_argument('--backend', default='bitpacked', help='life_engine backend (life only)')
+    parser.add_argument('--output', default=None, help='Video file (.mp4/.avi) or PNG directory')
+    parser.add_argument('--fps', type=float, default=30)
+    parser.add_argument('--scale', type=int, default=1, help='Pixels per cell')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--checkpoint-every', type=int, default=None)
+    parser.add_argument('--checkpoint-dir', default='checkpoints')
+    parser.add_argument('--checkpoint-format', choices=('npz', 'rle'), default='npz',
+                        help='rle applies to 2D grids; 3D grids always use npz')
+    parser.add_argument('--resume', default=None, help='Start from a checkpoint file')
+    parser.add_argument('--progress-every', type=int, default=100, help='Frames between progress lines (0 = off)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    start = 0
+
+    if args.resume:
+        grid, start, kind, meta = load_checkpoint(args.resume)
+        if kind != args.kind:
+            print(f'Checkpoint is a {kind} grid, not {args.kind}', file=sys.stderr)
+            return 2
+        saved_rule = meta.get('rule')
+        if args.rule is not None and saved_rule is not None and args.rule != saved_rule:
+            print(f'Checkpoint was run with rule {saved_rule}, not {args.rule}', file=sys.stderr)
+            return 2
+        if args.rule is None:
+            args.rule = saved_rule
+    elif args.kind == 'life':
+        size = args.size or 500
+        grid = (rng.random((size, size)) < (args.density or 0.3)).astype(np.uint8)
+    elif args.kind == 'eca':
+        size = args.size or 1000
+        if args.density:
+            grid = (rng.random(size) < args.density).astype(np.uint8)
+        else:
+            grid = np.zeros(size, dtype=np.uint8)
+            grid[size // 2] = 1  # single live cell, as in rule30.py
+    else:
+        size = args.size or 20
+        grid = (rng.random((size, size, size)) < (args.density or 0.2)).astype(np.uint8)
+
+    if args.rule is None:
+        args.rule = 30
+
+    if args.kind == 'life':
+        frames = run_life(grid, args.generations, args.every, args.backend, start)
+    elif args.kind == 'eca':
+        if grid.ndim == 2:
+            grid = grid[-1]  # resume from the last row of a space-time window
+        frames = run_eca(grid, args.generations, args.every, args.rule, start=start)
+    else:
+        frames = run_life3d(grid, args.generations, args.every, start)
+
+    writer = make_writer(args.output, args.fps) if args.output else None
+    stats = run_pipeline(
+        frames, writer, scale=args.scale, queue_size=args.queue_size, kind=args.kind,
+        checkpoint_every=args.checkpoint_every, checkpoint_dir=args.checkpoint_dir,
+        checkpoint_format=args.checkpoint_format, progress_every=args.progress_every,
+        meta={'rule': args.rule if args.kind == 'eca' else None},
+    )
+    print(f"{args.kind}: {stats['frames']} frames up to generation {stats['generation']} "
+          f"in {stats['seconds']:.2f}s ({stats['framesPerSecond']:.1f} frames/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
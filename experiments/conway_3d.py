@@ -1,7 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Button
+import argparse
 import sys
+from life3d_engine import make_engine3d
+from life3d_renderer import ScatterRenderer, run_ursina
 
 # Global flags
 window_open = True
@@ -31,31 +34,26 @@ def count_neighbors_3d(grid, x, y, z):
     
     return count
 
-def next_generation_3d(grid):
+def next_generation_3d(grid, mode='dense'):
     survival_min, survival_max = 4, 8
     birth_min, birth_max = 3, 8
+    rule = (range(survival_min, survival_max + 1), range(birth_min, birth_max + 1))
 
-    nx, ny, nz = grid.shape
-    new_grid = np.zeros((nx, ny, nz), dtype=int)
-
-    for x in range(nx):
-        for y in range(ny):
-            for z in range(nz):
-                neighbors = count_neighbors_3d(grid, x, y, z)
-                if grid[x, y, z] == 1:
-                    if survival_min <= neighbors <= survival_max:
-                        new_grid[x, y, z] = 1
-                else:
-                    if birth_min <= neighbors <= birth_max:
-                        new_grid[x, y, z] = 1
-    return new_grid
-
-def main():
+    # Whole-grid neighbour counts instead of count_neighbors_3d per voxel
+    engine = make_engine3d(grid, mode=mode, rule=rule)
+    return engine.step().to_array().astype(int)
+
+def main(size=20, mode='dense', renderer='matplotlib'):
     global window_open, step_requested
 
-    nx, ny, nz = 20, 20, 20
+    nx, ny, nz = size, size, size
     grid = np.random.choice([0, 1], size=(nx, ny, nz), p=[0.8, 0.2])
-    
+    engine = make_engine3d(grid, mode=mode, rule=(range(4, 9), range(3, 9)))
+
+    if renderer == 'ursina':
+        run_ursina(engine)
+        return
+
     # Matplotlib setup
     plt.ion()
     fig = plt.figure(figsize=(8, 7))
@@ -67,7 +65,8 @@ def main():
     step_button = Button(button_ax, 'Step')
     step_button.on_clicked(on_step)
 
-    generation = 0
+    # One persistent scatter; each step only moves the cells that changed
+    scatter = ScatterRenderer(ax, (nx, ny, nz))
 
     while window_open:
         if not step_requested:
@@ -75,26 +74,22 @@ def main():
             continue
 
         step_requested = False
-        ax.clear()
-
-        living_cells = np.argwhere(grid == 1)
-        if living_cells.size > 0:
-            xs, ys, zs = living_cells[:, 0], living_cells[:, 1], living_cells[:, 2]
-            ax.scatter(xs, ys, zs, marker='o')
-
-        ax.set_xlim(0, nx)
-        ax.set_ylim(0, ny)
-        ax.set_zlim(0, nz)
-        ax.set_title(f"3D Game of Life (Toroidal) - Generation {generation}")
+        born, died = scatter.update(engine.live_cells())
+        ax.set_title(f"3D Game of Life (Toroidal) - Generation {engine.generation} "
+                     f"(+{born} / -{died})")
 
-        plt.draw()
+        fig.canvas.draw_idle()
 
-        grid = next_generation_3d(grid)
-        generation += 1
+        engine.step()
 
     plt.ioff()
     plt.close(fig)
     sys.exit()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='3D Game of Life')
+    parser.add_argument('--size', type=int, default=20)
+    parser.add_argument('--mode', choices=('dense', 'sparse'), default='dense')
+    parser.add_argument('--renderer', choices=('matplotlib', 'ursina'), default='matplotlib')
+    args = parser.parse_args()
+    main(args.size, args.mode, args.renderer)
@@ -0,0 +1,187 @@
+"""Elementary cellular automaton engine for all 256 rules.
+
+Two backends evolve one row or a batch of rows (one automaton per row, each
+with its own rule) at once:
+
+- 'lut': neighbourhood index (left << 2 | centre << 1 | right) looked up in
+  the rule's 8-entry table, one NumPy gather per step.
+- 'bitpacked': 64 cells per uint64; the rule is applied as a sum of
+  minterms over the left/centre/right bit planes.
+
+Boundaries are 'fixed' (cells beyond the edges are 0) or 'wrap' (ring).
+
+Example:
+    history = evolve(single_seed(1000), rule=30, steps=600)
+    rules = np.arange(256)
+    histories = evolve(np.tile(single_seed(512), (256, 1)), rule=rules, steps=256)
+"""
+import numpy as np
+from life_engine import WORD_BITS, pack_grid, unpack_grid
+
+BOUNDARIES = ('fixed', 'wrap')
+BACKENDS = ('lut', 'bitpacked')
+_ONE = np.uint64(1)
+_TOP = np.uint64(WORD_BITS - 1)
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def rule_table(rule):
+    """
+    8-entry lookup table(s) indexed by left << 2 | centre << 1 | right.
+
+    Args:
+        rule: rule number, or a sequence of rule numbers (one table per row)
+    """
+    rules = np.asarray(rule, dtype=np.int64)
+    if np.any((rules < 0) | (rules > 255)):
+        raise ValueError('ECA rules must be between 0 and 255')
+    return ((rules[..., None] >> np.arange(8)) & 1).astype(np.uint8)
+
+
+def single_seed(width, batch=None):
+    """Row(s) with one live cell in the centre."""
+    row = np.zeros(width, dtype=np.uint8)
+    row[width // 2] = 1
+    return row if batch is None else np.tile(row, (batch, 1))
+
+
+def random_seed(width, batch=None, density=0.5, rng=None):
+    """Random row(s) of live cells."""
+    rng = rng or np.random.default_rng()
+    shape = width if batch is None else (batch, width)
+    return (rng.random(shape) < density).astype(np.uint8)
+
+
+def step_lut(cells, table, boundary='fixed'):
+    """
+    One step with the lookup-table backend.
+
+    Args:
+        cells: (width,) or (batch, width) uint8 array of 0/1
+        table: rule_table() result, (8,) or (batch, 8)
+    """
+    if boundary == 'wrap':
+        left = np.roll(cells, 1, axis=-1)
+        right = np.roll(cells, -1, axis=-1)
+    else:
+        left = np.zeros_like(cells)
+        right = np.zeros_like(cells)
+        left[..., 1:] = cells[..., :-1]
+        right[..., :-1] = cells[..., 1:]
+    index = (left << 2) | (cells << 1) | right
+    if table.ndim == 1:
+        return table[index]
+    return np.take_along_axis(table, index, axis=-1)
+
+
+class _PackedRows:
+    """Shift helpers for rows packed by life_engine.pack_grid."""
+
+    def __init__(self, cols, boundary):
+        self.cols = cols
+        self.wrap = boundary == 'wrap'
+        self.pad_bit = np.uint64((cols - 1) % WORD_BITS)
+        self.padded = cols % WORD_BITS != 0
+        self.last_mask = np.uint64((1 << (int(self.pad_bit) + 1)) - 1)
+
+    def left(self, x):
+        """Value of cell c - 1 for every c."""
+        carry = np.roll(x, 1, axis=1) >> _TOP
+        if self.wrap:
+            if self.padded:
+                carry[:, 0] = (x[:, -1] >> self.pad_bit) & _ONE
+        else:
+            carry[:, 0] = 0
+        return (x << _ONE) | carry
+
+    def right(self, x):
+        """Value of cell c + 1 for every c."""
+        carry = np.roll(x, -1, axis=1) << _TOP
+        if self.wrap:
+            if self.padded:
+                carry[:, -1] = (x[:, 0] & _ONE) << self.pad_bit
+        else:
+            carry[:, -1] = 0
+        return (x >> _ONE) | carry
+
+    def mask(self, x):
+        """Clear padding bits in the last word of every row."""
+        if self.padded:
+            x[:, -1] &= self.last_mask
+        return x
+
+
+def _minterm_masks(table):
+    """Per-row all-ones/all-zeros word masks for each of the 8 neighbourhoods."""
+    table = np.atleast_2d(table)
+    return [np.where(table[:, p:p + 1] == 1, _ALL, np.uint64(0)) for p in range(8)]
+
+
+def step_packed(packed, masks, rows):
+    """One step with the bit-parallel backend on packed rows."""
+    left = rows.left(packed)
+    right = rows.right(packed)
+    planes = {
+        (0, 0): ~left & ~packed, (0, 1): ~left & packed,
+        (1, 0): left & ~packed, (1, 1): left & packed,
+    }
+    not_right = ~right
+    result = np.zeros_like(packed)
+    for pattern in range(8):
+        if not masks[pattern].any():
+            continue
+        lc = planes[(pattern >> 2, (pattern >> 1) & 1)]
+        term = lc & (right if pattern & 1 else not_right)
+        result |= term & masks[pattern]
+    return rows.mask(result)
+
+
+def evolve(initial, rule=30, steps=100, boundary='fixed', backend='lut', history=True):
+    """
+    Evolve one automaton or a batch of automata.
+
+    Args:
+        initial: (width,) row, or (batch, width) rows evolved independently
+        rule: rule number, or one rule per batch row (for rule-space sweeps)
+        steps: number of rows in the result, including the initial row
+        boundary: 'fixed' or 'wrap'
+        backend: 'lut' or 'bitpacked'
+        history: return every row (True) or only the last one (False)
+
+    Returns:
+        (steps, width) or (steps, batch, width) uint8 space-time array,
+        or just the final row(s) when history is False
+    """
+    if boundary not in BOUNDARIES:
+        raise ValueError(f"Unknown boundary '{boundary}' (choose from {', '.join(BOUNDARIES)})")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+
+    cells = np.asarray(initial).astype(np.uint8)
+    single = cells.ndim == 1
+    batch = np.atleast_2d(cells)
+    table = rule_table(rule)
+    if table.ndim == 2 and table.shape[0] != batch.shape[0]:
+        raise ValueError('Pass one rule per batch row')
+
+    out = np.empty((steps,) + batch.shape, dtype=np.uint8) if history else None
+    if backend == 'lut':
+        for t in range(steps):
+            if t:
+                batch = step_lut(batch, table, boundary)
+            if history:
+                out[t] = batch
+    else:
+        rows = _PackedRows(batch.shape[1], boundary)
+        masks = _minterm_masks(table)
+        packed = pack_grid(batch)
+        for t in range(steps):
+            if t:
+                packed = step_packed(packed, masks, rows)
+            if history:
+                out[t] = unpack_grid(packed, batch.shape[1])
+        batch = unpack_grid(packed, batch.shape[1])
+
+    if not history:
+        return batch[0] if single else batch
+    return out[:, 0] if single else out
@@ -0,0 +1,193 @@
+"""Incremental point-cloud rendering for 3D Life.
+
+Renderers receive the live cells of each generation, diff them against the
+previous generation (born / died keys) and only touch the changed points:
+
+- ScatterRenderer: one persistent matplotlib scatter artist. Points live in
+  fixed slots of preallocated x/y/z arrays; dead cells free their slot
+  (set to NaN) and new cells reuse free slots, so no artist is rebuilt.
+- UrsinaRenderer (optional, needs ursina): one cube model instanced into a
+  pool of scene-graph nodes; born cells take a node from the pool, dead
+  cells stash theirs.
+
+Example:
+    renderer = ScatterRenderer(ax, grid.shape)
+    renderer.update(engine.live_cells())
+"""
+import numpy as np
+
+
+def cell_keys(cells, shape):
+    """Sorted flat keys of (N, 3) cell coordinates."""
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+    if cells.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.sort(np.ravel_multi_index(tuple(cells.T), shape))
+
+
+def diff_keys(previous, current):
+    """(born, died) keys between two sorted key arrays."""
+    born = np.setdiff1d(current, previous, assume_unique=True)
+    died = np.setdiff1d(previous, current, assume_unique=True)
+    return born, died
+
+
+class _SlotTable:
+    """Maps cell keys to stable slots; slot lookups and edits are vectorized."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+        self.sorted_slots = np.zeros(0, dtype=np.int64)
+        self.free = np.arange(capacity - 1, -1, -1, dtype=np.int64)  # stack, top at the end
+
+    def remove(self, keys):
+        """Release the slots of keys; returns the freed slots."""
+        if keys.size == 0:
+            return keys
+        index = np.searchsorted(self.sorted_keys, keys)
+        slots = self.sorted_slots[index]
+        keep = np.ones(self.sorted_keys.size, dtype=bool)
+        keep[index] = False
+        self.sorted_keys = self.sorted_keys[keep]
+        self.sorted_slots = self.sorted_slots[keep]
+        self.free = np.concatenate((self.free, slots))
+        return slots
+
+    def add(self, keys):
+        """Assign slots to new keys; returns (slots, grew)."""
+        grew = False
+        if keys.size > self.free.size:
+            # Double until the new cells fit; new slots go below the existing free ones
+            new_capacity = self.capacity
+            while new_capacity - self.capacity + self.free.size < keys.size:
+                new_capacity *= 2
+            extra = np.arange(new_capacity - 1, self.capacity - 1, -1, dtype=np.int64)
+            self.free = np.concatenate((extra, self.free))
+            self.capacity = new_capacity
+            grew = True
+        slots = self.free[self.free.size - keys.size:][::-1]
+        self.free = self.free[:self.free.size - keys.size]
+
+        index = np.searchsorted(self.sorted_keys, keys)
+        self.sorted_keys = np.insert(self.sorted_keys, index, keys)
+        self.sorted_slots = np.insert(self.sorted_slots, index, slots)
+        return slots, grew
+
+
+class ScatterRenderer:
+    """Persistent matplotlib 3D scatter updated from generation diffs."""
+
+    def __init__(self, ax, shape, capacity=1024, **scatter_kwargs):
+        self.ax = ax
+        self.shape = tuple(shape)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.slots = _SlotTable(capacity)
+        self.positions = np.full((3, capacity), np.nan)
+        scatter_kwargs.setdefault('marker', 'o')
+        self.artist = ax.scatter([], [], [], **scatter_kwargs)
+        self._attach()
+
+        ax.set_xlim(0, self.shape[0])
+        ax.set_ylim(0, self.shape[1])
+        ax.set_zlim(0, self.shape[2])
+
+    def _attach(self):
+        # The artist keeps references to these arrays, so in-place edits show on the next draw
+        self.artist._offsets3d = (self.positions[0], self.positions[1], self.positions[2])
+
+    def update(self, cells):
+        """
+        Show a new generation
+
+        Returns:
+            (born, died) counts
+        """
+        keys = cell_keys(cells, self.shape)
+        born, died = diff_keys(self.keys, keys)
+        self.keys = keys
+
+        freed = self.slots.remove(died)
+        self.positions[:, freed] = np.nan
+
+        slots, grew = self.slots.add(born)
+        if grew:
+            positions = np.full((3, self.slots.capacity), np.nan)
+            positions[:, :self.positions.shape[1]] = self.positions
+            self.positions = positions
+            self._attach()
+        if born.size:
+            self.positions[:, slots] = np.array(np.unravel_index(born, self.shape), dtype=float)
+        return born.size, died.size
+
+
+class UrsinaRenderer:
+    """Instanced voxel cubes in ursina, updated from generation diffs."""
+
+    def __init__(self, shape, cube_scale=0.9, cube_color=None):
+        from ursina import Entity, color  # optional dependency
+        self.shape = tuple(shape)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.root = Entity(position=(-self.shape[0] / 2, -self.shape[2] / 2, -self.shape[1] / 2))
+        # One cube model; every voxel node shares its geometry through instanceTo
+        self.template = Entity(model='cube', scale=cube_scale, color=cube_color or color.azure)
+        self.template.detachNode()
+        self.nodes = {}  # key -> voxel node
+        self.pool = []  # stashed nodes ready for reuse
+
+    def update(self, cells):
+        """Show a new generation; returns (born, died) counts."""
+        keys = cell_keys(cells, self.shape)
+        born, died = diff_keys(self.keys, keys)
+        self.keys = keys
+
+        for key in died.tolist():
+            node = self.nodes.pop(key)
+            node.stash()
+            self.pool.append(node)
+
+        if born.size:
+            xs, ys, zs = np.unravel_index(born, self.shape)
+            for key, x, y, z in zip(born.tolist(), xs.tolist(), ys.tolist(), zs.tolist()):
+                if self.pool:
+                    node = self.pool.pop()
+                    node.unstash()
+                else:
+                    node = self.root.attachNewNode('voxel')
+                    self.template.instanceTo(node)
+                node.setPos(x, z, y)  # ursina is y-up
+                self.nodes[key] = node
+        return born.size, died.size
+
+
+def run_ursina(engine, steps_per_second=4):
+    """Animate a 3D Life engine with UrsinaRenderer (space pauses, 's' steps)."""
+    from ursina import EditorCamera, Text, Ursina, time as utime
+
+    app = Ursina()
+    renderer = UrsinaRenderer(engine.shape)
+    renderer.update(engine.live_cells())
+    EditorCamera()
+    label = Text(text='', position=(-0.85, 0.47))
+    state = {'paused': False, 'elapsed': 0.0}
+
+    def update():
+        state['elapsed'] += utime.dt
+        if state['paused'] or state['elapsed'] < 1.0 / steps_per_second:
+            return
+        state['elapsed'] = 0.0
+        engine.step()
+        born, died = renderer.update(engine.live_cells())
+        label.text = f'Generation {engine.generation}  cells {engine.population()}  +{born} -{died}'
+
+    def input(key):
+        if key == 'space':
+            state['paused'] = not state['paused']
+        elif key == 's':
+            engine.step()
+            renderer.update(engine.live_cells())
+
+    import __main__
+    __main__.update = update  # ursina calls the module-level update/input
+    __main__.input = input
+    app.run()
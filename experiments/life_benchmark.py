@@ -0,0 +1,123 @@
+"""Benchmark the Life engines against the original animation scripts.
+
+Times generations per second of:
+- conways_game_of_life.update (nested Python loops)
+- conways_game_of_life_faster.update (scipy convolve2d)
+- life_engine.BitPackedLife
+- life_engine.HashLife (random soup, and a sparse glider gun run far ahead)
+
+Usage:
+    python life_benchmark.py
+    python life_benchmark.py --sizes 512 4096 16384 --generations 10
+"""
+import argparse
+import time
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # the scripts import pyplot; nothing is drawn here
+import conways_game_of_life
+import conways_game_of_life_faster
+from life_engine import BitPackedLife, HashLife
+
+# Gosper glider gun, as (row, col) offsets
+GLIDER_GUN = [
+    (0, 24), (1, 22), (1, 24), (2, 12), (2, 13), (2, 20), (2, 21), (2, 34), (2, 35),
+    (3, 11), (3, 15), (3, 20), (3, 21), (3, 34), (3, 35), (4, 0), (4, 1), (4, 10),
+    (4, 16), (4, 20), (4, 21), (5, 0), (5, 1), (5, 10), (5, 14), (5, 16), (5, 17),
+    (5, 22), (5, 24), (6, 10), (6, 16), (6, 24), (7, 11), (7, 15), (8, 12), (8, 13),
+]
+
+
+class _Artist:
+    """Stand-in for the image / text artists the scripts update every frame."""
+
+    def set_data(self, data):
+        pass
+
+    def set_text(self, text):
+        pass
+
+
+def time_naive(grid, generations):
+    grid = grid.astype(int)
+    n = grid.shape[0]
+    start = time.perf_counter()
+    for frame in range(generations):
+        conways_game_of_life.update(frame, _Artist(), grid, n)
+    return time.perf_counter() - start, grid
+
+
+def time_convolve(grid, generations):
+    # uint8 keeps the 16k x 16k case in memory; counts never exceed 8
+    grid = grid.astype(np.uint8)
+    kernel = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], dtype=np.uint8)
+    start = time.perf_counter()
+    for frame in range(generations):
+        conways_game_of_life_faster.update(frame, _Artist(), grid, kernel, _Artist())
+    return time.perf_counter() - start, grid
+
+
+def time_engine(engine_class, grid, generations):
+    engine = engine_class(grid)
+    start = time.perf_counter()
+    engine.step(generations)
+    return time.perf_counter() - start, engine.to_array()
+
+
+def report(name, size, generations, elapsed):
+    rate = generations / elapsed if elapsed > 0 else float('inf')
+    cells = size * size * rate
+    print(f"{name:12} {size:>6}x{size:<6} {generations:>5} gens {elapsed:9.3f}s "
+          f"{rate:10.1f} gen/s {cells / 1e6:10.1f} Mcell/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Game of Life engines.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 1024, 4096, 16384])
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--naive-max', type=int, default=256,
+                        help='Largest grid for the nested-loop script (it is very slow)')
+    parser.add_argument('--convolve-max', type=int, default=16384)
+    parser.add_argument('--hashlife-max', type=int, default=1024,
+                        help='Largest random soup for HashLife (it shines on sparse patterns, not soups)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        grid = (rng.random((size, size)) < 0.3).astype(np.uint8)
+        gens = args.generations
+
+        elapsed, packed = time_engine(BitPackedLife, grid, gens)
+        report('bitpacked', size, gens, elapsed)
+
+        if size <= args.convolve_max:
+            elapsed, convolved = time_convolve(grid, gens)
+            report('convolve2d', size, gens, elapsed)
+            if not np.array_equal(packed, convolved):
+                print('  MISMATCH between bitpacked and convolve2d')
+            del convolved
+
+        if size <= args.naive_max:
+            naive_gens = max(1, gens // 5)
+            elapsed, _ = time_naive(grid, naive_gens)
+            report('naive', size, naive_gens, elapsed)
+
+        if size <= args.hashlife_max:
+            elapsed, _ = time_engine(HashLife, grid, gens)
+            report('hashlife', size, gens, elapsed)
+
+    # Sparse, periodic case: a glider gun a million generations ahead
+    gun = np.zeros((16, 40), dtype=np.uint8)
+    for row, col in GLIDER_GUN:
+        gun[row, col] = 1
+    engine = HashLife(gun)
+    start = time.perf_counter()
+    engine.step(1_000_000)
+    elapsed = time.perf_counter() - start
+    print(f"hashlife glider gun: 1,000,000 gens in {elapsed:.3f}s, "
+          f"population {engine.population()}, quadtree level {engine.root.level}")
+
+
+if __name__ == '__main__':
+    main()
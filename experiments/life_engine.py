@@ -0,0 +1,412 @@
+"""Reusable Game of Life engines.
+
+Two backends share one small API (step / to_array / population / generation):
+
+- BitPackedLife: toroidal grid packed 64 cells per uint64 word. Neighbour
+  counts come from bitwise half/full adders over shifted copies of the grid,
+  so one generation is a few dozen whole-array NumPy operations.
+- HashLife: unbounded plane stored as a hash-consed quadtree with memoized
+  successors. Huge sparse or periodic patterns can jump 2^k generations at
+  once.
+
+Example:
+    grid = np.random.choice([1, 0], size=(1024, 1024), p=[0.3, 0.7])
+    engine = make_engine(grid, backend='bitpacked')
+    engine.step(100)
+    plt.imshow(engine.to_array())
+"""
+import numpy as np
+
+WORD_BITS = 64
+_ONE = np.uint64(1)
+_TOP = np.uint64(WORD_BITS - 1)
+
+
+def pack_grid(grid):
+    """Pack a 2D 0/1 array into rows of uint64 words (bit j of word k = column 64k + j)."""
+    grid = np.asarray(grid)
+    rows, cols = grid.shape
+    words = -(-cols // WORD_BITS)
+    padded = np.zeros((rows, words * WORD_BITS), dtype=np.uint8)
+    padded[:, :cols] = grid != 0
+    packed = np.packbits(padded, axis=1, bitorder='little')
+    return packed.view('<u8').astype(np.uint64, copy=False)
+
+
+def unpack_grid(packed, cols):
+    """Unpack uint64 rows produced by pack_grid back into a 0/1 uint8 array."""
+    as_bytes = np.ascontiguousarray(packed).astype('<u8', copy=False).view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, count=cols, bitorder='little')
+
+
+class BitPackedLife:
+    """Conway's Game of Life on a torus, 64 cells per machine word."""
+
+    def __init__(self, grid):
+        grid = np.asarray(grid)
+        self.shape = grid.shape
+        self.generation = 0
+        self.cells = pack_grid(grid)
+
+        rows, cols = self.shape
+        self._pad_bit = (cols - 1) % WORD_BITS
+        self._padded = cols % WORD_BITS != 0
+        # Mask of the real (non-padding) bits in the last word of each row
+        self._last_mask = np.uint64((1 << (self._pad_bit + 1)) - 1)
+
+    def _west(self, x):
+        """Value of the cell to the left (column c - 1), wrapping around."""
+        carry = np.roll(x, 1, axis=1) >> _TOP
+        if self._padded:
+            carry[:, 0] = (x[:, -1] >> np.uint64(self._pad_bit)) & _ONE
+        return (x << _ONE) | carry
+
+    def _east(self, x):
+        """Value of the cell to the right (column c + 1), wrapping around."""
+        shifted = x >> _ONE
+        carry = np.roll(x, -1, axis=1) << _TOP
+        if self._padded:
+            carry[:, -1] = (x[:, 0] & _ONE) << np.uint64(self._pad_bit)
+        return shifted | carry
+
+    def _next(self, x):
+        """Compute one generation of packed cells."""
+        west = self._west(x)
+        east = self._east(x)
+
+        # Horizontal sums: three cells (0-3) for the rows above and below,
+        # two cells (0-2) for the cell's own row
+        sum3_lo = west ^ x ^ east
+        sum3_hi = (west & x) | (east & (west ^ x))
+        mid_lo = west ^ east
+        mid_hi = west & east
+
+        up_lo = np.roll(sum3_lo, 1, axis=0)
+        up_hi = np.roll(sum3_hi, 1, axis=0)
+        down_lo = np.roll(sum3_lo, -1, axis=0)
+        down_hi = np.roll(sum3_hi, -1, axis=0)
+
+        # up + down (0-6) as bits t0, t1, t2
+        t0 = up_lo ^ down_lo
+        carry = up_lo & down_lo
+        t1 = up_hi ^ down_hi ^ carry
+        t2 = (up_hi & down_hi) | (carry & (up_hi ^ down_hi))
+
+        # + own row (0-8) as bits u0, u1, u2, u3
+        u0 = t0 ^ mid_lo
+        carry = t0 & mid_lo
+        u1 = t1 ^ mid_hi ^ carry
+        carry = (t1 & mid_hi) | (carry & (t1 ^ mid_hi))
+        u2 = t2 ^ carry
+        u3 = t2 & carry
+
+        # Alive next: count == 3, or count == 2 and alive now
+        result = u1 & ~(u2 | u3) & (u0 | x)
+        if self._padded:
+            result[:, -1] &= self._last_mask
+        return result
+
+    def step(self, generations=1):
+        """Advance the grid by a number of generations."""
+        cells = self.cells
+        for _ in range(generations):
+            cells = self._next(cells)
+        self.cells = cells
+        self.generation += generations
+        return self
+
+    def population(self):
+        """Number of live cells."""
+        return int(np.unpackbits(self.cells.view(np.uint8)).sum())
+
+    def to_array(self):
+        """Current grid as a 0/1 uint8 array."""
+        return unpack_grid(self.cells, self.shape[1])
+
+
+class _Node:
+    """Quadtree node; level-0 nodes are single cells."""
+
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+class HashLife:
+    """
+    Conway's Game of Life on an unbounded plane using HashLife.
+
+    Nodes are canonical (hash-consed), so identical regions are stored once
+    and the successor of each region is computed once per step size.
+    Unlike BitPackedLife, cells never wrap around; to_array() returns the
+    window the engine was created with.
+    """
+
+    def __init__(self, grid):
+        grid = np.asarray(grid) != 0
+        self.shape = grid.shape
+        self.generation = 0
+
+        self._nodes = {}
+        self._zeros = []
+        self._successors = {}
+        self.off = _Node(0, None, None, None, None, 0)
+        self.on = _Node(0, None, None, None, None, 1)
+
+        level = 3
+        while (1 << level) < max(self.shape):
+            level += 1
+        # Top-left corner of the root node in grid coordinates
+        self.origin = (0, 0)
+        self.root = self._build(grid, 0, 0, level)
+
+    def join(self, nw, ne, sw, se):
+        """Get the canonical node with the given quadrants."""
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            node = _Node(nw.level + 1, nw, ne, sw, se,
+                         nw.population + ne.population + sw.population + se.population)
+            self._nodes[key] = node
+        return node
+
+    def zero(self, level):
+        """Get the empty node of a level."""
+        while len(self._zeros) <= level:
+            if not self._zeros:
+                self._zeros.append(self.off)
+            else:
+                z = self._zeros[-1]
+                self._zeros.append(self.join(z, z, z, z))
+        return self._zeros[level]
+
+    def _build(self, grid, row, col, level):
+        """Build the node covering grid[row:row + 2^level, col:col + 2^level]."""
+        size = 1 << level
+        block = grid[row:row + size, col:col + size]
+        if not block.any():
+            return self.zero(level)
+        if level == 0:
+            return self.on
+        half = size >> 1
+        return self.join(
+            self._build(grid, row, col, level - 1),
+            self._build(grid, row, col + half, level - 1),
+            self._build(grid, row + half, col, level - 1),
+            self._build(grid, row + half, col + half, level - 1),
+        )
+
+    def _centre(self, node):
+        """Embed a node in the middle of an empty node one level up."""
+        z = self.zero(node.level - 1)
+        return self.join(
+            self.join(z, z, z, node.nw),
+            self.join(z, z, node.ne, z),
+            self.join(z, node.sw, z, z),
+            self.join(node.se, z, z, z),
+        )
+
+    def _inner(self, node):
+        """Central node one level down."""
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _is_padded(self, node):
+        """True when every live cell lies in the central half of the node."""
+        return node.level >= 3 and self._inner(node).population == node.population
+
+    def _life_4x4(self, node):
+        """One generation of the central 2x2 cells of a level-2 node."""
+        cells = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        bits = [[cell.population for cell in row] for row in cells]
+
+        def rule(r, c):
+            total = sum(bits[r + dr][c + dc]
+                        for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+            alive = total == 3 or (total == 2 and bits[r][c])
+            return self.on if alive else self.off
+
+        return self.join(rule(1, 1), rule(1, 2), rule(2, 1), rule(2, 2))
+
+    def _successor(self, node, j):
+        """
+        Central node one level down, advanced 2^j generations (j <= level - 2).
+
+        Memoized per (node, j).
+        """
+        if node.population == 0:
+            return node.nw
+        key = (node, j)
+        result = self._successors.get(key)
+        if result is not None:
+            return result
+
+        if node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            j = min(j, node.level - 2)
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            join = self.join
+            c1 = self._successor(join(nw.nw, nw.ne, nw.sw, nw.se), j)
+            c2 = self._successor(join(nw.ne, ne.nw, nw.se, ne.sw), j)
+            c3 = self._successor(join(ne.nw, ne.ne, ne.sw, ne.se), j)
+            c4 = self._successor(join(nw.sw, nw.se, sw.nw, sw.ne), j)
+            c5 = self._successor(join(nw.se, ne.sw, sw.ne, se.nw), j)
+            c6 = self._successor(join(ne.sw, ne.se, se.nw, se.ne), j)
+            c7 = self._successor(join(sw.nw, sw.ne, sw.sw, sw.se), j)
+            c8 = self._successor(join(sw.ne, se.nw, sw.se, se.sw), j)
+            c9 = self._successor(join(se.nw, se.ne, se.sw, se.se), j)
+            if j < node.level - 2:
+                # Already advanced 2^j; just stitch the centres together
+                result = join(
+                    join(c1.se, c2.sw, c4.ne, c5.nw),
+                    join(c2.se, c3.sw, c5.ne, c6.nw),
+                    join(c4.se, c5.sw, c7.ne, c8.nw),
+                    join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                # Advance a second half-step on the overlapping 2x2 groups
+                result = join(
+                    self._successor(join(c1, c2, c4, c5), j),
+                    self._successor(join(c2, c3, c5, c6), j),
+                    self._successor(join(c4, c5, c7, c8), j),
+                    self._successor(join(c5, c6, c8, c9), j),
+                )
+
+        self._successors[key] = result
+        return result
+
+    def _advance_power(self, j):
+        """Advance the root by exactly 2^j generations without losing cells."""
+        node = self.root
+        row, col = self.origin
+        # Live cells must sit in the central quarter and the node must be
+        # big enough for a 2^j step, so nothing moves past the result's edge
+        while node.level < j + 2 or not self._is_padded(node):
+            row -= 1 << (node.level - 1)
+            col -= 1 << (node.level - 1)
+            node = self._centre(node)
+        row -= 1 << (node.level - 1)
+        col -= 1 << (node.level - 1)
+        node = self._centre(node)
+
+        offset = 1 << (node.level - 2)
+        node = self._successor(node, j)
+        self.root = node
+        self.origin = (row + offset, col + offset)
+        self._crop()
+
+    def _crop(self):
+        """Shrink the root while all live cells stay inside its central half."""
+        node = self.root
+        row, col = self.origin
+        while node.level > 3 and self._is_padded(node):
+            offset = 1 << (node.level - 2)
+            node = self._inner(node)
+            row += offset
+            col += offset
+        self.root = node
+        self.origin = (row, col)
+
+    def step(self, generations=1):
+        """Advance by a number of generations (any count, one jump per set bit)."""
+        remaining = generations
+        j = 0
+        while remaining:
+            if remaining & 1:
+                self._advance_power(j)
+            remaining >>= 1
+            j += 1
+        self.generation += generations
+        return self
+
+    def clear_cache(self):
+        """Drop memoized successors (and nodes no longer reachable from the root)."""
+        self._successors.clear()
+        live = {}
+
+        def keep(node):
+            if node.level == 0:
+                return
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key in live:
+                return
+            live[key] = node
+            for child in key:
+                keep(child)
+
+        keep(self.root)
+        for zero in self._zeros[1:]:
+            live[(zero.nw, zero.ne, zero.sw, zero.se)] = zero
+        self._nodes = live
+
+    def population(self):
+        """Number of live cells on the whole plane."""
+        return self.root.population
+
+    def cells(self):
+        """Coordinates (row, col) of every live cell on the plane."""
+        found = []
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            node, row, col = stack.pop()
+            if node.population == 0:
+                continue
+            if node.level == 0:
+                found.append((row, col))
+                continue
+            half = 1 << (node.level - 1)
+            stack.append((node.nw, row, col))
+            stack.append((node.ne, row, col + half))
+            stack.append((node.sw, row + half, col))
+            stack.append((node.se, row + half, col + half))
+        return found
+
+    def to_array(self, window=None):
+        """
+        Live cells inside a window as a 0/1 uint8 array.
+
+        Args:
+            window: (row, col, height, width); defaults to the initial grid
+        """
+        top, left, height, width = window or (0, 0) + tuple(self.shape)
+        out = np.zeros((height, width), dtype=np.uint8)
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            node, row, col = stack.pop()
+            size = 1 << node.level
+            if (node.population == 0 or row >= top + height or col >= left + width
+                    or row + size <= top or col + size <= left):
+                continue
+            if node.level == 0:
+                out[row - top, col - left] = 1
+                continue
+            half = size >> 1
+            stack.append((node.nw, row, col))
+            stack.append((node.ne, row, col + half))
+            stack.append((node.sw, row + half, col))
+            stack.append((node.se, row + half, col + half))
+        return out
+
+
+BACKENDS = {
+    'bitpacked': BitPackedLife,
+    'hashlife': HashLife,
+}
+
+
+def make_engine(grid, backend='bitpacked'):
+    """Create a Life engine for a 2D 0/1 grid."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[backend](grid)
@@ -5,33 +5,36 @@ import io
 import tempfile
 import shutil
 import logging
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
-from pdf_handler import PDFHandler
+from pdf_handler import PDFHandler, render_page_png
+from document_store import DocumentStore
 from annotation_manager import AnnotationManager
-import fitz  # PyMuPDF
-from PIL import Image
-
-# Setup logging to both file and console
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('flask_debug.log'),
-        logging.StreamHandler()
-    ]
+from thumbnail_service import ThumbnailService, THUMBNAIL_DPI
+from search_index import SearchIndexService
+from tile_renderer import TileRenderer
+from job_queue import DONE, FINISHED_STATES, JobQueue, sse_events
+from vector_strokes import (
+    DEFAULT_TOLERANCE, add_ink_annotation, decode_image_data, insert_image_stream,
+    map_strokes_to_rect, parse_strokes, simplify_strokes, strokes_bounds,
+)
+from structured_logging import (
+    configure_logging, get_profile, log_event, log_payload, metrics, register_request_metrics,
 )
+import fitz  # PyMuPDF
 
-# Also enable verbose Flask logging
-app_logger = logging.getLogger('werkzeug')
-app_logger.setLevel(logging.DEBUG)
+# Setup logging (BANANAPDF_LOG_PROFILE=production keeps hot paths quiet)
+configure_logging()
+logger = logging.getLogger('bananapdf')
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 CORS(app)
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+register_request_metrics(app)
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
@@ -44,10 +47,83 @@ if not os.path.exists(UPLOAD_FOLDER):
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
+document_store = DocumentStore(UPLOAD_FOLDER)
+
 # Global state management
 current_session = None
 pdf_handler = None
 annotation_manager = None
+# Held while the globals above are switched to another document
+session_lock = threading.RLock()
+thumbnail_service = ThumbnailService()
+search_service = SearchIndexService()
+job_queue = JobQueue()
+tile_renderer = TileRenderer()
+
+# Seconds /api/search waits for an index that is still building
+SEARCH_WAIT_SECONDS = 10
+
+
+def _describe_uploads():
+    """Summarize the uploads folder (only evaluated when DEBUG logging is on)"""
+    if not os.path.exists(UPLOAD_FOLDER):
+        return 'missing'
+    with os.scandir(UPLOAD_FOLDER) as entries:
+        return [(entry.name, entry.stat().st_size) for entry in entries if entry.is_file()]
+
+
+def _source_rotations():
+    """Get page rotations indexed by original page number"""
+    rotations = [0] * pdf_handler.get_page_count()
+    if current_session:
+        for page in current_session['pages']:
+            rotations[page['index']] = page.get('rotation', 0)
+    return rotations
+
+
+def _discard_working_copy(filepath):
+    """Delete a session's private working copy; shared stored uploads are left to LRU cleanup"""
+    if not filepath or document_store.is_blob(filepath) or not os.path.isfile(filepath):
+        return
+    try:
+        os.remove(filepath)
+    except Exception as cleanup_error:
+        logger.warning('Failed to delete working copy %s: %s', filepath, cleanup_error)
+
+
+def _ensure_writable_copy():
+    """
+    Switch the session to a private copy before editing the PDF in place
+    
+    Stored uploads are content-addressed and may be shared, so the first
+    edit copies the blob and reopens the handler on the copy.
+    """
+    global pdf_handler
+    filepath = current_session.get('filepath')
+    digest = current_session.get('contentHash')
+    if not digest or not document_store.is_blob(filepath):
+        return
+    working_path = document_store.make_working_copy(digest)
+    pdf_handler = PDFHandler(working_path)
+    current_session['filepath'] = working_path
+    current_session['filename'] = os.path.basename(working_path)
+
+
+def _wants_async(data=None):
+    """Check whether the client asked for a job ID instead of a blocking response"""
+    if request.args.get('async') == '1':
+        return True
+    return isinstance(data, dict) and data.get('async') is True
+
+
+def _job_accepted(job):
+    """Response returned when work has been enqueued"""
+    return jsonify({
+        'jobId': job.id,
+        'status': job.status,
+        'statusUrl': f'/api/jobs/{job.id}',
+        'resultUrl': f'/api/jobs/{job.id}/result',
+    }), 202
 
 
 def allowed_file(filename):
@@ -66,20 +142,15 @@ def reset_session():
     """Clear the current session (useful for starting fresh)"""
     global pdf_handler, annotation_manager, current_session
     try:
-        # Close and cleanup the current PDF
-        if pdf_handler and current_session:
-            filepath = current_session.get('filepath')
-            if filepath and os.path.isfile(filepath):
-                try:
-                    os.remove(filepath)
-                    logging.info(f"Cleaned up PDF file: {filepath}")
-                except Exception as e:
-                    logging.warning(f"Could not delete PDF file: {e}")
-        
-        # Reset all global state
-        pdf_handler = None
-        annotation_manager = None
-        current_session = None
+        with session_lock:
+            # Close and cleanup the current PDF (shared uploads stay in the store)
+            if pdf_handler and current_session:
+                _discard_working_copy(current_session.get('filepath'))
+            
+            # Reset all global state
+            pdf_handler = None
+            annotation_manager = None
+            current_session = None
         
         logging.info("Session reset successfully")
         return jsonify({'message': 'Session reset'}), 200
@@ -102,74 +173,94 @@ def upload_pdf():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Only PDF files are allowed'}), 400
         
-        # Save file
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-        filename = timestamp + filename
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        
-        print(f"\n--- UPLOAD ---")
-        print(f"Original filename: {file.filename}")
-        print(f"Secure filename: {filename}")
-        print(f"Saving to: {filepath}")
-        
-        file.save(filepath)
-        
-        print(f"File saved successfully")
-        file_exists = os.path.isfile(filepath)
-        file_size = os.path.getsize(filepath) if file_exists else 0
-        print(f"Verify - file exists: {file_exists}, size: {file_size} bytes")
-        
-        # Clean up previous uploaded file if one exists
-        global pdf_handler, annotation_manager, current_session
-        if current_session and current_session.get('filepath'):
-            old_filepath = current_session.get('filepath')
-            if old_filepath != filepath and os.path.isfile(old_filepath):
-                try:
-                    os.remove(old_filepath)
-                    print(f"Cleaned up previous upload: {old_filepath}")
-                except Exception as cleanup_error:
-                    print(f"⚠ Warning: Failed to delete previous upload: {cleanup_error}")
-        
-        # Initialize PDF handler and annotation manager
-        pdf_handler = PDFHandler(filepath)
-        annotation_manager = AnnotationManager()
+        # Save file under its content hash (identical uploads are stored once)
+        digest, filepath, is_new = document_store.put(file.stream, file.filename)
+        log_event(logger, logging.DEBUG, 'upload.saved',
+                  original_filename=file.filename, path=filepath, new=is_new)
         
-        # Get PDF info
-        page_count = pdf_handler.get_page_count()
-        
-        current_session = {
-            'filename': filename,
-            'filepath': filepath,
-            'originalFilename': file.filename,
-            'pageCount': page_count,
-            'isModified': False,
-            'createdAt': datetime.now().isoformat(),
-            'pages': [{'index': i, 'rotation': 0, 'deleted': False} for i in range(page_count)],
-            'annotations': {},
-            'textBoxes': {},
-        }
+        if _wants_async():
+            job = job_queue.submit('upload', _open_upload, digest, file.filename)
+            return _job_accepted(job)
+        
+        session = _activate_upload(_open_upload(None, digest, file.filename))
         
         return jsonify({
             'success': True,
-            'session': current_session,
-            'pageCount': page_count,
+            'session': session,
+            'pageCount': session['pageCount'],
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _open_upload(job, digest, original_filename):
+    """
+    Parse a stored upload and start its background work (runs inline or as a job)
+    
+    Touches no session globals; the request thread switches the session
+    with _activate_upload.
+    
+    Returns:
+        dict with contentHash, originalFilename and pageCount
+    """
+    # PDF handler is cached per content hash, so activating it later is free
+    if job:
+        job.report(0.1, 'Parsing PDF')
+    handler = document_store.get_handler(digest)
+    page_count = handler.get_page_count()
+    
+    # Start rendering the page overview in the background
+    thumbnail_service.prefetch(handler.filepath, page_count, THUMBNAIL_DPI)
+    search_service.start(handler.filepath, page_count)
+    
+    return {
+        'contentHash': digest,
+        'originalFilename': original_filename,
+        'pageCount': page_count,
+    }
+
+
+def _activate_upload(upload):
+    """Make a parsed upload the current session (request thread only)"""
+    global pdf_handler, annotation_manager, current_session
+    digest = upload['contentHash']
+    handler = document_store.get_handler(digest)
+    filepath = handler.filepath
+    page_count = handler.get_page_count()
+    session = {
+        'filename': os.path.basename(filepath),
+        'filepath': filepath,
+        'contentHash': digest,
+        'originalFilename': upload['originalFilename'],
+        'pageCount': page_count,
+        'isModified': False,
+        'createdAt': datetime.now().isoformat(),
+        'pages': [{'index': i, 'rotation': 0, 'deleted': False} for i in range(page_count)],
+        'annotations': {},
+        'textBoxes': {},
+    }
+    
+    with session_lock:
+        # Clean up the previous session's working copy if one exists
+        if current_session:
+            _discard_working_copy(current_session.get('filepath'))
+        pdf_handler = handler
+        annotation_manager = AnnotationManager()
+        current_session = session
+    
+    document_store.evict(keep={digest})
+    return session
+
+
 @app.route('/api/debug-ping', methods=['POST', 'GET'])
 def debug_ping():
     """Simple debug endpoint to test if requests are reaching Flask"""
     method = request.method
     data = request.get_json() if method == 'POST' else None
-    print(f"\n{'='*60}")
-    print(f"DEBUG PING - Method: {method}")
+    log_event(logger, logging.INFO, 'debug.ping', method=method)
     if data:
-        print(f"Data received: {json.dumps(data, indent=2)}")
-    print(f"{'='*60}\n")
+        log_payload(logger, 'debug.ping.payload', data=lambda: json.dumps(data))
     return jsonify({
         'success': True,
         'message': f'Debug ping received via {method}',
@@ -190,6 +281,12 @@ def render_page(page_num):
         if current_session and page_num < len(current_session['pages']):
             rotation = current_session['pages'][page_num].get('rotation', 0)
         
+        if _wants_async():
+            if page_num < 0 or page_num >= pdf_handler.get_page_count():
+                return jsonify({'error': f'Invalid page number: {page_num}'}), 400
+            job = job_queue.submit('render', _render_page_job, pdf_handler.filepath, page_num, rotation)
+            return _job_accepted(job)
+        
         image_data = pdf_handler.render_page(page_num, rotation=rotation)
         
         return send_file(
@@ -202,6 +299,161 @@ def render_page(page_num):
         return jsonify({'error': str(e)}), 500
 
 
+def _render_page_job(job, filepath, page_num, rotation):
+    """Render a page as a job result from a private document handle"""
+    with fitz.open(filepath) as doc:
+        return {
+            'data': render_page_png(doc[page_num], rotation).getvalue(),
+            'mimetype': 'image/png',
+        }
+
+
+@app.route('/api/thumbnails')
+def get_thumbnails():
+    """Get the page overview: sprite sheets plus a JSON offset map for every page"""
+    try:
+        if pdf_handler is None:
+            return jsonify({'error': 'No PDF loaded'}), 400
+        
+        dpi = request.args.get('dpi', THUMBNAIL_DPI, type=int)
+        if dpi < 6 or dpi > 72:
+            return jsonify({'error': 'dpi must be between 6 and 72'}), 400
+        inline = request.args.get('inline', '0') == '1'
+        
+        strip = thumbnail_service.get(
+            pdf_handler.filepath,
+            pdf_handler.get_page_count(),
+            dpi=dpi,
+            rotations=_source_rotations(),
+        )
+        
+        overview = strip.offset_map()
+        if inline:
+            import base64
+            overview['sheets'] = [
+                f'data:image/png;base64,{base64.b64encode(sheet).decode("utf-8")}'
+                for sheet in strip.sheets
+            ]
+        else:
+            overview['sheets'] = [
+                f'/api/thumbnails/{strip.revision}/{sheet_index}'
+                for sheet_index in range(len(strip.sheets))
+            ]
+        
+        return jsonify(overview), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/thumbnails/<revision>/<int:sheet_index>')
+def get_thumbnail_sheet(revision, sheet_index):
+    """Serve one sprite sheet of a cached thumbnail revision"""
+    try:
+        strip = thumbnail_service.get_revision(revision)
+        if strip is None:
+            return jsonify({'error': 'Thumbnail revision not found'}), 404
+        if sheet_index < 0 or sheet_index >= len(strip.sheets):
+            return jsonify({'error': f'Invalid sheet index: {sheet_index}'}), 404
+        
+        # Revisions are content-addressed, so sheets can be cached by the browser
+        return send_file(
+            io.BytesIO(strip.sheets[sheet_index]),
+            mimetype='image/png',
+            as_attachment=False,
+            max_age=31536000,
+        ), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def _page_rotation(page_num):
+    """Get the session rotation of a source page"""
+    if current_session and page_num < len(current_session['pages']):
+        return current_session['pages'][page_num].get('rotation', 0)
+    return 0
+
+
+@app.route('/api/tiles/<int:page_num>')
+def get_tile_info(page_num):
+    """Describe the deep-zoom levels and tile grid of a page"""
+    try:
+        if pdf_handler is None:
+            return jsonify({'error': 'No PDF loaded'}), 400
+        if page_num < 0 or page_num >= pdf_handler.get_page_count():
+            return jsonify({'error': f'Invalid page number: {page_num}'}), 404
+        
+        rotation = _page_rotation(page_num)
+        info = tile_renderer.describe(pdf_handler.filepath, page_num, rotation)
+        info['url'] = f'/api/tiles/{page_num}/{{z}}/{{x}}/{{y}}.png?rotation={rotation}'
+        return jsonify(info), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/tiles/<int:page_num>/<int:level>/<int:x>/<int:y>.png')
+def get_tile(page_num, level, x, y):
+    """Render one deep-zoom tile (XYZ addressing, level 0 = whole page in one tile)"""
+    try:
+        if pdf_handler is None:
+            return jsonify({'error': 'No PDF loaded'}), 400
+        
+        rotation = request.args.get('rotation', type=int)
+        if rotation is None:
+            rotation = _page_rotation(page_num)
+        
+        try:
+            png_bytes = tile_renderer.render_tile(pdf_handler.filepath, page_num, level, x, y, rotation)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 404
+        
+        return send_file(
+            io.BytesIO(png_bytes),
+            mimetype='image/png',
+            as_attachment=False,
+        ), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/search')
+def search():
+    """Search the current PDF; returns hits with highlight rectangles in PDF points"""
+    try:
+        if pdf_handler is None:
+            return jsonify({'error': 'No PDF loaded'}), 400
+        
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Query parameter q is required'}), 400
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        prefix = request.args.get('prefix', '0') == '1'
+        
+        try:
+            index = search_service.get(pdf_handler.filepath, pdf_handler.get_page_count(),
+                                       timeout=SEARCH_WAIT_SECONDS)
+        except FuturesTimeoutError:
+            return jsonify({'status': 'indexing', 'message': 'Search index is still being built'}), 202
+        
+        # One extra hit tells a full page apart from a truncated one
+        hits = index.search(query, limit=limit + 1, prefix=prefix)
+        truncated = len(hits) > limit
+        hits = hits[:limit]
+        
+        return jsonify({
+            'query': query,
+            'hits': hits,
+            'hitCount': len(hits),
+            'truncated': truncated,
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/get-pdf-data')
 def get_pdf_data():
     """Get PDF metadata"""
@@ -243,7 +495,7 @@ def get_pdf():
         if not filepath or not os.path.isfile(filepath):
             return jsonify({'error': 'PDF file not found'}), 404
         
-        print(f"Serving PDF: {filepath}")
+        log_event(logger, logging.DEBUG, 'pdf.serve', path=filepath)
         
         return send_file(
             filepath,
@@ -315,15 +567,12 @@ def add_textbox():
     try:
         global pdf_handler, current_session
         
-        logging.info(f"\n{'='*60}")
-        logging.info("ADD-TEXTBOX ENDPOINT CALLED")
-        
         if pdf_handler is None:
-            logging.error('No PDF loaded')
+            logger.warning('add-textbox: no PDF loaded')
             return jsonify({'error': 'No PDF loaded'}), 400
             
         if current_session is None:
-            logging.error('No session active')
+            logger.warning('add-textbox: no session active')
             return jsonify({'error': 'No session active'}), 400
         
         data = request.get_json()
@@ -344,8 +593,6 @@ def add_textbox():
         if len(text_content) > 1000:
             return jsonify({'error': 'Text content too long (max 1000 characters)'}), 400
         
-        logging.info(f"Page: {page_num}, Text: {text_content}")
-        
         # Create text box object
         textbox = {
             'id': f"text_{int(datetime.now().timestamp() * 1000)}",
@@ -360,20 +607,18 @@ def add_textbox():
             'color': data.get('color', '#000000'),
         }
         
-        logging.info(f"Text box: {textbox}")
+        log_payload(logger, 'textbox.request', page=page_num, textbox=textbox)
         
         # Store in session
-        logging.info(f"Storing in session...")
         if 'textBoxes' not in current_session:
             current_session['textBoxes'] = {}
         
         current_session['textBoxes'][textbox['id']] = textbox
         current_session['isModified'] = True
-        logging.info(f"✓ Text box stored in session")
         
         # Add text box directly to PDF in memory
-        logging.info(f"Adding text box to PDF in memory...")
         try:
+            _ensure_writable_copy()
             page = pdf_handler.doc[page_num]
             
             # Convert color hex to RGB
@@ -391,62 +636,41 @@ def add_textbox():
                            textbox['x'] + textbox['width'], 
                            textbox['y'] + textbox['height'])
             
-            logging.info(f"DEBUG: Creating textbox:")
-            logging.info(f"  Rect: {rect}")
-            logging.info(f"  Text: {textbox['text']}")
-            logging.info(f"  FontSize: {textbox['fontSize']}")
-            logging.info(f"  Color RGB: {color_rgb}")
-            
             page.insert_textbox(rect, textbox['text'], fontsize=textbox['fontSize'], 
                               color=color_rgb)
             
-            logging.info(f"✓ Text box added to PDF in memory")
-            
             # Save the PDF file with changes using a temporary file
             # (direct save to original fails with encryption changes)
-            logging.info(f"DEBUG: Saving PDF to {pdf_handler.filepath}")
-            
             temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
             os.close(temp_fd)
             
             try:
                 pdf_handler.doc.save(temp_path)
                 shutil.move(temp_path, pdf_handler.filepath)
-                logging.info(f"✓ PDF file saved with text box changes")
-                
-                # Verify the save
-                file_size = os.path.getsize(pdf_handler.filepath)
-                logging.info(f"DEBUG: PDF file size after save: {file_size} bytes")
+                log_event(logger, logging.DEBUG, 'textbox.saved', page=page_num,
+                          bytes=lambda: os.path.getsize(pdf_handler.filepath))
                 
                 # Reload the PDF document to ensure subsequent operations see the updated file
-                logging.info(f"Reloading PDF document...")
                 pdf_handler.reload()
-                logging.info(f"✓ PDF document reloaded")
                 
             except Exception as save_err:
                 if os.path.exists(temp_path):
                     os.remove(temp_path)
                 raise save_err
             
-        except Exception as pdf_err:
-            logging.error(f"ERROR: Could not add to PDF in memory: {pdf_err}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception('add-textbox: could not add text box to PDF in memory')
             # Continue anyway - will be added at save time
         
         # Re-render the page to show the updated PDF with text box
-        logging.info(f"Re-rendering page with text box...")
         image_base64 = None
         try:
             import base64
             page_image = pdf_handler.render_page(page_num)
             image_base64 = base64.b64encode(page_image.getvalue()).decode('utf-8')
-            logging.info(f"✓ Page re-rendered")
             
         except Exception as render_err:
-            logging.warning(f"Warning: Could not re-render page: {render_err}")
-        
-        logging.info(f"{'='*60}\n")
+            logger.warning('add-textbox: could not re-render page %s: %s', page_num, render_err)
         
         response = {
             'success': True,
@@ -462,10 +686,7 @@ def add_textbox():
         
     except Exception as e:
         error_msg = str(e)
-        logging.error(f"EXCEPTION in add_textbox: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        print(f"{'='*60}\n")
+        logger.exception('add-textbox failed')
         return jsonify({'error': f'Failed to add text box: {error_msg}'}), 500
 
 
@@ -519,231 +740,118 @@ def add_comment():
         return jsonify({'error': f'Failed to add comment: {error_msg}'}), 500
 
 
-@app.route('/api/add-drawing', methods=['POST'])
-def add_drawing():
-    """Add drawing to PDF"""
-    try:
-        global pdf_handler, current_session
-        
-        logging.info("ADD-DRAWING ENDPOINT CALLED")
-        
-        if pdf_handler is None:
-            return jsonify({'error': 'No PDF loaded'}), 400
-        
-        data = request.get_json()
-        page_num = data.get('pageNum', 0)
-        
-        if page_num < 0 or page_num >= pdf_handler.get_page_count():
-            return jsonify({'error': f'Invalid page number: {page_num}'}), 400
-        
-        # Extract image data (base64)
+def _insert_ink(kind, default_width, default_height):
+    """
+    Insert a drawing or signature into the current PDF
+    
+    Vector mode ('strokes': point arrays) simplifies each stroke with
+    Ramer-Douglas-Peucker and writes a PDF ink annotation. Raster mode
+    ('imageData': base64 PNG) inserts the image straight from memory.
+    Points are PDF coordinates unless 'canvasWidth'/'canvasHeight' are
+    given, in which case they are mapped from the canvas into the x/y/
+    width/height rectangle.
+    """
+    global pdf_handler, current_session
+    
+    if pdf_handler is None:
+        return jsonify({'error': 'No PDF loaded'}), 400
+    
+    data = request.get_json()
+    page_num = data.get('pageNum', 0)
+    
+    if page_num < 0 or page_num >= pdf_handler.get_page_count():
+        return jsonify({'error': f'Invalid page number: {page_num}'}), 400
+    
+    x = float(data.get('x', 50))
+    y = float(data.get('y', 50))
+    width = float(data.get('width', default_width))
+    height = float(data.get('height', default_height))
+    rect = fitz.Rect(x, y, x + width, y + height)
+    _ensure_writable_copy()
+    page = pdf_handler.doc[page_num]
+    
+    if data.get('strokes'):
+        try:
+            strokes = parse_strokes(data['strokes'])
+            if data.get('canvasWidth') and data.get('canvasHeight'):
+                strokes = map_strokes_to_rect(strokes, data['canvasWidth'], data['canvasHeight'], rect)
+            strokes = simplify_strokes(strokes, float(data.get('tolerance', DEFAULT_TOLERANCE)))
+        except (TypeError, ValueError) as stroke_err:
+            return jsonify({'error': f'Invalid stroke data: {stroke_err}'}), 400
+        
+        color_hex = data.get('color', '#000000').lstrip('#')
+        try:
+            color_rgb = tuple(int(color_hex[i:i+2], 16) / 255.0 for i in (0, 2, 4))
+        except ValueError:
+            color_rgb = (0, 0, 0)
+        
+        if add_ink_annotation(page, strokes, color_rgb, data.get('strokeWidth', 2)) is None:
+            return jsonify({'error': 'Strokes need at least two points'}), 400
+        
+        rect = strokes_bounds(strokes)
+        mode = 'vector'
+        log_event(logger, logging.DEBUG, f'{kind}.vector', page=page_num,
+                  strokes=len(strokes), points=lambda: sum(len(stroke) for stroke in strokes))
+    else:
         image_data = data.get('imageData', '')
         if not image_data:
             return jsonify({'error': 'No image data provided'}), 400
-        
-        # Convert base64 to image bytes
-        import base64
-        from PIL import Image
-        from io import BytesIO
-        
         try:
-            # Remove data URI prefix if present
-            if image_data.startswith('data:image/'):
-                image_data = image_data.split(',')[1]
-            
-            image_bytes = base64.b64decode(image_data)
-            image = Image.open(BytesIO(image_bytes))
-            
-            logging.info(f"Image size: {image.size}")
+            insert_image_stream(page, rect, decode_image_data(image_data))
         except Exception as img_err:
-            logging.error(f"Error processing image: {img_err}")
+            logger.warning('%s: invalid image data: %s', kind, img_err)
             return jsonify({'error': f'Invalid image data: {img_err}'}), 400
-        
-        # Add to PDF using PyMuPDF
-        try:
-            page = pdf_handler.doc[page_num]
-            
-            x = float(data.get('x', 50))
-            y = float(data.get('y', 50))
-            width = float(data.get('width', 200))
-            height = float(data.get('height', 150))
-            
-            # Save image to temporary file
-            temp_img_path = os.path.join(tempfile.gettempdir(), f'drawing_{int(datetime.now().timestamp() * 1000)}.png')
-            image.save(temp_img_path, 'PNG')
-            
-            # Insert image into PDF
-            rect = fitz.Rect(x, y, x + width, y + height)
-            page.insert_image(rect, filename=temp_img_path, overlay=True)
-            
-            logging.info(f"Drawing inserted at ({x}, {y})")
-            
-            # Save PDF
-            temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
-            os.close(temp_fd)
-            
-            try:
-                pdf_handler.doc.save(temp_path)
-                shutil.move(temp_path, pdf_handler.filepath)
-                logging.info(f"✓ PDF saved with drawing")
-                
-                pdf_handler.reload()
-                logging.info(f"✓ PDF reloaded")
-                
-            except Exception as save_err:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                raise save_err
-            finally:
-                # Clean up temp image
-                if os.path.exists(temp_img_path):
-                    os.remove(temp_img_path)
-            
-            # Store in session
-            if 'drawings' not in current_session:
-                current_session['drawings'] = {}
-            if page_num not in current_session['drawings']:
-                current_session['drawings'][page_num] = []
-            
-            drawing_info = {
-                'id': f"drawing_{int(datetime.now().timestamp() * 1000)}",
-                'x': x, 'y': y, 'width': width, 'height': height
-            }
-            current_session['drawings'][page_num].append(drawing_info)
-            current_session['isModified'] = True
-            
-            # Re-render page
-            page_image = pdf_handler.render_page(page_num)
-            image_base64 = base64.b64encode(page_image.getvalue()).decode('utf-8')
-            
-            return jsonify({
-                'success': True,
-                'drawing': drawing_info,
-                'pageImage': f'data:image/png;base64,{image_base64}',
-                'message': 'Drawing added'
-            }), 200
-            
-        except Exception as pdf_err:
-            logging.error(f"Error adding drawing to PDF: {pdf_err}")
-            raise pdf_err
-        
+        mode = 'raster'
+    
+    pdf_handler.save_changes()
+    
+    # Store in session
+    session_key = f'{kind}s'
+    if session_key not in current_session:
+        current_session[session_key] = {}
+    if page_num not in current_session[session_key]:
+        current_session[session_key][page_num] = []
+    
+    info = {
+        'id': f"{kind}_{int(datetime.now().timestamp() * 1000)}",
+        'mode': mode,
+        'x': rect.x0, 'y': rect.y0, 'width': rect.width, 'height': rect.height
+    }
+    current_session[session_key][page_num].append(info)
+    current_session['isModified'] = True
+    
+    # Re-render page
+    import base64
+    page_image = pdf_handler.render_page(page_num)
+    image_base64 = base64.b64encode(page_image.getvalue()).decode('utf-8')
+    
+    return jsonify({
+        'success': True,
+        kind: info,
+        'pageImage': f'data:image/png;base64,{image_base64}',
+        'message': f'{kind.capitalize()} added'
+    }), 200
+
+
+@app.route('/api/add-drawing', methods=['POST'])
+def add_drawing():
+    """Add drawing to PDF (vector strokes or PNG)"""
+    try:
+        return _insert_ink('drawing', 200, 150)
     except Exception as e:
         error_msg = str(e)
-        logging.error(f"Error in add-drawing: {error_msg}")
+        logger.exception('add-drawing failed')
         return jsonify({'error': f'Failed to add drawing: {error_msg}'}), 500
 
 
 @app.route('/api/add-signature', methods=['POST'])
 def add_signature():
-    """Add signature to PDF"""
+    """Add signature to PDF (vector strokes or PNG)"""
     try:
-        global pdf_handler, current_session
-        
-        logging.info("ADD-SIGNATURE ENDPOINT CALLED")
-        
-        if pdf_handler is None:
-            return jsonify({'error': 'No PDF loaded'}), 400
-        
-        data = request.get_json()
-        page_num = data.get('pageNum', 0)
-        
-        if page_num < 0 or page_num >= pdf_handler.get_page_count():
-            return jsonify({'error': f'Invalid page number: {page_num}'}), 400
-        
-        # Extract image data (base64)
-        image_data = data.get('imageData', '')
-        if not image_data:
-            return jsonify({'error': 'No image data provided'}), 400
-        
-        # Convert base64 to image bytes
-        import base64
-        from PIL import Image
-        from io import BytesIO
-        
-        try:
-            # Remove data URI prefix if present
-            if image_data.startswith('data:image/'):
-                image_data = image_data.split(',')[1]
-            
-            image_bytes = base64.b64decode(image_data)
-            image = Image.open(BytesIO(image_bytes))
-            
-            logging.info(f"Signature image size: {image.size}")
-        except Exception as img_err:
-            logging.error(f"Error processing signature image: {img_err}")
-            return jsonify({'error': f'Invalid image data: {img_err}'}), 400
-        
-        # Add to PDF using PyMuPDF
-        try:
-            page = pdf_handler.doc[page_num]
-            
-            x = float(data.get('x', 50))
-            y = float(data.get('y', 50))
-            width = float(data.get('width', 150))
-            height = float(data.get('height', 100))
-            
-            # Save image to temporary file
-            temp_img_path = os.path.join(tempfile.gettempdir(), f'signature_{int(datetime.now().timestamp() * 1000)}.png')
-            image.save(temp_img_path, 'PNG')
-            
-            # Insert image into PDF
-            rect = fitz.Rect(x, y, x + width, y + height)
-            page.insert_image(rect, filename=temp_img_path)
-            
-            logging.info(f"Signature inserted at ({x}, {y})")
-            
-            # Save PDF
-            temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
-            os.close(temp_fd)
-            
-            try:
-                pdf_handler.doc.save(temp_path)
-                shutil.move(temp_path, pdf_handler.filepath)
-                logging.info(f"✓ PDF saved with signature")
-                
-                pdf_handler.reload()
-                logging.info(f"✓ PDF reloaded")
-                
-            except Exception as save_err:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                raise save_err
-            finally:
-                # Clean up temp image
-                if os.path.exists(temp_img_path):
-                    os.remove(temp_img_path)
-            
-            # Store in session
-            if 'signatures' not in current_session:
-                current_session['signatures'] = {}
-            if page_num not in current_session['signatures']:
-                current_session['signatures'][page_num] = []
-            
-            signature_info = {
-                'id': f"signature_{int(datetime.now().timestamp() * 1000)}",
-                'x': x, 'y': y, 'width': width, 'height': height
-            }
-            current_session['signatures'][page_num].append(signature_info)
-            current_session['isModified'] = True
-            
-            # Re-render page
-            page_image = pdf_handler.render_page(page_num)
-            image_base64 = base64.b64encode(page_image.getvalue()).decode('utf-8')
-            
-            return jsonify({
-                'success': True,
-                'signature': signature_info,
-                'pageImage': f'data:image/png;base64,{image_base64}',
-                'message': 'Signature added'
-            }), 200
-            
-        except Exception as pdf_err:
-            logging.error(f"Error adding signature to PDF: {pdf_err}")
-            raise pdf_err
-        
+        return _insert_ink('signature', 150, 100)
     except Exception as e:
         error_msg = str(e)
-        logging.error(f"Error in add-signature: {error_msg}")
+        logger.exception('add-signature failed')
         return jsonify({'error': f'Failed to add signature: {error_msg}'}), 500
 
 
@@ -830,89 +938,56 @@ def save_pdf():
         if not text_boxes and current_session and 'textBoxes' in current_session:
             text_boxes = current_session['textBoxes']
         
-        print(f"\n{'='*60}")
-        print(f"SAVE REQUEST")
-        print(f"{'='*60}")
-        print(f"Original filename from frontend: {original_filename}")
-        print(f"PDF handler exists: {pdf_handler is not None}")
-        print(f"Session exists: {current_session is not None}")
-        print(f"\nAnnotations received (type={type(annotations)}, len={len(annotations) if isinstance(annotations, (list, dict)) else 'N/A'}):")
-        print(f"  Data: {annotations}")
-        print(f"\nText boxes from session (type={type(text_boxes)}, len={len(text_boxes) if isinstance(text_boxes, (list, dict)) else 'N/A'}):")
-        print(f"  Data: {text_boxes}")
-        
-        # Check the uploads folder contents RIGHT NOW
-        print(f"\nUploads folder: {os.path.abspath(UPLOAD_FOLDER)}")
-        print(f"Uploads folder exists: {os.path.exists(UPLOAD_FOLDER)}")
-        
-        if os.path.exists(UPLOAD_FOLDER):
-            files_in_folder = os.listdir(UPLOAD_FOLDER)
-            print(f"Files in uploads folder ({len(files_in_folder)} total):")
-            for f in files_in_folder:
-                full_path = os.path.join(UPLOAD_FOLDER, f)
-                size = os.path.getsize(full_path) if os.path.isfile(full_path) else 0
-                print(f"  - {f} ({size} bytes)")
-        else:
-            print("Uploads folder does NOT exist!")
-        
-        # If session is still valid, just use it
-        if pdf_handler is not None and current_session is not None:
-            print(f"\n✓ Session is valid, using stored filepath:")
-            print(f"  Filepath: {current_session.get('filepath')}")
-            file_exists = os.path.isfile(current_session.get('filepath', ''))
-            print(f"  File exists: {file_exists}")
-        else:
-            print(f"\n✗ Session is lost, attempting recovery...")
+        log_payload(logger, 'save.request',
+                    original_filename=original_filename,
+                    has_handler=pdf_handler is not None,
+                    has_session=current_session is not None,
+                    annotations=annotations,
+                    text_boxes=text_boxes)
+        log_event(logger, logging.DEBUG, 'save.uploads', files=_describe_uploads)
+        
+        # Recover the session from the uploads folder if it was lost
+        recovery_warning = None
+        if pdf_handler is None or current_session is None:
+            logger.info('save: session lost, attempting recovery for %s', original_filename)
             
             if not original_filename:
-                print("ERROR: No filename provided by frontend")
+                logger.warning('save: no filename provided by frontend')
                 return jsonify({
                     'error': 'Cannot recover session - no filename provided. Please reload and upload the PDF again.'
                 }), 400
             
-            # Search for the file
-            found_file = None
-            if os.path.exists(UPLOAD_FOLDER):
-                print(f"Searching for file ending with: {original_filename}")
-                for filename in os.listdir(UPLOAD_FOLDER):
-                    if filename.endswith(original_filename):
-                        found_file = os.path.join(UPLOAD_FOLDER, filename)
-                        print(f"✓ Found: {found_file}")
-                        break
-                    else:
-                        print(f"  No match: {filename} does not end with {original_filename}")
-            
-            if not found_file or not os.path.isfile(found_file):
-                files_in_folder = []
-                if os.path.exists(UPLOAD_FOLDER):
-                    files_in_folder = os.listdir(UPLOAD_FOLDER)
-                
-                error_msg = f'PDF file not found. Looking for: "{original_filename}". '
-                if files_in_folder:
-                    error_msg += f'Available files: {", ".join(files_in_folder[:5])}'
-                else:
-                    error_msg += 'The uploads folder is empty.'
-                
-                print(f"ERROR: {error_msg}")
+            # O(1) lookup in the document store index
+            digest, found_file = document_store.find_by_name(original_filename)
+            if not found_file:
+                error_msg = f'PDF file not found. Looking for: "{original_filename}". Please upload it again.'
+                logger.warning('save: %s', error_msg)
                 return jsonify({'error': error_msg}), 400
             
-            # Recover the session
+            # Recover the session. In-place edits (drawings, text boxes) live in
+            # the session's working copy, never in the stored blob, so prefer it.
             try:
-                print(f"Recovering from: {found_file}")
-                pdf_handler = PDFHandler(found_file)
+                working_path = document_store.find_working_copy(digest)
+                if working_path is None:
+                    working_path = document_store.make_working_copy(digest)
+                    recovery_warning = ('Session was lost and its working copy is gone; '
+                                        'edits already applied to the PDF were not recovered.')
+                    logger.warning('save: %s (%s)', recovery_warning, original_filename)
+                pdf_handler = PDFHandler(working_path)
                 page_count = pdf_handler.get_page_count()
                 current_session = {
-                    'filename': os.path.basename(found_file),
-                    'filepath': found_file,
+                    'filename': os.path.basename(working_path),
+                    'filepath': working_path,
+                    'contentHash': digest,
                     'originalFilename': original_filename,
                     'pageCount': page_count,
                     'pages': [{'index': i, 'rotation': 0, 'deleted': False} for i in range(page_count)],
                     'annotations': {},
                     'textBoxes': {},
                 }
-                print(f"✓ Session recovered. Pages: {page_count}")
+                logger.info('save: session recovered from %s (%d pages)', working_path, page_count)
             except Exception as e:
-                print(f"ERROR recovering session: {str(e)}")
+                logger.error('save: failed to recover session: %s', e)
                 return jsonify({'error': f'Failed to recover PDF: {str(e)}'}), 400
         
         # Validate pages
@@ -933,7 +1008,8 @@ def save_pdf():
             
             # Validate page index against actual PDF page count
             if orig_page_idx < 0 or orig_page_idx >= pdf_handler.get_page_count():
-                print(f"ERROR: Invalid page index {orig_page_idx} (PDF has {pdf_handler.get_page_count()} pages, received pageNum={page_num})")
+                logger.warning('save: invalid page index %d (PDF has %d pages)',
+                               orig_page_idx, pdf_handler.get_page_count())
                 return jsonify({'error': f'Invalid page index {page_num}'}), 400
             
             pages_to_export.append((orig_page_idx, page_info))
@@ -941,54 +1017,144 @@ def save_pdf():
         if not pages_to_export:
             return jsonify({'error': 'Cannot save: all pages have been deleted.'}), 400
         
-        print(f"\nExporting {len(pages_to_export)} pages (from {len(pages_data)} total)")
-        
-        # Create output PDF
-        from pdf_exporter import PDFExporter
-        exporter = PDFExporter(pdf_handler)
-        pdf_buffer = exporter.export(
+        export_args = (
+            pdf_handler,
             pages_to_export,
             annotations,
             text_boxes,
-            flatten=flatten,
+            flatten,
+            current_session.get('filepath'),
+            f'edited_{current_session.get("originalFilename", "document.pdf")}',
+            recovery_warning,
         )
         
-        print(f"✓ Export successful: {pdf_buffer.tell()} bytes in memory")
-        
-        # Clean up the uploaded file
-        uploaded_filepath = current_session.get('filepath')
-        if uploaded_filepath and os.path.isfile(uploaded_filepath):
-            try:
-                os.remove(uploaded_filepath)
-                print(f"✓ Cleaned up uploaded file: {uploaded_filepath}")
-            except Exception as cleanup_error:
-                print(f"⚠ Warning: Failed to delete uploaded file: {cleanup_error}")
-        
-        print(f"{'='*60}\n")
+        if _wants_async(data):
+            job = job_queue.submit('save', _export_pdf, *export_args)
+            return _job_accepted(job)
         
-        # Send BytesIO buffer directly as PDF response using response object
-        pdf_buffer.seek(0)
-        pdf_data = pdf_buffer.read()
-        
-        response = app.response_class(
-            response=pdf_data,
-            status=200,
-            mimetype='application/pdf',
-            headers={
-                'Content-Disposition': f'attachment; filename="edited_{current_session.get("originalFilename", "document.pdf")}"'
-            }
-        )
-        return response
+        return _file_response(_export_pdf(None, *export_args))
         
     except Exception as e:
         error_msg = str(e)
-        print(f"SAVE ERROR: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        print(f"{'='*60}\n")
+        logger.exception('save failed')
         return jsonify({'error': f'Failed to save PDF: {error_msg}'}), 500
 
 
+def _export_pdf(job, handler, pages_to_export, annotations, text_boxes, flatten,
+                uploaded_filepath, download_name, warning=None):
+    """Export the edited PDF (runs inline or as a job)"""
+    from pdf_exporter import PDFExporter
+    
+    progress = None
+    if job:
+        def progress(done, total):
+            job.report(done / total, f'Exported {done} of {total} pages')
+    
+    exporter = PDFExporter(handler)
+    pdf_buffer = exporter.export(
+        pages_to_export,
+        annotations,
+        text_boxes,
+        flatten=flatten,
+        progress=progress,
+    )
+    
+    # Clean up the session's working copy
+    _discard_working_copy(uploaded_filepath)
+    
+    return {
+        'data': pdf_buffer.getvalue(),
+        'mimetype': 'application/pdf',
+        'filename': download_name,
+        'warning': warning,
+    }
+
+
+def _file_response(result):
+    """Build a download response from a {'data', 'mimetype', 'filename'} result"""
+    headers = {}
+    if result.get('filename'):
+        headers['Content-Disposition'] = f'attachment; filename="{result["filename"]}"'
+    if result.get('warning'):
+        headers['X-BananaPDF-Warning'] = result['warning']
+    return app.response_class(
+        response=result['data'],
+        status=200,
+        mimetype=result['mimetype'],
+        headers=headers,
+    )
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List queued, running and recently finished jobs"""
+    return jsonify({'jobs': [job.to_dict() for job in job_queue.list()]}), 200
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get job status
+    
+    Long-polls when ?wait=<seconds> is given: returns as soon as the job
+    changes from the version passed in ?since=<version>, or finishes.
+    """
+    wait = min(request.args.get('wait', 0, type=float), 30.0)
+    if wait > 0:
+        job = job_queue.wait(job_id, since_version=request.args.get('since', -1, type=int), timeout=wait)
+    else:
+        job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(dict(job.to_dict(), version=job.version)), 200
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """Stream job progress as Server-Sent Events until the job finishes"""
+    if job_queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return Response(sse_events(job_queue.stream(job_id)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Fetch the result of a finished job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status not in FINISHED_STATES:
+        return jsonify(job.to_dict()), 202
+    if job.status != DONE:
+        return jsonify(job.to_dict()), 409
+    
+    result = job.result
+    if job.kind == 'upload':
+        # The job only parsed the PDF; the session switches here, once
+        with session_lock:
+            if not hasattr(job, 'session'):
+                job.session = _activate_upload(result)
+        return jsonify({
+            'success': True,
+            'session': job.session,
+            'pageCount': job.session['pageCount'],
+        }), 200
+    if isinstance(result, dict) and isinstance(result.get('data'), bytes):
+        return _file_response(result)
+    return jsonify(result), 200
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a job that has not started yet"""
+    if job_queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if not job_queue.cancel(job_id):
+        return jsonify({'error': 'Job already started'}), 409
+    return jsonify({'success': True}), 200
+
+
 @app.route('/api/session', methods=['GET'])
 def get_session():
     """Get current session"""
@@ -1002,6 +1168,15 @@ def get_session():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Per-endpoint request timing histograms (milliseconds)"""
+    return jsonify({
+        'profile': get_profile()['name'],
+        'histograms': metrics.snapshot(),
+    }), 200
+
+
 @app.route('/api/debug/uploads', methods=['GET'])
 def debug_uploads():
     """Debug endpoint: list all files in uploads folder"""
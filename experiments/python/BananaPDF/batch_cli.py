@@ -0,0 +1,303 @@
+"""Batch CLI - apply BananaPDF operations to directories of PDFs in parallel
+
+Examples:
+    python batch_cli.py rotate in/ out/ --degrees 90 --pages 1,3-5
+    python batch_cli.py delete in/ out/ --pages 2
+    python batch_cli.py reorder in/ out/ --order 3,1,2
+    python batch_cli.py stamp in/ out/ --text "CONFIDENTIAL" --x 40 --y 40
+    python batch_cli.py flatten in/ out/
+    python batch_cli.py flatten in/ out/ --rasterize --dpi 150
+    python batch_cli.py render in/ out/ --dpi 100 --report report.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pdf_exporter import PDFExporter
+from pdf_handler import PDFHandler
+
+# Tasks kept in flight per worker, so huge directories are not submitted at once
+TASKS_PER_WORKER = 4
+
+
+def parse_page_spec(spec, page_count):
+    """
+    Parse a 1-based page list like "1,3-5" into 0-based indices
+
+    "all" (or an empty spec) selects every page. Pages beyond the
+    document are ignored so one spec can be applied to a whole directory.
+    """
+    if not spec or spec == 'all':
+        return list(range(page_count))
+    pages = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            pages.extend(range(int(start) - 1, int(end)))
+        else:
+            pages.append(int(part) - 1)
+    return [page for page in pages if 0 <= page < page_count]
+
+
+def find_pdfs(input_dir, recursive=False):
+    """List PDF files in a directory, sorted for a stable report"""
+    if recursive:
+        found = (
+            os.path.join(root, name)
+            for root, _, names in os.walk(input_dir)
+            for name in names
+        )
+    else:
+        found = (entry.path for entry in os.scandir(input_dir) if entry.is_file())
+    return sorted(path for path in found if path.lower().endswith('.pdf'))
+
+
+def output_path_for(input_path, input_dir, output_dir, operation):
+    """Mirror the input layout under the output directory"""
+    relative = os.path.relpath(input_path, input_dir)
+    if operation == 'render':
+        return os.path.join(output_dir, os.path.splitext(relative)[0])
+    return os.path.join(output_dir, relative)
+
+
+def process_file(operation, input_path, output_path, options):
+    """
+    Apply one operation to one PDF (runs in a worker process)
+
+    Returns:
+        dict report entry
+    """
+    start = time.perf_counter()
+    entry = {'input': input_path, 'output': output_path, 'status': 'ok'}
+    try:
+        handler = PDFHandler(input_path)
+        page_count = handler.get_page_count()
+        selected = parse_page_spec(options.get('pages'), page_count)
+        entry['pages'] = page_count
+
+        if operation == 'render':
+            os.makedirs(output_path, exist_ok=True)
+            for page_idx in selected:
+                image = handler.get_page_as_image(page_idx, dpi=options['dpi'])
+                image.save(os.path.join(output_path, f'page_{page_idx + 1:04d}.{options["format"]}'))
+            entry['rendered'] = len(selected)
+        else:
+            rotations = [page.rotation for page in handler.doc]
+            pages_to_export, textboxes, export_options = _plan_operation(
+                operation, page_count, selected, options, rotations)
+            if not pages_to_export:
+                raise ValueError('Operation would remove every page')
+
+            # One process per file already; the exporter must not start its own pool
+            pdf_buffer = PDFExporter(handler).export(
+                pages_to_export, {}, textboxes, workers=1, **export_options)
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            temp_path = f'{output_path}.tmp'
+            with open(temp_path, 'wb') as output_file:
+                output_file.write(pdf_buffer.getvalue())
+            os.replace(temp_path, output_path)
+            entry['outputPages'] = len(pages_to_export)
+
+        handler.doc.close()
+    except Exception as e:
+        entry['status'] = 'failed'
+        entry['error'] = str(e)
+
+    entry['seconds'] = round(time.perf_counter() - start, 4)
+    return entry
+
+
+def _plan_operation(operation, page_count, selected, options, rotations=None):
+    """
+    Translate an operation into PDFExporter.export arguments
+
+    rotations are the source pages' current /Rotate values; rotate adds
+    to them. Pages without a 'rotation' entry keep their own.
+    """
+    rotations = rotations or [0] * page_count
+    pages = [(page_idx, {}) for page_idx in range(page_count)]
+    textboxes = {}
+    export_options = {}
+
+    if operation == 'rotate':
+        for page_idx in selected:
+            pages[page_idx][1]['rotation'] = (rotations[page_idx] + options['degrees']) % 360
+    elif operation == 'delete':
+        removed = set(selected)
+        pages = [page for page in pages if page[0] not in removed]
+    elif operation == 'reorder':
+        order = parse_page_spec(options['order'], page_count)
+        listed = set(order)
+        rest = [page_idx for page_idx in range(page_count) if page_idx not in listed]
+        pages = [pages[page_idx] for page_idx in order + rest]
+    elif operation == 'stamp':
+        for page_idx in selected:
+            textboxes[f'stamp_{page_idx}'] = {
+                'pageNum': page_idx,
+                'x': options['x'],
+                'y': options['y'],
+                'width': options['width'],
+                'height': options['height'],
+                'text': options['text'],
+                'fontSize': options['font_size'],
+                'color': options['color'],
+            }
+    elif operation == 'flatten':
+        # Bake annotations into vector page content; bitmaps only on request
+        export_options = {'flatten': True, 'flatten_existing': True}
+        if options.get('rasterize'):
+            export_options['rasterize_dpi'] = options['dpi']
+
+    return pages, textboxes, export_options
+
+
+def run_batch(operation, input_dir, output_dir, options, workers=None, recursive=False,
+              overwrite=False, progress_stream=sys.stderr):
+    """
+    Process every PDF in a directory across a process pool
+
+    Progress is streamed one line per finished file. Existing outputs are
+    skipped unless overwrite is set, so interrupted nightly runs resume.
+
+    Returns:
+        report dict
+    """
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    inputs = find_pdfs(input_dir, recursive)
+    results = []
+    tasks = []
+    for input_path in inputs:
+        output_path = output_path_for(input_path, input_dir, output_dir, operation)
+        if not overwrite and os.path.exists(output_path):
+            results.append({'input': input_path, 'output': output_path, 'status': 'skipped'})
+        else:
+            tasks.append((input_path, output_path))
+
+    total = len(inputs)
+    done = len(results)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        task_iter = iter(tasks)
+        while True:
+            # Keep a bounded window of submitted tasks
+            while len(pending) < workers * TASKS_PER_WORKER:
+                task = next(task_iter, None)
+                if task is None:
+                    break
+                pending.add(pool.submit(process_file, operation, task[0], task[1], options))
+            if not pending:
+                break
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                entry = future.result()
+                results.append(entry)
+                done += 1
+                if progress_stream:
+                    detail = entry.get('error', f"{entry['seconds']}s")
+                    print(f"[{done}/{total}] {entry['status']:6} {entry['input']} ({detail})",
+                          file=progress_stream, flush=True)
+
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda entry: entry['input'])
+    summary = {status: sum(1 for entry in results if entry['status'] == status)
+               for status in ('ok', 'failed', 'skipped')}
+    return {
+        'operation': operation,
+        'options': options,
+        'inputDir': input_dir,
+        'outputDir': output_dir,
+        'startedAt': started_at,
+        'workers': workers,
+        'elapsedSeconds': round(elapsed, 3),
+        'filesPerSecond': round(summary['ok'] / elapsed, 3) if elapsed > 0 else None,
+        'summary': summary,
+        'files': results,
+    }
+
+
+def build_parser():
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(description='Apply BananaPDF operations to directories of PDFs.')
+    subparsers = parser.add_subparsers(dest='operation', required=True)
+
+    def add_operation(name, help_text):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('input_dir', help='Directory containing PDFs')
+        sub.add_argument('output_dir', help='Directory for results (mirrors the input layout)')
+        sub.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+        sub.add_argument('--recursive', action='store_true', help='Include subdirectories')
+        sub.add_argument('--overwrite', action='store_true', help='Reprocess files whose output exists')
+        sub.add_argument('--report', help='Write a JSON report to this path')
+        sub.add_argument('--quiet', action='store_true', help='Do not stream per-file progress')
+        return sub
+
+    rotate = add_operation('rotate', 'Rotate pages')
+    rotate.add_argument('--degrees', type=int, default=90, choices=(90, 180, 270))
+    rotate.add_argument('--pages', default='all', help='1-based pages, e.g. "1,3-5" (default: all)')
+
+    delete = add_operation('delete', 'Delete pages')
+    delete.add_argument('--pages', required=True, help='1-based pages to delete, e.g. "2,4-6"')
+
+    reorder = add_operation('reorder', 'Reorder pages')
+    reorder.add_argument('--order', required=True,
+                         help='1-based new order, e.g. "3,1,2"; unlisted pages follow in original order')
+
+    stamp = add_operation('stamp', 'Stamp a text box onto pages')
+    stamp.add_argument('--text', required=True)
+    stamp.add_argument('--pages', default='all')
+    stamp.add_argument('--x', type=float, default=50)
+    stamp.add_argument('--y', type=float, default=50)
+    stamp.add_argument('--width', type=float, default=200)
+    stamp.add_argument('--height', type=float, default=30)
+    stamp.add_argument('--font-size', type=int, default=12)
+    stamp.add_argument('--color', default='#000000')
+
+    flatten = add_operation('flatten', 'Flatten annotations into page content')
+    flatten.add_argument('--rasterize', action='store_true',
+                         help='Replace annotated pages with bitmaps instead of baking them as vectors')
+    flatten.add_argument('--dpi', type=int, default=150, help='Resolution of rasterized pages')
+
+    render = add_operation('render', 'Render pages to images')
+    render.add_argument('--pages', default='all')
+    render.add_argument('--dpi', type=int, default=150)
+    render.add_argument('--format', default='png', choices=('png', 'jpg', 'webp'))
+
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    common = {'input_dir', 'output_dir', 'workers', 'recursive', 'overwrite', 'report', 'quiet', 'operation'}
+    options = {key: value for key, value in vars(args).items() if key not in common}
+
+    if not os.path.isdir(args.input_dir):
+        print(f"Input directory not found: {args.input_dir}", file=sys.stderr)
+        return 2
+
+    report = run_batch(
+        args.operation, args.input_dir, args.output_dir, options,
+        workers=args.workers, recursive=args.recursive, overwrite=args.overwrite,
+        progress_stream=None if args.quiet else sys.stderr,
+    )
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+    summary = report['summary']
+    print(f"{args.operation}: {summary['ok']} ok, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped in {report['elapsedSeconds']}s", file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
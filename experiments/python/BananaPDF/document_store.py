@@ -0,0 +1,247 @@
+"""Document Store - content-addressed uploads with an on-disk index and LRU cleanup"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pdf_handler import PDFHandler
+
+logger = logging.getLogger('bananapdf.store')
+
+# Index of stored documents, kept next to the blobs
+INDEX_FILENAME = 'index.json'
+# Prefix of per-session working copies (edits never touch a shared blob)
+WORKING_COPY_PREFIX = 'work_'
+# Cleanup limits for stored blobs
+MAX_STORE_BYTES = 2 * 1024 * 1024 * 1024  # 2GB
+MAX_STORE_FILES = 500
+# Parsed documents kept in memory
+HANDLER_CACHE_SIZE = 4
+# Read size while hashing uploads
+CHUNK_SIZE = 1024 * 1024
+
+
+class DocumentStore:
+    """
+    Store uploads by SHA-256 of their content
+
+    Each distinct PDF is written once as <hash>.pdf. The index maps hash to
+    metadata (size, page count, original filenames, last access) and
+    original filename to the latest hash, so session recovery is a dict
+    lookup instead of a directory scan. Parsed PDFHandler instances are
+    cached per hash, and the least recently used blobs are deleted when the
+    store grows past its limits.
+    """
+
+    def __init__(self, folder, max_bytes=MAX_STORE_BYTES, max_files=MAX_STORE_FILES,
+                 handler_cache_size=HANDLER_CACHE_SIZE):
+        """Initialize document store and load its index"""
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.handler_cache_size = handler_cache_size
+        self.index_path = os.path.join(folder, INDEX_FILENAME)
+        self.entries = {}  # hash -> metadata
+        self.names = {}  # original filename -> hash
+        self._handlers = OrderedDict()  # hash -> PDFHandler
+        self._lock = threading.RLock()
+
+        os.makedirs(folder, exist_ok=True)
+        self._load()
+
+    def blob_path(self, digest):
+        """Get the on-disk path of a stored document"""
+        return os.path.join(self.folder, f'{digest}.pdf')
+
+    def is_blob(self, path):
+        """Check whether a path is a shared, content-addressed blob"""
+        name = os.path.basename(path or '')
+        return name.endswith('.pdf') and name[:-4] in self.entries
+
+    def put(self, stream, original_filename):
+        """
+        Store an upload, hashing it while it is written
+
+        Args:
+            stream: readable binary stream (e.g. FileStorage.stream)
+            original_filename: filename as chosen by the user
+
+        Returns:
+            (digest, path, is_new)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf', dir=self.folder)
+        try:
+            with os.fdopen(temp_fd, 'wb') as temp_file:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+
+            digest = digest.hexdigest()
+            path = self.blob_path(digest)
+            with self._lock:
+                is_new = not os.path.isfile(path)
+                if is_new:
+                    os.replace(temp_path, path)
+                entry = self.entries.setdefault(digest, {
+                    'size': size,
+                    'pageCount': None,
+                    'originalFilenames': [],
+                    'createdAt': time.time(),
+                })
+                if original_filename not in entry['originalFilenames']:
+                    entry['originalFilenames'].append(original_filename)
+                entry['lastAccess'] = time.time()
+                self.names[original_filename] = digest
+                self._save()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logger.debug('Stored upload %s as %s (new=%s)', original_filename, digest, is_new)
+        return digest, path, is_new
+
+    def find_by_name(self, original_filename):
+        """
+        Find the latest stored upload for an original filename
+
+        Returns:
+            (digest, path), or (None, None) if unknown or deleted
+        """
+        with self._lock:
+            digest = self.names.get(original_filename)
+            if digest is None:
+                return None, None
+            path = self.blob_path(digest)
+            if not os.path.isfile(path):
+                return None, None
+            self.touch(digest)
+            return digest, path
+
+    def get_metadata(self, digest):
+        """Get a copy of a document's metadata (None if unknown)"""
+        with self._lock:
+            entry = self.entries.get(digest)
+            return dict(entry) if entry else None
+
+    def get_handler(self, digest):
+        """
+        Get a parsed PDFHandler for a stored document
+
+        Handlers are cached, so re-opening a document that is already
+        known skips parsing. Callers must not write through a cached
+        handler; use make_working_copy for edits.
+        """
+        with self._lock:
+            handler = self._handlers.get(digest)
+            if handler is not None:
+                self._handlers.move_to_end(digest)
+                self.touch(digest)
+                return handler
+
+        handler = PDFHandler(self.blob_path(digest))
+        with self._lock:
+            self._handlers[digest] = handler
+            while len(self._handlers) > self.handler_cache_size:
+                self._handlers.popitem(last=False)
+            entry = self.entries.get(digest)
+            if entry is not None:
+                entry['pageCount'] = handler.get_page_count()
+            self.touch(digest)
+        return handler
+
+    def make_working_copy(self, digest):
+        """Copy a stored document to a private file that a session may edit"""
+        timestamp = int(time.time() * 1000)
+        path = os.path.join(self.folder, f'{WORKING_COPY_PREFIX}{digest[:16]}_{timestamp}.pdf')
+        shutil.copyfile(self.blob_path(digest), path)
+        return path
+
+    def find_working_copy(self, digest):
+        """Get the newest surviving working copy of a stored document (None if there is none)"""
+        prefix = f'{WORKING_COPY_PREFIX}{digest[:16]}_'
+        with os.scandir(self.folder) as entries:
+            copies = [entry for entry in entries
+                      if entry.is_file() and entry.name.startswith(prefix) and entry.name.endswith('.pdf')]
+        if not copies:
+            return None
+        return max(copies, key=lambda entry: entry.stat().st_mtime_ns).path
+
+    def touch(self, digest):
+        """Mark a document as recently used"""
+        with self._lock:
+            entry = self.entries.get(digest)
+            if entry is not None:
+                entry['lastAccess'] = time.time()
+                self._save()
+
+    def evict(self, keep=()):
+        """
+        Delete least recently used blobs beyond the size and count limits
+
+        Args:
+            keep: hashes that must not be deleted (e.g. the open document)
+
+        Returns:
+            list of deleted hashes
+        """
+        removed = []
+        with self._lock:
+            total = sum(entry['size'] for entry in self.entries.values())
+            by_age = sorted(self.entries.items(), key=lambda item: item[1].get('lastAccess', 0))
+            for digest, entry in by_age:
+                if total <= self.max_bytes and len(self.entries) <= self.max_files:
+                    break
+                if digest in keep:
+                    continue
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+                total -= entry['size']
+                del self.entries[digest]
+                self._handlers.pop(digest, None)
+                removed.append(digest)
+
+            if removed:
+                self.names = {name: d for name, d in self.names.items() if d in self.entries}
+                self._save()
+        if removed:
+            logger.info('Evicted %d stored document(s)', len(removed))
+        return removed
+
+    def _load(self):
+        """Load the index, dropping entries whose blob is gone"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as index_file:
+                data = json.load(index_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning('Ignoring unreadable document index %s: %s', self.index_path, e)
+            return
+
+        self.entries = {
+            digest: entry for digest, entry in data.get('entries', {}).items()
+            if os.path.isfile(self.blob_path(digest))
+        }
+        self.names = {
+            name: digest for name, digest in data.get('names', {}).items()
+            if digest in self.entries
+        }
+
+    def _save(self):
+        """Write the index atomically (lock held)"""
+        temp_path = f'{self.index_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump({'entries': self.entries, 'names': self.names}, index_file)
+        os.replace(temp_path, self.index_path)
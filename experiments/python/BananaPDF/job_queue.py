@@ -0,0 +1,228 @@
+"""Job Queue - runs heavy operations on a local worker pool"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('bananapdf.jobs')
+
+# Worker threads running jobs
+DEFAULT_WORKERS = 2
+# Finished jobs (and their results) kept before the oldest are dropped
+MAX_FINISHED_JOBS = 32
+# Total result bytes kept across finished jobs (results hold whole PDFs)
+MAX_FINISHED_BYTES = 256 * 1024 * 1024
+# Seconds a finished job stays available for its result to be fetched
+FINISHED_TTL_SECONDS = 600
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+
+class Job:
+    """A unit of work with progress, status and an in-memory result"""
+
+    def __init__(self, kind, queue):
+        """Initialize job"""
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.result_bytes = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.version = 0  # bumped on every change, used by progress streams
+        self._queue = queue
+        self._future = None
+
+    def report(self, progress=None, message=None):
+        """Report progress (0.0 - 1.0) and/or a status message from inside a job"""
+        with self._queue._changed:
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, float(progress)))
+            if message is not None:
+                self.message = message
+            self.version += 1
+            self._queue._changed.notify_all()
+
+    def to_dict(self):
+        """Get a JSON-serializable status (without the result payload)"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': round(self.progress, 4),
+            'message': self.message,
+            'error': self.error,
+            'createdAt': self.created_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at,
+            'hasResult': self.result is not None,
+        }
+
+
+class JobQueue:
+    """
+    Local job queue backed by a thread pool
+
+    Jobs run in-process, so they can be tested without external services.
+    Finished jobs are kept in a store bounded by count, total result bytes
+    and age; the oldest finished jobs and their results are dropped first.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_finished=MAX_FINISHED_JOBS,
+                 max_finished_bytes=MAX_FINISHED_BYTES, ttl=FINISHED_TTL_SECONDS):
+        """Initialize job queue"""
+        self.max_finished = max_finished
+        self.max_finished_bytes = max_finished_bytes
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()  # job ID -> Job, in submission order
+        self._changed = threading.Condition()
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """
+        Enqueue work
+
+        Args:
+            kind: short job type, e.g. 'save'
+            fn: callable invoked as fn(job, *args, **kwargs); its return value is the result
+
+        Returns:
+            Job
+        """
+        job = Job(kind, self)
+        with self._changed:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        job._future = self._executor.submit(self._run, job, fn, args, kwargs)
+        logger.debug('Job %s (%s) queued', job.id, kind)
+        return job
+
+    def get(self, job_id):
+        """Get a job by ID (None if unknown or evicted)"""
+        with self._changed:
+            self._evict_finished()
+            return self._jobs.get(job_id)
+
+    def list(self):
+        """Get all known jobs, oldest first"""
+        with self._changed:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet"""
+        job = self.get(job_id)
+        if job is None or job._future is None or not job._future.cancel():
+            return False
+        self._finish(job, CANCELLED)
+        return True
+
+    def wait(self, job_id, since_version=-1, timeout=None):
+        """
+        Block until a job changes or finishes
+
+        Returns:
+            Job (None if unknown)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job.version != since_version or job.status in FINISHED_STATES:
+                    return job
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job
+                self._changed.wait(remaining)
+
+    def stream(self, job_id, heartbeat=15.0):
+        """
+        Yield job status dicts as they change, ending when the job finishes
+
+        Suitable for a Server-Sent Events response.
+        """
+        version = -1
+        while True:
+            job = self.wait(job_id, since_version=version, timeout=heartbeat)
+            if job is None:
+                return
+            version = job.version
+            yield job.to_dict()
+            if job.status in FINISHED_STATES:
+                return
+
+    def shutdown(self, wait=True):
+        """Stop the worker pool"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job, fn, args, kwargs):
+        """Run a job on a worker thread"""
+        with self._changed:
+            job.status = RUNNING
+            job.started_at = time.time()
+            job.version += 1
+            self._changed.notify_all()
+        try:
+            result = fn(job, *args, **kwargs)
+        except Exception as e:
+            logger.exception('Job %s (%s) failed', job.id, job.kind)
+            job.error = str(e)
+            self._finish(job, FAILED)
+            return
+        job.result = result
+        job.result_bytes = _result_size(result)
+        job.progress = 1.0
+        self._finish(job, DONE)
+
+    def _finish(self, job, status):
+        """Mark a job finished and wake any waiters"""
+        with self._changed:
+            job.status = status
+            job.finished_at = time.time()
+            job.version += 1
+            self._evict_finished()
+            self._changed.notify_all()
+
+    def _evict_finished(self):
+        """Drop expired finished jobs, then the oldest beyond the count and byte limits (lock held)"""
+        now = time.time()
+        finished = []
+        for job_id, job in list(self._jobs.items()):
+            if job.status not in FINISHED_STATES:
+                continue
+            if now - job.finished_at > self.ttl:
+                del self._jobs[job_id]
+            else:
+                finished.append(job)
+        total_bytes = sum(job.result_bytes for job in finished)
+        while finished and (len(finished) > self.max_finished or total_bytes > self.max_finished_bytes):
+            job = finished.pop(0)
+            total_bytes -= job.result_bytes
+            del self._jobs[job.id]
+
+
+def _result_size(result):
+    """Approximate memory held by a job result (its binary payload)"""
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, dict) and isinstance(result.get('data'), (bytes, bytearray)):
+        return len(result['data'])
+    return 0
+
+
+def sse_events(statuses):
+    """Format job status dicts as Server-Sent Events"""
+    for status in statuses:
+        yield f"data: {json.dumps(status)}\n\n"
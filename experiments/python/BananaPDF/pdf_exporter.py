@@ -1,11 +1,17 @@
 """PDF Exporter - exports PDFs with annotations"""
-import base64
 import io
+import logging
 import os
-import tempfile
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 import fitz  # PyMuPDF for PDF manipulation
+from structured_logging import log_event, metrics
+from vector_strokes import add_ink_annotation, decode_image_data, insert_image_stream, simplify_strokes
+
+logger = logging.getLogger('bananapdf.export')
+
+# Pages with at least this many annotations + text boxes are built in the process pool
+HEAVY_PAGE_THRESHOLD = 25
 
 
 class PDFExporter:
@@ -17,101 +23,131 @@ class PDFExporter:
         self.output_path = None
     
 
-    def export(self, pages_to_export, annotations_dict, textboxes_dict, flatten=False):
+    def export(self, pages_to_export, annotations_dict, textboxes_dict, flatten=False,
+               rasterize_dpi=None, workers=None, heavy_threshold=HEAVY_PAGE_THRESHOLD, progress=None,
+               flatten_existing=False):
         """
         Export PDF with annotations
         
+        Annotations and text boxes are grouped by page once, runs of
+        consecutive source pages are copied with a single ``insert_pdf`` call,
+        and heavy pages are built in a process pool and merged back in order.
+        
         Args:
             pages_to_export: list of (original_index, page_data)
             annotations_dict: {page_num: [annotation_list]}
             textboxes_dict: {textbox_id: textbox_data}
-            flatten: whether to flatten annotations into PDF
+            flatten: bake annotations and form fields into the page content
+                (text and vector graphics stay vector)
+            rasterize_dpi: if set, pool-built pages are replaced by a bitmap at this DPI
+            workers: process pool size (defaults to the CPU count)
+            heavy_threshold: annotation + text box count that makes a page "heavy"
+            progress: optional callback(done_pages, total_pages)
+            flatten_existing: also flatten pages that already carry annotations or form fields
         
         Returns:
-            Path to output PDF
+            BytesIO buffer containing the output PDF
         """
+        with metrics.timer('pdf_exporter.export'):
+            return self._export(pages_to_export, annotations_dict, textboxes_dict, flatten,
+                                rasterize_dpi, workers, heavy_threshold, progress, flatten_existing)
+    
+    def _export(self, pages_to_export, annotations_dict, textboxes_dict, flatten,
+                rasterize_dpi, workers, heavy_threshold, progress, flatten_existing):
+        """Run the export pipeline (see export)"""
         try:
-            print(f"\n--- PDF EXPORT ---")
-            print(f"Annotations dict type: {type(annotations_dict)}")
-            print(f"Annotations dict keys: {list(annotations_dict.keys()) if isinstance(annotations_dict, dict) else 'N/A'}")
-            print(f"Annotations content: {annotations_dict}")
-            print(f"Textboxes dict type: {type(textboxes_dict)}")
-            print(f"Textboxes content: {textboxes_dict}")
+            source_path = self.pdf_handler.filepath
+            annotations_by_page, textboxes_by_page = self._group_by_page(annotations_dict, textboxes_dict)
             
             # Open the original PDF for modification
-            doc = fitz.open(self.pdf_handler.filepath)
-            print(f"Original PDF has {len(doc)} pages")
-            new_doc = fitz.open()  # Create new document
-            
-            # Process selected pages
-            for new_page_idx, (orig_page_idx, page_data) in enumerate(pages_to_export):
-                print(f"\nProcessing page {orig_page_idx} (new index: {new_page_idx})")
-                
-                # Validate page index
+            doc = fitz.open(source_path)
+            for orig_page_idx, _ in pages_to_export:
                 if orig_page_idx < 0 or orig_page_idx >= len(doc):
-                    print(f"  ERROR: Page index {orig_page_idx} is out of range (PDF has {len(doc)} pages)")
                     raise Exception(f"Page {orig_page_idx} not found in PDF")
-                
-                # Get original page
-                orig_page = doc[orig_page_idx]
-                
-                # Apply rotation if needed
-                rotation = page_data.get('rotation', 0)
-                if rotation != 0:
-                    orig_page.set_rotation(rotation)
-                
-                # Insert into new document
-                new_doc.insert_pdf(doc, from_page=orig_page_idx, to_page=orig_page_idx)
-                new_page = new_doc[new_page_idx]
-                
-                # Add annotations for this page
-                # Note: JSON converts numeric keys to strings, so check both string and int keys
-                page_key = str(orig_page_idx)
-                if page_key in annotations_dict:
-                    print(f"  Found {len(annotations_dict[page_key])} annotations for page {orig_page_idx}")
-                    for annotation in annotations_dict[page_key]:
-                        print(f"    Adding annotation: {annotation}")
-                        self._add_annotation_to_page(new_page, annotation)
-                elif orig_page_idx in annotations_dict:
-                    # Fallback for integer keys
-                    print(f"  Found {len(annotations_dict[orig_page_idx])} annotations for page {orig_page_idx}")
-                    for annotation in annotations_dict[orig_page_idx]:
-                        print(f"    Adding annotation: {annotation}")
-                        self._add_annotation_to_page(new_page, annotation)
+            
+            annotated_pages = set()
+            if flatten_existing:
+                annotated_pages = {
+                    orig_page_idx for orig_page_idx, _ in pages_to_export
+                    if doc[orig_page_idx].first_annot or doc[orig_page_idx].first_widget
+                }
+            
+            def is_heavy(orig_page_idx):
+                if orig_page_idx in annotated_pages:
+                    return True
+                overlay_count = (len(annotations_by_page.get(orig_page_idx, ()))
+                                 + len(textboxes_by_page.get(orig_page_idx, ())))
+                if overlay_count == 0:
+                    return False
+                return flatten or rasterize_dpi is not None or overlay_count >= heavy_threshold
+            
+            segments = self._plan_segments(pages_to_export, is_heavy)
+            jobs = [
+                (source_path, orig_page_idx, page_data.get('rotation'),
+                 annotations_by_page.get(orig_page_idx, []),
+                 textboxes_by_page.get(orig_page_idx, []),
+                 flatten or orig_page_idx in annotated_pages, rasterize_dpi)
+                for kind, pages in segments if kind == 'job'
+                for orig_page_idx, page_data in pages
+            ]
+            
+            log_event(logger, logging.DEBUG, 'export.plan',
+                      pages=len(pages_to_export),
+                      source_pages=len(doc),
+                      segments=len(segments),
+                      heavy_pages=len(jobs),
+                      annotations=lambda: sum(len(a) for a in annotations_by_page.values()),
+                      text_boxes=lambda: sum(len(t) for t in textboxes_by_page.values()))
+            
+            new_doc = fitz.open()  # Create new document
+            pool = None
+            try:
+                if workers is None:
+                    workers = os.cpu_count() or 1
+                workers = min(workers, len(jobs))
+                if workers > 1:
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                    # Submitted up front so the pool works while light runs are copied
+                    job_results = pool.map(_build_page_job, jobs)
                 else:
-                    print(f"  No annotations for page {orig_page_idx} (keys in dict: {list(annotations_dict.keys())})")
+                    job_results = map(_build_page_job, jobs)
                 
-                # Add text boxes for this page
-                print(f"  Processing text boxes. Type: {type(textboxes_dict)}, Length: {len(textboxes_dict) if hasattr(textboxes_dict, '__len__') else 'N/A'}")
-                
-                if isinstance(textboxes_dict, dict) and textboxes_dict:
-                    # textboxes_dict is a dict with IDs as keys
-                    for tb_id, textbox in textboxes_dict.items():
-                        if isinstance(textbox, dict) and textbox.get('pageNum') == orig_page_idx:
-                            print(f"    Adding textbox '{tb_id}': {textbox}")
-                            self._add_textbox_to_page(new_page, textbox)
-                elif isinstance(textboxes_dict, list) and textboxes_dict:
-                    # Fallback: if it's a list of textboxes
-                    for textbox in textboxes_dict:
-                        if isinstance(textbox, dict) and textbox.get('pageNum') == orig_page_idx:
-                            print(f"    Adding textbox from list: {textbox}")
-                            self._add_textbox_to_page(new_page, textbox)
-                else:
-                    if not textboxes_dict:
-                        print(f"  No text boxes to add (empty or None)")
+                for kind, pages in segments:
+                    if kind == 'job':
+                        with fitz.open(stream=next(job_results), filetype='pdf') as part:
+                            new_doc.insert_pdf(part)
+                        if progress:
+                            progress(len(new_doc), len(pages_to_export))
+                        continue
+                    
+                    # One insert_pdf call for the whole run of consecutive pages
+                    first_new_idx = len(new_doc)
+                    new_doc.insert_pdf(doc, from_page=pages[0][0], to_page=pages[-1][0])
+                    for offset, (orig_page_idx, page_data) in enumerate(pages):
+                        new_page = new_doc[first_new_idx + offset]
+                        self._apply_page_edits(
+                            new_page,
+                            page_data.get('rotation'),
+                            annotations_by_page.get(orig_page_idx, []),
+                            textboxes_by_page.get(orig_page_idx, []),
+                        )
+                    if progress:
+                        progress(len(new_doc), len(pages_to_export))
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
             
-            # Save document to BytesIO buffer (in-memory, no disk files)
-            print("DEBUG: Creating BytesIO buffer for in-memory PDF...")
+            # Save document to BytesIO buffer (in-memory, no disk files).
+            # Each pool-built page arrives as a standalone PDF with its own
+            # copy of fonts and images; garbage=3 merges the duplicates.
             pdf_buffer = io.BytesIO()
-            print("DEBUG: Saving PyMuPDF document to BytesIO...")
-            new_doc.save(pdf_buffer)
-            print(f"DEBUG: Successfully saved to buffer, size={pdf_buffer.tell()} bytes")
+            new_doc.save(pdf_buffer, garbage=3)
+            log_event(logger, logging.DEBUG, 'export.done', pages=len(new_doc), bytes=pdf_buffer.tell())
             new_doc.close()
             doc.close()
             
             # Reset buffer position to start
             pdf_buffer.seek(0)
-            print("DEBUG: Buffer position reset, returning BytesIO object")
             
             self.output_buffer = pdf_buffer
             return pdf_buffer
@@ -119,6 +155,78 @@ class PDFExporter:
         except Exception as e:
             raise Exception(f"Failed to export PDF: {str(e)}")
     
+    def _group_by_page(self, annotations_dict, textboxes_dict):
+        """
+        Group annotations and text boxes by 0-based page index in one pass
+        
+        JSON converts numeric keys to strings, so annotation keys are
+        normalized to ints. Text boxes may arrive as a dict keyed by ID or
+        as a plain list.
+        """
+        annotations_by_page = {}
+        if isinstance(annotations_dict, dict):
+            for page_key, page_annotations in annotations_dict.items():
+                try:
+                    page_idx = int(page_key)
+                except (TypeError, ValueError):
+                    continue
+                annotations_by_page.setdefault(page_idx, []).extend(page_annotations or [])
+        elif isinstance(annotations_dict, list):
+            for annotation in annotations_dict:
+                if isinstance(annotation, dict) and isinstance(annotation.get('pageNum'), int):
+                    annotations_by_page.setdefault(annotation['pageNum'], []).append(annotation)
+        
+        textboxes_by_page = {}
+        if isinstance(textboxes_dict, dict):
+            textboxes = textboxes_dict.values()
+        elif isinstance(textboxes_dict, list):
+            textboxes = textboxes_dict
+        else:
+            textboxes = []
+        for textbox in textboxes:
+            if isinstance(textbox, dict) and isinstance(textbox.get('pageNum'), int):
+                textboxes_by_page.setdefault(textbox['pageNum'], []).append(textbox)
+        
+        return annotations_by_page, textboxes_by_page
+    
+    def _plan_segments(self, pages_to_export, is_heavy):
+        """
+        Split the export order into segments
+        
+        Returns a list of ('copy', pages) runs of consecutive source pages
+        and ('job', [page]) entries for heavy pages, in output order.
+        """
+        segments = []
+        run = []
+        for orig_page_idx, page_data in pages_to_export:
+            if is_heavy(orig_page_idx):
+                if run:
+                    segments.append(('copy', run))
+                    run = []
+                segments.append(('job', [(orig_page_idx, page_data)]))
+                continue
+            if run and orig_page_idx != run[-1][0] + 1:
+                segments.append(('copy', run))
+                run = []
+            run.append((orig_page_idx, page_data))
+        if run:
+            segments.append(('copy', run))
+        return segments
+    
+    def _apply_page_edits(self, page, rotation, annotations, textboxes):
+        """
+        Apply rotation, annotations and text boxes to an exported page
+        
+        rotation is the page's absolute /Rotate (0 is written too);
+        None keeps the source page's rotation.
+        """
+        if rotation is not None and rotation % 360 != page.rotation:
+            page.set_rotation(rotation % 360)
+        for annotation in annotations:
+            self._add_annotation_to_page(page, annotation)
+        for textbox in textboxes:
+            self._add_textbox_to_page(page, textbox)
+    
     def _add_annotation_to_page(self, page, annotation):
         """Add annotation to page"""
         try:
@@ -139,20 +247,18 @@ class PDFExporter:
             if ann_type == 'highlight':
                 # Use proper PDF highlight annotation (like Adobe)
                 page.add_highlight_annot(rect)
-            elif ann_type == 'drawing':
+            elif ann_type in ('drawing', 'signature'):
+                # Vector ink when the frontend sent stroke points, PNG otherwise
                 strokes = annotation.get('strokes', [])
                 if strokes:
-                    self._add_ink_annotation(page, strokes, color_normalized, annotation.get('strokeWidth', 2))
+                    ink_color = self._hex_to_rgb(annotation.get('color', '#000000'))
+                    self._add_ink_annotation(page, strokes, tuple(c / 255.0 for c in ink_color),
+                                             annotation.get('strokeWidth', 2))
                 else:
                     image_data = annotation.get('imageData', '')
                     if not image_data:
-                        raise ValueError("Missing drawing data")
+                        raise ValueError(f"Missing {ann_type} data")
                     self._insert_base64_image(page, rect, image_data)
-            elif ann_type == 'signature':
-                image_data = annotation.get('imageData', '')
-                if not image_data:
-                    raise ValueError(f"Missing imageData for annotation type: {ann_type}")
-                self._insert_base64_image(page, rect, image_data)
             elif ann_type == 'rectangle':
                 page.draw_rect(rect, color=color_normalized, width=2)
             elif ann_type == 'circle':
@@ -184,35 +290,19 @@ class PDFExporter:
                 )
             
         except Exception as e:
-            print(f"Warning: Failed to add annotation: {str(e)}")
+            logger.warning('Failed to add %s annotation: %s', annotation.get('type'), e)
 
     def _add_ink_annotation(self, page, strokes, color, stroke_width):
-        """Create a real PDF ink annotation so standard editors can delete it."""
-        ink_strokes = []
-        for stroke in strokes:
-            if len(stroke) < 2:
-                continue
-            ink_strokes.append([
-                (float(point[0]), float(point[1]))
-                for point in stroke
-                if len(point) >= 2
-            ])
-
-        if not ink_strokes:
-            return
-
-        annot = page.add_ink_annot(ink_strokes)
-        if annot:
-            annot.set_colors(stroke=color)
-            annot.set_border(width=max(float(stroke_width), 0.5))
-            annot.update()
+        """Create a real PDF ink annotation from simplified strokes"""
+        strokes = simplify_strokes([
+            [(float(point[0]), float(point[1])) for point in stroke if len(point) >= 2]
+            for stroke in strokes
+        ])
+        add_ink_annotation(page, strokes, color, stroke_width)
 
     def _insert_base64_image(self, page, rect, image_data):
         """Insert a base64-encoded drawing/signature image into the page."""
-        if image_data.startswith('data:image/'):
-            image_data = image_data.split(',', 1)[1]
-
-        image_bytes = base64.b64decode(image_data)
+        image_bytes = decode_image_data(image_data)
 
         image = Image.open(io.BytesIO(image_bytes)).convert('RGBA')
         alpha = image.getchannel('A')
@@ -233,17 +323,9 @@ class PDFExporter:
             rect.y0 + (y1 / original_height) * rect_height,
         )
 
-        temp_img_path = os.path.join(
-            tempfile.gettempdir(),
-            f"export_drawing_{int(datetime.now().timestamp() * 1000)}.png",
-        )
-
-        try:
-            cropped.save(temp_img_path, 'PNG')
-            page.insert_image(cropped_rect, filename=temp_img_path, overlay=True)
-        finally:
-            if os.path.exists(temp_img_path):
-                os.remove(temp_img_path)
+        cropped_png = io.BytesIO()
+        cropped.save(cropped_png, 'PNG')
+        insert_image_stream(page, cropped_rect, cropped_png.getvalue())
     
     def _add_textbox_to_page(self, page, textbox):
         """Add text box to page"""
@@ -256,14 +338,12 @@ class PDFExporter:
             color = self._hex_to_rgb(textbox.get('color', '#000000'))
             font_size = textbox.get('fontSize', 12)
             
-            print(f"      Text: '{text}', Position: ({x}, {y}), Size: {width}x{height}, Color: {color}, FontSize: {font_size}")
-            
             # Convert hex color to RGB (0-1 range)
             color_normalized = tuple(c / 255.0 for c in color)
             
             # Add text to page using insert_textbox
             rect = fitz.Rect(x, y, x + width, y + height)
-            result = page.insert_textbox(
+            page.insert_textbox(
                 rect,
                 text,
                 fontsize=font_size,
@@ -271,12 +351,9 @@ class PDFExporter:
                 align=fitz.TEXT_ALIGN_LEFT,
                 fontname='helv',  # helvetica
             )
-            print(f"      ✓ Text box added successfully, boundary box: {result}")
             
-        except Exception as e:
-            print(f"      ✗ Failed to add textbox: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception('Failed to add text box')
     
     def _hex_to_rgb(self, hex_color):
         """Convert hex color to RGB tuple (0-255)"""
@@ -285,3 +362,37 @@ class PDFExporter:
             return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
         except:
             return (0, 0, 0)
+
+
+def _build_page_job(job):
+    """
+    Build one exported page in a worker process
+    
+    Runs at module level so it can be pickled for ProcessPoolExecutor.
+    
+    Returns:
+        bytes of a single-page PDF
+    """
+    source_path, orig_page_idx, rotation, annotations, textboxes, flatten, rasterize_dpi = job
+    exporter = PDFExporter(None)
+    
+    with fitz.open(source_path) as src, fitz.open() as page_doc:
+        page_doc.insert_pdf(src, from_page=orig_page_idx, to_page=orig_page_idx)
+        page = page_doc[0]
+        exporter._apply_page_edits(page, rotation, annotations, textboxes)
+        
+        if flatten:
+            # Turn annotations and widgets into ordinary page content
+            page_doc.bake(annots=True, widgets=True)
+            page = page_doc[0]
+        
+        if rasterize_dpi is not None:
+            # Rasterize the page with its annotations into a single image page
+            zoom = rasterize_dpi / 72.0
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False, annots=True)
+            with fitz.open() as flat_doc:
+                flat_page = flat_doc.new_page(width=page.rect.width, height=page.rect.height)
+                flat_page.insert_image(flat_page.rect, stream=pix.tobytes("png"))
+                return flat_doc.tobytes(garbage=3, deflate=True)
+        
+        return page_doc.tobytes(garbage=3, deflate=True)
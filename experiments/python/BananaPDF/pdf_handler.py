@@ -1,9 +1,15 @@
 """PDF Handler - handles PDF rendering and basic operations"""
 import io
+import logging
+import os
+import shutil
+import tempfile
 from pypdf import PdfReader, PdfWriter
 from PIL import Image, ImageDraw
 import fitz  # PyMuPDF for better rendering
 
+logger = logging.getLogger('bananapdf.handler')
+
 
 class PDFHandler:
     """Handle PDF operations"""
@@ -30,10 +36,37 @@ class PDFHandler:
             self.doc = fitz.open(self.filepath)
             self.reader = PdfReader(self.filepath)
             self.page_count = len(self.reader.pages)
-            print(f"✓ PDF document reloaded from {self.filepath}")
+            logger.debug('PDF document reloaded from %s', self.filepath)
         except Exception as e:
             raise Exception(f"Failed to reload PDF: {str(e)}")
     
+    def save_changes(self):
+        """
+        Persist in-memory edits to the PDF file
+        
+        Appends an incremental update when possible, which writes only the
+        changed objects. Otherwise the file is rewritten through a temporary
+        copy (direct save to the original fails with encryption changes) and
+        reloaded.
+        """
+        try:
+            if self.doc.can_save_incrementally():
+                self.doc.save(self.filepath, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, deflate=True)
+                return
+            
+            temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
+            os.close(temp_fd)
+            try:
+                self.doc.save(temp_path, deflate=True)
+                shutil.move(temp_path, self.filepath)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            self.reload()
+        except Exception as e:
+            raise Exception(f"Failed to save PDF: {str(e)}")
+    
     def render_page(self, page_num, rotation=0, zoom=1.0):
         """
         Render a PDF page to PNG image
@@ -50,31 +83,7 @@ class PDFHandler:
             if page_num < 0 or page_num >= self.page_count:
                 raise ValueError(f"Invalid page number: {page_num}")
             
-            # Get page from PyMuPDF doc
-            page = self.doc[page_num]
-            
-            # Apply rotation
-            if rotation != 0:
-                page.set_rotation(rotation)
-            
-            # Render to image with zoom
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            
-            # Convert to PIL Image
-            img_data = pix.tobytes("ppm")
-            img = Image.open(io.BytesIO(img_data))
-            
-            # Convert to RGB if necessary
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Save to BytesIO
-            output = io.BytesIO()
-            img.save(output, format='PNG')
-            output.seek(0)
-            
-            return output
+            return render_page_png(self.doc[page_num], rotation, zoom)
             
         except Exception as e:
             raise Exception(f"Failed to render page {page_num}: {str(e)}")
@@ -86,13 +95,8 @@ class PDFHandler:
             media_box = page.mediabox
             width = float(media_box.width)
             height = float(media_box.height)
-            print(f"  PDFHandler.get_page_dimensions(page {page_num}):")
-            print(f"    MediaBox: {media_box}")
-            print(f"    Width: {width}, Height: {height} points")
-            # Also check PyMuPDF dimensions
-            mupdf_page = self.doc[page_num]
-            mupdf_rect = mupdf_page.rect
-            print(f"    PyMuPDF rect: {mupdf_rect}")
+            logger.debug('Page %d dimensions: MediaBox %s, %sx%s points, PyMuPDF rect %s',
+                         page_num, media_box, width, height, self.doc[page_num].rect)
             return {
                 'width': width,
                 'height': height,
@@ -127,12 +131,6 @@ class PDFHandler:
     def add_textbox_to_pdf(self, page_num, x, y, width, height, text, fontsize=12, color='#000000'):
         """Add text box directly to PDF page"""
         try:
-            print(f"  PDFHandler.add_textbox_to_pdf() called")
-            print(f"    Page: {page_num}")
-            print(f"    Position: ({x}, {y})")
-            print(f"    Size: {width}x{height}")
-            print(f"    Text: {text}")
-            
             # Get page from PyMuPDF
             page = self.doc[page_num]
             
@@ -142,18 +140,47 @@ class PDFHandler:
             
             # Create rect in PDF coordinates
             rect = fitz.Rect(x, y, x + width, y + height)
-            print(f"    Rect: {rect}")
             
             # Insert text box directly into PDF
             page.insert_textbox(rect, text, fontsize=fontsize, color=color_rgb, borders=0)
             
-            print(f"  ✓ Text box added to PDF page {page_num}")
-            
             # Save changes to the PDF file
             self.doc.save(self.filepath, incremental=False)
-            print(f"  ✓ PDF file saved")
+            logger.debug('Text box added to page %d at %s', page_num, rect)
             
         except Exception as e:
-            print(f"  ✗ Error adding text box: {str(e)}")
             raise Exception(f"Failed to add text box: {str(e)}")
 
+
+def render_page_png(page, rotation=0, zoom=1.0):
+    """
+    Render a fitz.Page to PNG
+    
+    Shared by PDFHandler and jobs that render from their own fitz.Document
+    (documents are not thread-safe, so worker threads never use a handler's).
+    
+    Returns:
+        BytesIO object containing PNG image
+    """
+    # Apply rotation
+    if rotation != 0:
+        page.set_rotation(rotation)
+    
+    # Render to image with zoom
+    mat = fitz.Matrix(zoom, zoom)
+    pix = page.get_pixmap(matrix=mat, alpha=False)
+    
+    # Convert to PIL Image
+    img_data = pix.tobytes("ppm")
+    img = Image.open(io.BytesIO(img_data))
+    
+    # Convert to RGB if necessary
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    
+    # Save to BytesIO
+    output = io.BytesIO()
+    img.save(output, format='PNG')
+    output.seek(0)
+    
+    return output
@@ -0,0 +1,267 @@
+"""Search Index - inverted full-text index over PyMuPDF words"""
+import logging
+import os
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import fitz  # PyMuPDF for text extraction
+
+logger = logging.getLogger('bananapdf.search')
+
+# Pages extracted per worker task
+PAGES_PER_TASK = 50
+# Number of document revisions kept in memory
+CACHE_SIZE = 4
+# Characters stripped from both ends of every word before indexing
+_PUNCTUATION = '.,;:!?"\'()[]{}<>«»“”‘’…-–—/\\*'
+
+
+def normalize_token(word):
+    """Normalize a word for indexing and querying"""
+    return unicodedata.normalize('NFKC', word).strip(_PUNCTUATION).casefold()
+
+
+class SearchIndex:
+    """
+    Inverted index from token to word IDs
+
+    Word IDs are assigned in extraction order, so a phrase is a run of
+    consecutive IDs on the same page. Pages, token IDs and bounding boxes
+    are kept in flat arrays indexed by word ID, which lets phrase queries
+    verify neighbours directly instead of intersecting posting lists.
+    """
+
+    def __init__(self, page_count):
+        """Initialize an empty index"""
+        self.page_count = page_count
+        self.word_pages = array('i')
+        self.word_tokens = array('i')  # token ID per word, -1 for punctuation-only words
+        self.word_rects = array('d')  # x0, y0, x1, y1 per word
+        self.token_ids = {}  # token -> token ID
+        self.postings = []  # token ID -> array('i') of word IDs
+        self.vocabulary = []  # sorted tokens, for prefix queries
+
+    @classmethod
+    def from_document(cls, filepath, page_count, executor=None):
+        """
+        Build an index for a PDF file
+
+        Args:
+            filepath: path of the PDF on disk
+            page_count: number of pages in the document
+            executor: optional executor used to extract page ranges in parallel
+
+        Returns:
+            SearchIndex
+        """
+        ranges = [
+            (start, min(start + PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, PAGES_PER_TASK)
+        ]
+        if executor is None:
+            parts = (_extract_words(filepath, start, stop) for start, stop in ranges)
+        else:
+            parts = executor.map(_extract_words, [filepath] * len(ranges),
+                                 [r[0] for r in ranges], [r[1] for r in ranges])
+
+        index = cls(page_count)
+        for pages, rects, tokens in parts:
+            index._append(pages, rects, tokens)
+        index.vocabulary = sorted(index.token_ids)
+        return index
+
+    @property
+    def word_count(self):
+        """Total number of indexed words"""
+        return len(self.word_pages)
+
+    def search(self, query, limit=100, prefix=False):
+        """
+        Find a word or phrase
+
+        Args:
+            query: one or more words; several words must appear consecutively
+            limit: maximum number of hits
+            prefix: treat the last query word as a prefix
+
+        Returns:
+            list of {'page': int, 'rects': [[x0, y0, x1, y1], ...]} in document order
+        """
+        terms = [normalize_token(term) for term in query.split()]
+        terms = [term for term in terms if term]
+        if not terms:
+            return []
+
+        # Acceptable token IDs for each query position
+        accepted = [self._token_set(term) for term in terms[:-1]]
+        accepted.append(self._prefix_token_set(terms[-1]) if prefix else self._token_set(terms[-1]))
+        if not all(accepted):
+            return []
+
+        # Anchor on the position with the fewest postings, then check neighbours
+        sizes = [sum(len(self.postings[token_id]) for token_id in ids) for ids in accepted]
+        anchor = sizes.index(min(sizes))
+        candidates = self._merged_postings(accepted[anchor])
+
+        word_count = len(self.word_pages)
+        length = len(terms)
+        hits = []
+        for word_id in candidates:
+            start = word_id - anchor
+            end = start + length - 1
+            if start < 0 or end >= word_count:
+                continue
+            page = self.word_pages[start]
+            if self.word_pages[end] != page:
+                continue
+            if all(self.word_tokens[start + offset] in accepted[offset] for offset in range(length)):
+                hits.append({
+                    'page': page,
+                    'rects': [self._rect(start + offset) for offset in range(length)],
+                })
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    def _token_set(self, token):
+        """Get the token ID set for an exact term (empty if unknown)"""
+        token_id = self.token_ids.get(token)
+        return frozenset() if token_id is None else frozenset((token_id,))
+
+    def _prefix_token_set(self, prefix):
+        """Get the token ID set for every token starting with a prefix"""
+        start = bisect_left(self.vocabulary, prefix)
+        ids = []
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            ids.append(self.token_ids[token])
+        return frozenset(ids)
+
+    def _merged_postings(self, token_ids):
+        """Get sorted word IDs for a set of token IDs"""
+        if len(token_ids) == 1:
+            return self.postings[next(iter(token_ids))]
+        merged = []
+        for token_id in token_ids:
+            merged.extend(self.postings[token_id])
+        merged.sort()
+        return merged
+
+    def _rect(self, word_id):
+        """Get the bounding box of a word"""
+        offset = word_id * 4
+        return list(self.word_rects[offset:offset + 4])
+
+    def _append(self, pages, rects, tokens):
+        """Append extracted words, assigning consecutive word IDs"""
+        base = len(self.word_pages)
+        self.word_pages.extend(pages)
+        self.word_rects.extend(rects)
+        token_ids = self.token_ids
+        postings = self.postings
+        for offset, token in enumerate(tokens):
+            if not token:
+                self.word_tokens.append(-1)
+                continue
+            token_id = token_ids.get(token)
+            if token_id is None:
+                token_id = token_ids[token] = len(postings)
+                postings.append(array('i'))
+            self.word_tokens.append(token_id)
+            postings[token_id].append(base + offset)
+
+
+class SearchIndexService:
+    """
+    Build search indexes in the background and cache them per revision
+
+    A revision is the file path plus its size and modification time, so
+    edits that rewrite the PDF (text boxes, drawings) trigger a rebuild on
+    the next search.
+    """
+
+    def __init__(self, max_workers=None, cache_size=CACHE_SIZE):
+        """Initialize search index service"""
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._executor = None
+        self._builds = OrderedDict()  # revision -> Future[SearchIndex]
+        self._lock = threading.Lock()
+        self._builder = None
+
+    def revision_id(self, filepath):
+        """Get the cache key for the current on-disk revision of a document"""
+        stat = os.stat(filepath)
+        return f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def start(self, filepath, page_count):
+        """
+        Start building the index for a document in the background
+
+        Returns:
+            Future resolving to a SearchIndex
+        """
+        revision = self.revision_id(filepath)
+        with self._lock:
+            future = self._builds.get(revision)
+            if future is not None:
+                self._builds.move_to_end(revision)
+                return future
+
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                # One coordinating thread merges worker output into the index
+                self._builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='search-index')
+
+            future = self._builder.submit(SearchIndex.from_document, filepath, page_count, self._executor)
+            self._builds[revision] = future
+            while len(self._builds) > self.cache_size:
+                _, stale = self._builds.popitem(last=False)
+                stale.cancel()
+
+        logger.debug('Search index build started for %s (%d pages)', filepath, page_count)
+        return future
+
+    def get(self, filepath, page_count, timeout=None):
+        """
+        Get the index for a document, waiting for a build in progress
+
+        Raises:
+            concurrent.futures.TimeoutError if the build is not done in time
+        """
+        return self.start(filepath, page_count).result(timeout=timeout)
+
+    def shutdown(self):
+        """Stop the worker pools"""
+        with self._lock:
+            if self._builder is not None:
+                self._builder.shutdown(cancel_futures=True)
+                self._builder = None
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+def _extract_words(filepath, start, stop):
+    """
+    Extract normalized words for a page range
+
+    Runs at module level so it can be pickled for ProcessPoolExecutor.
+
+    Returns:
+        (pages, rects, tokens) as flat arrays in extraction order
+    """
+    pages = array('i')
+    rects = array('d')
+    tokens = []
+    with fitz.open(filepath) as doc:
+        for page_idx in range(start, stop):
+            for x0, y0, x1, y1, word, *_ in doc[page_idx].get_text('words'):
+                pages.append(page_idx)
+                rects.extend((x0, y0, x1, y1))
+                tokens.append(normalize_token(word))
+    return pages, rects, tokens
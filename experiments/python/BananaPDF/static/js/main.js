@@ -501,7 +501,7 @@ class PDFViewer {
 
                 // Prefer vector rendering for drawings when stroke data is available.
                 // This keeps lines crisp at different zoom levels, closer to PDF ink rendering.
-                const hasStrokeData = annotation.type === 'drawing' &&
+                const hasStrokeData = (annotation.type === 'drawing' || annotation.type === 'signature') &&
                     Array.isArray(annotation.strokes) &&
                     annotation.strokes.length > 0;
 
@@ -1795,6 +1795,8 @@ class UIController {
         
         this.drawingContext = ctx;
         this.isSignature = true;
+        // Stroke points in canvas pixels, sent as vector ink on confirm
+        this.signatureStrokes = [];
         
         // Create and store bound functions for signature
         this.signatureStartHandler = (e) => this.startDrawing(e, true);
@@ -1818,6 +1820,9 @@ class UIController {
         const ctx = canvas.getContext('2d');
         ctx.beginPath();
         ctx.moveTo(x, y);
+        if (isSignature) {
+            this.signatureStrokes.push([[x, y]]);
+        }
     }
     
     continueDrawing(e, isSignature) {
@@ -1835,6 +1840,9 @@ class UIController {
         ctx.strokeStyle = '#000000';
         ctx.lineTo(x, y);
         ctx.stroke();
+        if (isSignature && this.signatureStrokes.length) {
+            this.signatureStrokes[this.signatureStrokes.length - 1].push([x, y]);
+        }
     }
     
     stopDrawing(isSignature) {
@@ -1848,6 +1856,7 @@ class UIController {
         if (!this.signatureCanvas) return;
         const ctx = this.signatureCanvas.getContext('2d');
         ctx.clearRect(0, 0, this.signatureCanvas.width, this.signatureCanvas.height);
+        this.signatureStrokes = [];
     }
     
     confirmSignature() {
@@ -1856,8 +1865,18 @@ class UIController {
             return;
         }
         
-        // Get signature data as image
+        // Get signature data as image (display fallback) and as vector strokes
         const imageData = this.signatureCanvas.toDataURL('image/png');
+        const sigWidth = 150;
+        const sigHeight = 100;
+        const scaleX = sigWidth / this.signatureCanvas.width;
+        const scaleY = sigHeight / this.signatureCanvas.height;
+        const signatureStrokes = (this.signatureStrokes || [])
+            .filter(stroke => stroke.length > 1)
+            .map(stroke => stroke.map(([x, y]) => [
+                this.pendingInput.x + x * scaleX,
+                this.pendingInput.y + y * scaleY
+            ]));
         
         // Save undo/redo state BEFORE making changes
         this.undoRedoManager.saveState('Add Signature', this.pageManager, this.annotationManager);
@@ -1870,9 +1889,12 @@ class UIController {
             type: 'signature',
             x: this.pendingInput.x,
             y: this.pendingInput.y,
-            width: 150,
-            height: 100,
-            imageData: imageData
+            width: sigWidth,
+            height: sigHeight,
+            imageData: imageData,
+            color: '#000000',
+            strokeWidth: 2 * scaleX,
+            strokes: signatureStrokes
         };
         
         this.annotationManager.addAnnotation(signatureAnnotation);
@@ -2062,6 +2084,7 @@ class UIController {
             
             // Prepare save data - IMPORTANT: include filename so backend can find the PDF
             const saveData = {
+                async: true,  // Export runs as a background job; we poll for the result
                 flatten: false,  // Use false for proper PDF annotations (like Adobe)
                 originalFilename: this.currentFilename,  // Send filename to backend for recovery
                 pages: pages,
@@ -2106,8 +2129,12 @@ class UIController {
                 throw new Error(errorMsg);
             }
             
+            // Wait for the export job, then fetch its result
+            const { jobId } = await response.json();
+            const resultResponse = await this.waitForJob(jobId, 'Saving PDF');
+            
             // Download the file
-            const blob = await response.blob();
+            const blob = await resultResponse.blob();
             const url = window.URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
@@ -2117,7 +2144,12 @@ class UIController {
             window.URL.revokeObjectURL(url);
             document.body.removeChild(a);
             
-            this.setStatus(`✅ PDF saved successfully! (${activePages.length} pages)`);
+            const warning = resultResponse.headers.get('X-BananaPDF-Warning');
+            if (warning) {
+                this.showError(`PDF saved, but: ${warning}`);
+            } else {
+                this.setStatus(`✅ PDF saved successfully! (${activePages.length} pages)`);
+            }
             this.showLoading(false);
             console.log('Save completed successfully');
         } catch (error) {
@@ -2127,6 +2159,31 @@ class UIController {
         }
     }
     
+    async waitForJob(jobId, label) {
+        // Long-poll the job status until it finishes, then return the result response
+        let version = -1;
+        while (true) {
+            const statusResponse = await fetch(`/api/jobs/${jobId}?wait=10&since=${version}`);
+            if (!statusResponse.ok) {
+                throw new Error(`Job ${jobId} not found`);
+            }
+            const job = await statusResponse.json();
+            version = job.version;
+            
+            if (job.status === 'done') {
+                const resultResponse = await fetch(`/api/jobs/${jobId}/result`);
+                if (!resultResponse.ok) {
+                    throw new Error(`HTTP ${resultResponse.status}: ${resultResponse.statusText}`);
+                }
+                return resultResponse;
+            }
+            if (job.status === 'failed' || job.status === 'cancelled') {
+                throw new Error(job.error || `Job ${job.status}`);
+            }
+            this.setStatus(`${label}... ${Math.round(job.progress * 100)}%`);
+        }
+    }
+    
     openModal(type) {
         if (type === 'text') {
             this.textInputModal.style.display = 'flex';
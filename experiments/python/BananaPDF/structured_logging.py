@@ -0,0 +1,234 @@
+"""Structured Logging - level-gated logging profiles and endpoint timing histograms"""
+import bisect
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Logging profiles, selected with the BANANAPDF_LOG_PROFILE environment variable
+PROFILES = {
+    'development': {
+        'level': logging.DEBUG,
+        'werkzeug_level': logging.DEBUG,
+        'log_file': 'flask_debug.log',
+        'payload_sample_rate': 1.0,
+    },
+    'production': {
+        'level': logging.WARNING,
+        'werkzeug_level': logging.WARNING,
+        'log_file': None,
+        'payload_sample_rate': 0.0,
+    },
+}
+DEFAULT_PROFILE = 'development'
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_active_profile = dict(PROFILES[DEFAULT_PROFILE], name=DEFAULT_PROFILE)
+
+
+def configure_logging(profile=None):
+    """
+    Configure root logging for a profile
+
+    Args:
+        profile: 'development' or 'production' (defaults to $BANANAPDF_LOG_PROFILE)
+
+    Returns:
+        dict describing the active profile
+    """
+    global _active_profile
+    name = profile or os.environ.get('BANANAPDF_LOG_PROFILE', DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f"Unknown logging profile: {name}")
+    settings = PROFILES[name]
+
+    handlers = [logging.StreamHandler()]
+    if settings['log_file']:
+        handlers.append(logging.FileHandler(settings['log_file']))
+
+    logging.basicConfig(
+        level=settings['level'],
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
+        handlers=handlers,
+        force=True,
+    )
+    logging.getLogger('werkzeug').setLevel(settings['werkzeug_level'])
+
+    _active_profile = dict(settings, name=name)
+    return _active_profile
+
+
+def get_profile():
+    """Get the active logging profile"""
+    return _active_profile
+
+
+class LazyFields:
+    """Key/value fields rendered only when a log record is actually emitted"""
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return ' '.join(
+            f"{key}={value() if callable(value) else value}"
+            for key, value in self.fields.items()
+        )
+
+
+def log_event(logger, level, event, sample_rate=1.0, **fields):
+    """
+    Log a structured event as "event key=value ..."
+
+    Nothing is formatted unless the level is enabled and the event survives
+    sampling. Field values may be callables so expensive values (payload
+    sizes, directory listings) are only computed for emitted records.
+
+    Args:
+        logger: logging.Logger to emit on
+        level: logging level
+        event: short dotted event name, e.g. 'save.request'
+        sample_rate: fraction of events to keep (0.0 - 1.0)
+        **fields: structured fields
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    logger.log(level, "%s %s", event, LazyFields(fields))
+
+
+def log_payload(logger, event, **fields):
+    """Log a request payload at DEBUG, sampled by the active profile"""
+    log_event(logger, logging.DEBUG, event,
+              sample_rate=_active_profile['payload_sample_rate'], **fields)
+
+
+class Histogram:
+    """Thread-safe fixed-bucket latency histogram (milliseconds)"""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms):
+        """Record one observation"""
+        index = bisect.bisect_left(self.buckets_ms, value_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += value_ms
+            self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+            self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+
+    def percentile(self, fraction):
+        """Approximate percentile as the upper bound of the containing bucket"""
+        with self._lock:
+            if self.count == 0:
+                return None
+            target = fraction * self.count
+            running = 0
+            for index, bucket_count in enumerate(self.counts):
+                running += bucket_count
+                if running >= target:
+                    if index < len(self.buckets_ms):
+                        return min(self.buckets_ms[index], self.max_ms)
+                    return self.max_ms
+            return self.max_ms
+
+    def snapshot(self):
+        """Get a JSON-serializable view of the histogram"""
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            total_ms = self.total_ms
+            min_ms = self.min_ms
+            max_ms = self.max_ms
+
+        bounds = list(self.buckets_ms) + ['+Inf']
+        return {
+            'count': count,
+            'sumMs': round(total_ms, 3),
+            'meanMs': round(total_ms / count, 3) if count else None,
+            'minMs': min_ms,
+            'maxMs': max_ms,
+            'p50Ms': self.percentile(0.50),
+            'p95Ms': self.percentile(0.95),
+            'p99Ms': self.percentile(0.99),
+            'buckets': [{'le': bound, 'count': n} for bound, n in zip(bounds, counts)],
+        }
+
+
+class MetricsRegistry:
+    """Named latency histograms, one per endpoint or operation"""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value_ms):
+        """Record a duration in milliseconds under a name"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram(self.buckets_ms))
+        histogram.observe(value_ms)
+
+    @contextmanager
+    def timer(self, name):
+        """Time a block and record it under a name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000.0)
+
+    def snapshot(self):
+        """Get all histograms as a JSON-serializable dict"""
+        with self._lock:
+            items = list(self.histograms.items())
+        return {name: histogram.snapshot() for name, histogram in sorted(items)}
+
+    def reset(self):
+        """Drop all recorded histograms"""
+        with self._lock:
+            self.histograms = {}
+
+
+# Process-wide registry used by the Flask app and the exporter
+metrics = MetricsRegistry()
+
+
+def register_request_metrics(app, registry=metrics):
+    """
+    Record per-endpoint request timings on a Flask app
+
+    Durations are keyed by "METHOD endpoint" so payloads never need to be
+    logged to understand where time goes. They are recorded on teardown,
+    which also runs when a handler raises, so unhandled 500s are counted.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g._request_start = time.perf_counter()
+
+    @app.teardown_request
+    def _record_request_timing(exc):
+        start = g.pop('_request_start', None)
+        if start is not None:
+            endpoint = request.endpoint or 'unmatched'
+            registry.observe(f"{request.method} {endpoint}", (time.perf_counter() - start) * 1000.0)
+
+    return registry
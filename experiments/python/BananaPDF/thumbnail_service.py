@@ -0,0 +1,245 @@
+"""Thumbnail Service - renders page overviews into cached sprite sheets"""
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from PIL import Image
+import fitz  # PyMuPDF for rendering
+
+logger = logging.getLogger('bananapdf.thumbnails')
+
+# Default thumbnail resolution (72 DPI = 1:1 with PDF points)
+THUMBNAIL_DPI = 24
+# Pages packed into one sprite sheet; each sheet is rendered by one worker
+PAGES_PER_SHEET = 100
+# Thumbnails per row in a sheet
+SHEET_COLUMNS = 10
+# Number of document revisions kept in memory
+CACHE_SIZE = 8
+
+
+class ThumbnailStrip:
+    """Rendered sprite sheets and the offset map for one document revision"""
+
+    def __init__(self, revision, dpi, page_count, sheets, offsets):
+        self.revision = revision
+        self.dpi = dpi
+        self.page_count = page_count
+        self.sheets = sheets  # list of PNG bytes
+        self.offsets = offsets  # list of per-page offset dicts, in page order
+
+    def offset_map(self):
+        """Get the JSON offset map (sheet URLs are added by the caller)"""
+        return {
+            'revision': self.revision,
+            'dpi': self.dpi,
+            'pageCount': self.page_count,
+            'sheetCount': len(self.sheets),
+            'pages': self.offsets,
+        }
+
+
+class ThumbnailService:
+    """
+    Render all pages of a document at low DPI in a process pool
+
+    Each sheet is rendered and packed by one worker, so a large document
+    fans out across cores. Results are cached per document revision (file
+    path, size and modification time, DPI and page rotations), and requests
+    for a revision that is still rendering wait on the same work.
+    """
+
+    def __init__(self, max_workers=None, cache_size=CACHE_SIZE,
+                 pages_per_sheet=PAGES_PER_SHEET, columns=SHEET_COLUMNS):
+        """Initialize thumbnail service"""
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.pages_per_sheet = pages_per_sheet
+        self.columns = columns
+        self._executor = None
+        self._cache = OrderedDict()  # revision -> ThumbnailStrip
+        self._pending = OrderedDict()  # revision -> (dpi, page_count, [futures])
+        self._lock = threading.Lock()
+
+    def revision_id(self, filepath, dpi, rotations):
+        """Get the cache key for the current on-disk revision of a document"""
+        stat = os.stat(filepath)
+        key = f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}|{dpi}|{tuple(rotations)}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+    def prefetch(self, filepath, page_count, dpi=THUMBNAIL_DPI, rotations=None):
+        """
+        Start rendering thumbnails in the background
+
+        Args:
+            filepath: path of the PDF on disk
+            page_count: number of pages in the document
+            dpi: thumbnail resolution
+            rotations: per-page rotation in degrees, indexed by page
+
+        Returns:
+            revision ID that identifies the result
+        """
+        rotations = list(rotations or [0] * page_count)
+        revision = self.revision_id(filepath, dpi, rotations)
+
+        with self._lock:
+            if revision in self._cache or revision in self._pending:
+                return revision
+
+            executor = self._get_executor()
+            zoom = dpi / 72.0
+            futures = [
+                executor.submit(
+                    _render_sheet, filepath,
+                    list(range(start, min(start + self.pages_per_sheet, page_count))),
+                    zoom, rotations, self.columns,
+                )
+                for start in range(0, page_count, self.pages_per_sheet)
+            ]
+            self._pending[revision] = (dpi, page_count, futures)
+            # Forget the oldest in-flight renders nobody has asked for
+            while len(self._pending) > self.cache_size:
+                _, (_, _, stale) = self._pending.popitem(last=False)
+                for future in stale:
+                    future.cancel()
+
+        logger.debug('Thumbnail render started: revision %s, %d pages, %d sheets',
+                     revision, page_count, len(futures))
+        return revision
+
+    def get(self, filepath, page_count, dpi=THUMBNAIL_DPI, rotations=None, timeout=None):
+        """
+        Get the thumbnail strip for a document, rendering it if needed
+
+        Returns:
+            ThumbnailStrip
+        """
+        revision = self.prefetch(filepath, page_count, dpi, rotations)
+        strip = self._collect(revision, timeout)
+        if strip is None:
+            # A concurrent prefetch evicted or cancelled this revision; render it here
+            rotations = list(rotations or [0] * page_count)
+            futures = [
+                _completed(_render_sheet, filepath,
+                           list(range(start, min(start + self.pages_per_sheet, page_count))),
+                           dpi / 72.0, rotations, self.columns)
+                for start in range(0, page_count, self.pages_per_sheet)
+            ]
+            strip = self._store(revision, dpi, page_count, futures, timeout)
+        return strip
+
+    def get_revision(self, revision):
+        """Get a cached strip by revision ID (None if not cached)"""
+        with self._lock:
+            strip = self._cache.get(revision)
+            if strip is not None:
+                self._cache.move_to_end(revision)
+            return strip
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def _collect(self, revision, timeout):
+        """
+        Wait for a pending revision and move it into the cache
+
+        Returns:
+            ThumbnailStrip, or None if the revision was evicted or cancelled
+            by a concurrent prefetch
+        """
+        with self._lock:
+            strip = self._cache.get(revision)
+            if strip is not None:
+                self._cache.move_to_end(revision)
+                return strip
+            pending = self._pending.get(revision)
+        if pending is None:
+            return None
+        dpi, page_count, futures = pending
+        try:
+            return self._store(revision, dpi, page_count, futures, timeout)
+        except CancelledError:
+            return None
+
+    def _store(self, revision, dpi, page_count, futures, timeout):
+        """Assemble finished sheet futures into a strip and cache it"""
+        sheets = []
+        offsets = []
+        for sheet_index, future in enumerate(futures):
+            sheet_offsets, png_bytes = future.result(timeout=timeout)
+            for offset in sheet_offsets:
+                offset['sheet'] = sheet_index
+            offsets.extend(sheet_offsets)
+            sheets.append(png_bytes)
+
+        strip = ThumbnailStrip(revision, dpi, page_count, sheets, offsets)
+        with self._lock:
+            self._pending.pop(revision, None)
+            self._cache[revision] = strip
+            self._cache.move_to_end(revision)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return strip
+
+    def _get_executor(self):
+        """Create the process pool on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+
+def _completed(fn, *args):
+    """Run fn now and wrap its result in a finished Future"""
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
+def _render_sheet(filepath, page_indices, zoom, rotations, columns):
+    """
+    Render a range of pages and pack them into one sprite sheet
+
+    Runs at module level so it can be pickled for ProcessPoolExecutor.
+
+    Returns:
+        (offsets, png_bytes) where offsets are in sheet pixel coordinates
+    """
+    thumbnails = []
+    with fitz.open(filepath) as doc:
+        for page_idx in page_indices:
+            matrix = fitz.Matrix(zoom, zoom).prerotate(rotations[page_idx])
+            pix = doc[page_idx].get_pixmap(matrix=matrix, alpha=False)
+            thumbnails.append((page_idx, Image.frombytes('RGB', (pix.width, pix.height), pix.samples)))
+
+    # Grid packing: fixed column width, each row as tall as its tallest page
+    cell_width = max(image.width for _, image in thumbnails)
+    offsets = []
+    row_heights = []
+    for start in range(0, len(thumbnails), columns):
+        row = thumbnails[start:start + columns]
+        y = sum(row_heights)
+        for column, (page_idx, image) in enumerate(row):
+            offsets.append({
+                'page': page_idx,
+                'x': column * cell_width,
+                'y': y,
+                'width': image.width,
+                'height': image.height,
+            })
+        row_heights.append(max(image.height for _, image in row))
+
+    sheet = Image.new('RGB', (cell_width * min(columns, len(thumbnails)), sum(row_heights)), 'white')
+    for offset, (_, image) in zip(offsets, thumbnails):
+        sheet.paste(image, (offset['x'], offset['y']))
+
+    output = io.BytesIO()
+    sheet.save(output, format='PNG')
+    return offsets, output.getvalue()
@@ -0,0 +1,176 @@
+"""Tile Renderer - XYZ deep-zoom tiles rendered from page clip rectangles"""
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+import fitz  # PyMuPDF for rendering
+
+logger = logging.getLogger('bananapdf.tiles')
+
+# Tile edge in pixels
+TILE_SIZE = 256
+# Highest zoom relative to 72 DPI (level scales stop once they pass this)
+MAX_ZOOM = 16.0
+# Encoded tiles kept in memory
+CACHE_BYTES = 64 * 1024 * 1024
+
+
+class TileRenderer:
+    """
+    Render fixed-size tiles of a page at discrete zoom levels
+
+    Level 0 fits the whole page in a single tile and every level doubles
+    the scale, XYZ-style: tile (x, y) at level z covers pixels
+    [x * TILE_SIZE, (x + 1) * TILE_SIZE) of the page rendered at that
+    level's scale. Only the tile's clip rectangle is rasterized, so memory
+    and latency per tile stay constant at any zoom. Encoded PNG tiles are
+    kept in an LRU cache bounded by bytes.
+    """
+
+    def __init__(self, tile_size=TILE_SIZE, max_zoom=MAX_ZOOM, cache_bytes=CACHE_BYTES):
+        """Initialize tile renderer"""
+        self.tile_size = tile_size
+        self.max_zoom = max_zoom
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()  # key -> PNG bytes
+        self._cached_bytes = 0
+        self._doc = None
+        self._doc_revision = None
+        self._source_rotations = []
+        self._lock = threading.Lock()
+
+    def describe(self, filepath, page_num, rotation=0):
+        """
+        Get the level layout of a page
+
+        Returns:
+            dict with tileSize and per-level scale, size and tile grid
+        """
+        with self._lock:
+            page = self._page(filepath, page_num, rotation)
+            width, height = page.rect.width, page.rect.height
+
+        levels = []
+        for level in range(self.max_level(width, height) + 1):
+            scale = self.level_scale(width, height, level)
+            pixel_width = math.ceil(width * scale)
+            pixel_height = math.ceil(height * scale)
+            levels.append({
+                'level': level,
+                'scale': scale,
+                'width': pixel_width,
+                'height': pixel_height,
+                'columns': math.ceil(pixel_width / self.tile_size),
+                'rows': math.ceil(pixel_height / self.tile_size),
+            })
+        return {
+            'page': page_num,
+            'rotation': rotation,
+            'tileSize': self.tile_size,
+            'pageWidth': width,
+            'pageHeight': height,
+            'minLevel': 0,
+            'maxLevel': len(levels) - 1,
+            'levels': levels,
+        }
+
+    def level_scale(self, width, height, level):
+        """Scale (pixels per point) of a zoom level"""
+        return (self.tile_size / max(width, height)) * (2 ** level)
+
+    def max_level(self, width, height):
+        """Highest level whose scale does not exceed max_zoom"""
+        base = self.tile_size / max(width, height)
+        return max(0, int(math.floor(math.log2(self.max_zoom / base))))
+
+    def render_tile(self, filepath, page_num, level, x, y, rotation=0):
+        """
+        Render one tile as PNG bytes
+
+        Raises:
+            ValueError for tiles outside the page or level range
+        """
+        revision = self._revision(filepath)
+        key = (revision, page_num, rotation, level, x, y)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+            page = self._page(filepath, page_num, rotation)
+            width, height = page.rect.width, page.rect.height
+            if level < 0 or level > self.max_level(width, height):
+                raise ValueError(f"Invalid zoom level: {level}")
+
+            scale = self.level_scale(width, height, level)
+            pixel_width = math.ceil(width * scale)
+            pixel_height = math.ceil(height * scale)
+            if x < 0 or y < 0 or x * self.tile_size >= pixel_width or y * self.tile_size >= pixel_height:
+                raise ValueError(f"Tile {level}/{x}/{y} is outside the page")
+
+            # Clip is in (rotated) page coordinates: the tile's pixel rectangle / scale
+            matrix = fitz.Matrix(scale, scale)
+            clip = fitz.Rect(
+                x * self.tile_size,
+                y * self.tile_size,
+                min((x + 1) * self.tile_size, pixel_width),
+                min((y + 1) * self.tile_size, pixel_height),
+            ) / scale
+
+            pix = page.get_pixmap(matrix=matrix, clip=clip, alpha=False)
+            png_bytes = pix.tobytes('png')
+            self._store(key, png_bytes)
+        logger.debug('Rendered tile %d/%d/%d of page %d', level, x, y, page_num)
+        return png_bytes
+
+    def clear(self):
+        """Drop all cached tiles and the open document"""
+        with self._lock:
+            self._cache.clear()
+            self._cached_bytes = 0
+            if self._doc is not None:
+                self._doc.close()
+            self._doc = None
+            self._doc_revision = None
+
+    def _page(self, filepath, page_num, rotation):
+        """
+        Get a page of the private document with the session rotation applied (lock held)
+
+        Like PDFHandler.render_page, a non-zero rotation replaces the page's
+        own /Rotate and zero keeps it.
+        """
+        doc = self._open(filepath)
+        if page_num < 0 or page_num >= len(doc):
+            raise ValueError(f"Invalid page number: {page_num}")
+        page = doc[page_num]
+        effective = rotation or self._source_rotations[page_num]
+        if page.rotation != effective:
+            page.set_rotation(effective)
+        return page
+
+    def _revision(self, filepath):
+        """Identify the on-disk revision of a document"""
+        stat = os.stat(filepath)
+        return (os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns)
+
+    def _open(self, filepath):
+        """Open (or reuse) a private document for the current revision (lock held)"""
+        revision = self._revision(filepath)
+        if self._doc_revision != revision:
+            if self._doc is not None:
+                self._doc.close()
+            self._doc = fitz.open(filepath)
+            self._doc_revision = revision
+            self._source_rotations = [page.rotation for page in self._doc]
+        return self._doc
+
+    def _store(self, key, png_bytes):
+        """Add a tile to the LRU cache (lock held)"""
+        self._cache[key] = png_bytes
+        self._cached_bytes += len(png_bytes)
+        while self._cached_bytes > self.cache_bytes and self._cache:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
@@ -0,0 +1,164 @@
+"""Vector Strokes - stroke simplification and PDF insertion for drawings and signatures"""
+import base64
+import math
+import fitz  # PyMuPDF for PDF manipulation
+
+# Default Ramer-Douglas-Peucker tolerance in PDF points
+DEFAULT_TOLERANCE = 0.5
+# Upper bounds that keep a single request from building a huge annotation
+MAX_STROKES = 500
+MAX_POINTS_PER_STROKE = 10000
+
+
+def parse_strokes(strokes):
+    """
+    Validate stroke point arrays
+
+    Args:
+        strokes: [[[x, y], [x, y], ...], ...]
+
+    Returns:
+        list of strokes as lists of (x, y) float tuples
+
+    Raises:
+        ValueError if the payload is malformed
+    """
+    if not isinstance(strokes, list) or not strokes:
+        raise ValueError('strokes must be a non-empty list of point lists')
+    if len(strokes) > MAX_STROKES:
+        raise ValueError(f'Too many strokes (max {MAX_STROKES})')
+
+    parsed = []
+    for stroke in strokes:
+        if not isinstance(stroke, list):
+            raise ValueError('Each stroke must be a list of [x, y] points')
+        if len(stroke) > MAX_POINTS_PER_STROKE:
+            raise ValueError(f'Too many points in stroke (max {MAX_POINTS_PER_STROKE})')
+        points = []
+        for point in stroke:
+            if not isinstance(point, (list, tuple)) or len(point) < 2:
+                raise ValueError('Each point must be [x, y]')
+            x, y = float(point[0]), float(point[1])
+            if not (math.isfinite(x) and math.isfinite(y)):
+                raise ValueError('Point coordinates must be finite numbers')
+            points.append((x, y))
+        if points:
+            parsed.append(points)
+    if not parsed:
+        raise ValueError('strokes contain no points')
+    return parsed
+
+
+def map_strokes_to_rect(strokes, canvas_width, canvas_height, rect):
+    """Map strokes from canvas pixel space into a PDF rectangle"""
+    scale_x = (rect.x1 - rect.x0) / float(canvas_width)
+    scale_y = (rect.y1 - rect.y0) / float(canvas_height)
+    return [
+        [(rect.x0 + x * scale_x, rect.y0 + y * scale_y) for x, y in stroke]
+        for stroke in strokes
+    ]
+
+
+def simplify_stroke(points, tolerance=DEFAULT_TOLERANCE):
+    """
+    Simplify a polyline with Ramer-Douglas-Peucker
+
+    Iterative (explicit stack) so long strokes cannot hit the recursion limit.
+
+    Args:
+        points: list of (x, y)
+        tolerance: maximum distance of a dropped point from the simplified line
+
+    Returns:
+        list of (x, y) keeping the first and last point
+    """
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        x0, y0 = points[first]
+        x1, y1 = points[last]
+        dx = x1 - x0
+        dy = y1 - y0
+        length = math.hypot(dx, dy)
+
+        max_distance = -1.0
+        max_index = first
+        for index in range(first + 1, last):
+            px, py = points[index]
+            if length == 0:
+                distance = math.hypot(px - x0, py - y0)
+            else:
+                distance = abs(dy * px - dx * py + x1 * y0 - y1 * x0) / length
+            if distance > max_distance:
+                max_distance = distance
+                max_index = index
+
+        if max_distance > tolerance:
+            keep[max_index] = True
+            stack.append((first, max_index))
+            stack.append((max_index, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def simplify_strokes(strokes, tolerance=DEFAULT_TOLERANCE):
+    """Simplify every stroke, dropping strokes with fewer than two points"""
+    simplified = []
+    for stroke in strokes:
+        if len(stroke) < 2:
+            continue
+        simplified.append(simplify_stroke(stroke, tolerance))
+    return simplified
+
+
+def strokes_bounds(strokes):
+    """Get the bounding fitz.Rect of a set of strokes"""
+    xs = [x for stroke in strokes for x, _ in stroke]
+    ys = [y for stroke in strokes for _, y in stroke]
+    return fitz.Rect(min(xs), min(ys), max(xs), max(ys))
+
+
+def add_ink_annotation(page, strokes, color, stroke_width):
+    """
+    Create a real PDF ink annotation so standard editors can delete it
+
+    Args:
+        page: fitz.Page
+        strokes: list of strokes in PDF coordinates
+        color: RGB tuple (0-1 range)
+        stroke_width: line width in points
+
+    Returns:
+        the fitz.Annot, or None if no stroke had two or more points
+    """
+    ink_strokes = [
+        [(float(point[0]), float(point[1])) for point in stroke if len(point) >= 2]
+        for stroke in strokes
+        if len(stroke) >= 2
+    ]
+    if not ink_strokes:
+        return None
+
+    annot = page.add_ink_annot(ink_strokes)
+    if annot:
+        annot.set_colors(stroke=color)
+        annot.set_border(width=max(float(stroke_width), 0.5))
+        annot.update()
+    return annot
+
+
+def decode_image_data(image_data):
+    """Decode a base64 image, with or without a data URI prefix"""
+    if image_data.startswith('data:image/'):
+        image_data = image_data.split(',', 1)[1]
+    return base64.b64decode(image_data)
+
+
+def insert_image_stream(page, rect, image_bytes, overlay=True):
+    """Insert encoded image bytes into a page without touching the disk"""
+    page.insert_image(rect, stream=image_bytes, overlay=overlay)
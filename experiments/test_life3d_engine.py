@@ -0,0 +1,33 @@
+"""Dense and sparse 3D Life engines must agree, including on B0 rules.
+
+    python -m pytest test_life3d_engine.py
+"""
+import numpy as np
+import pytest
+from life3d_engine import DenseLife3D, SparseLife3D
+
+
+@pytest.mark.parametrize('rule', ['B3-8/S4-8', 'B0/S0-26', 'B0,4/S2-5', 'B0-2/S'])
+def test_sparse_matches_dense(rule):
+    grid = (np.random.default_rng(0).random((8, 9, 10)) < 0.1).astype(np.uint8)
+    dense = DenseLife3D(grid, rule=rule)
+    sparse = SparseLife3D(grid, rule=rule)
+    for _ in range(4):
+        dense.step()
+        sparse.step()
+        assert np.array_equal(dense.to_array(), sparse.to_array())
+
+
+def test_b0_from_empty_torus():
+    grid = np.zeros((5, 5, 5), dtype=np.uint8)
+    dense = DenseLife3D(grid, rule='B0/S')
+    sparse = SparseLife3D(grid, rule='B0/S')
+    for _ in range(3):
+        dense.step()
+        sparse.step()
+        assert np.array_equal(dense.to_array(), sparse.to_array())
+
+
+def test_b0_rejected_for_unbounded_world():
+    with pytest.raises(ValueError):
+        SparseLife3D(rule='B0/S0-26', cells=[(0, 0, 0)])